@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the Auto Key Clicker click engine
+
+Runs the job scheduler headlessly against an instrumented fake keyboard
+backend across intervals from 1 ms to 1 s, measures how quickly a stop from
+the hotkey thread takes effect, compares the thread and process engines
+while another thread hogs the GIL, and writes a JSON report that can be
+compared between commits:
+
+    python benchmark.py --output bench.json
+    python benchmark.py --quick --compare bench.json
+"""
+
+import argparse
+import importlib.util
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from array import array
+
+import clicker_engine
+from clicker_backends import OutputBackend, PynputKey, create_backend
+from clicker_delays import create_sampler
+from clicker_engine import JobScheduler, KeyJob, RateMeter
+from clicker_process import ProcessScheduler
+
+
+# (interval, limit) pairs; limit None derives it from the time budget
+RATE_CASES = [
+    (0.001, None), (0.002, None), (0.005, None), (0.01, None), (0.02, None),
+    (0.05, None), (0.1, None), (0.25, None), (1.0, None),
+    (0.01, 10), (0.01, 100), (0.01, 1000),
+]
+DEFAULT_BUDGET = 3.0   # seconds per case
+QUICK_BUDGET = 0.5
+MIN_PRESSES = 5
+
+# Hotkey stop latency: intervals, trials per interval and run time before the stop
+HOTKEY_INTERVALS = (0.001, 0.01, 0.1)
+HOTKEY_TRIALS = 20
+QUICK_HOTKEY_TRIALS = 5
+HOTKEY_RUN_TIME = (0.05, 0.15)
+
+# Thread vs process engine: interval of the measured job, and the pure Python
+# work a competing thread does per loop (standing in for Tk redraws)
+ENGINE_INTERVAL = 0.01
+GIL_LOAD_STEPS = 10000
+
+# Fields identifying a case in each report section
+CASE_FIELDS = {
+    'rate': ('interval', 'limit'),
+    'hotkey': ('interval',),
+    'engine': ('engine', 'load'),
+}
+
+# Report fields compared by --compare (lower is better), with an absolute
+# slack so scheduler noise on near-zero values is not flagged
+COMPARED_FIELDS = {
+    'rate': {
+        'rate_error_pct': 0.1,
+        'error_p99_ms': 0.5,
+        'cpu_per_press_us': 5.0,
+    },
+    'hotkey': {
+        'latency_p99_ms': 0.5,
+        'escaped_max': 1,
+    },
+    'engine': {
+        'jitter_ms': 0.5,
+        'max_lateness_ms': 2.0,
+    },
+}
+
+
+class InstrumentedBackend(OutputBackend):
+    """Fake keyboard that timestamps every press and measures time spent inside it"""
+
+    name = "instrumented"
+
+    def __init__(self, press_cost=0.0):
+        self.press_cost = press_cost
+        self.timestamps = array('d')
+        self.backend_time = 0.0
+
+    def reset(self):
+        """Drop recorded presses"""
+        self.timestamps = array('d')
+        self.backend_time = 0.0
+
+    def resolve_key(self, key_name):
+        """Use the key name as the handle"""
+        return key_name
+
+    def press(self, handle):
+        """Record a press, optionally burning press_cost seconds like a real round trip"""
+        start = time.perf_counter()
+        self.timestamps.append(start)
+        if self.press_cost:
+            end = start + self.press_cost
+            while time.perf_counter() < end:
+                pass
+        self.backend_time += time.perf_counter() - start
+
+    def release(self, handle):
+        """Releases are free"""
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def run_job(scheduler, job):
+    """Run a job to completion on the scheduler; returns (wall seconds, CPU seconds)"""
+    finished = threading.Event()
+    job.on_finish = lambda j, reason, detail: finished.set()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    scheduler.start_job(job)
+    finished.wait()
+    return time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+
+def tick_errors(timestamps, batch, tick_interval):
+    """Deviation of each tick's spacing from the configured tick interval, in seconds"""
+    ticks = timestamps[::batch]
+    return [abs((ticks[i] - ticks[i - 1]) - tick_interval) for i in range(1, len(ticks))]
+
+
+def run_rate_case(scheduler, backend, interval, limit, budget):
+    """Measure one interval/limit combination"""
+    batch = clicker_engine.burst_batch_size(interval)
+    if limit is None:
+        limit = max(MIN_PRESSES, int(budget / interval))
+
+    backend.reset()
+    handle = backend.resolve_key('a')
+    job = KeyJob("bench", lambda: backend.tap(handle), interval, limit, batch)
+    wall, cpu = run_job(scheduler, job)
+
+    timestamps = backend.timestamps
+    presses = len(timestamps)
+    span = timestamps[-1] - timestamps[0] if presses > 1 else 0.0
+    achieved = (presses - batch) / span if span > 0 else 0.0
+    errors = sorted(tick_errors(timestamps, batch, interval * batch))
+
+    return {
+        'interval': interval,
+        'limit': limit,
+        'batch': batch,
+        'presses': presses,
+        'wall_seconds': round(wall, 4),
+        'target_rate': round(1.0 / interval, 3),
+        'achieved_rate': round(achieved, 3),
+        'rate_error_pct': round(abs(achieved * interval - 1.0) * 100, 4) if achieved else None,
+        'error_p50_ms': round(percentile(errors, 0.50) * 1000, 4),
+        'error_p99_ms': round(percentile(errors, 0.99) * 1000, 4),
+        'error_max_ms': round(errors[-1] * 1000, 4) if errors else 0.0,
+        'cpu_per_press_us': round(cpu / presses * 1e6, 3) if presses else None,
+        'backend_per_press_us': round(backend.backend_time / presses * 1e6, 3) if presses else None,
+    }
+
+
+def run_hotkey_case(scheduler, backend, interval, trials):
+    """Stop a running job from another thread, as the hotkey listener does
+
+    Latency is the time from the stop request to the last press; presses
+    after the request are counted as escaped.
+    """
+    batch = clicker_engine.burst_batch_size(interval)
+    handle = backend.resolve_key('a')
+    latencies = []
+    escaped = []
+    for _ in range(trials):
+        backend.reset()
+        job = KeyJob("hotkey", lambda: backend.tap(handle), interval, 0, batch)
+        finished = threading.Event()
+        job.on_finish = lambda j, reason, detail: finished.set()
+        scheduler.start_job(job)
+        time.sleep(random.uniform(*HOTKEY_RUN_TIME))
+
+        stop_time = time.perf_counter()
+        stopper = threading.Thread(target=scheduler.stop_job, args=(job,))
+        stopper.start()
+        stopper.join()
+        finished.wait()
+
+        timestamps = backend.timestamps
+        late = [t for t in timestamps if t > stop_time]
+        escaped.append(len(late))
+        latencies.append(max(0.0, timestamps[-1] - stop_time) if timestamps else 0.0)
+
+    latencies.sort()
+    return {
+        'interval': interval,
+        'batch': batch,
+        'trials': trials,
+        'latency_p50_ms': round(percentile(latencies, 0.50) * 1000, 4),
+        'latency_p99_ms': round(percentile(latencies, 0.99) * 1000, 4),
+        'latency_max_ms': round(latencies[-1] * 1000, 4),
+        'escaped_mean': round(sum(escaped) / trials, 3),
+        'escaped_max': max(escaped),
+    }
+
+
+def gil_load(stop):
+    """Burn CPU in pure Python, holding the GIL between interpreter switches"""
+    while not stop.is_set():
+        total = 0
+        for i in range(GIL_LOAD_STEPS):
+            total += i
+
+
+def run_engine_case(engine, scheduler, create, load, budget):
+    """Run one job on an engine, optionally with a GIL-hogging thread in this process
+
+    create(name, **spec) builds the job on that engine; timing comes from the
+    job's own run statistics, which both engines collect where the keys are sent.
+    """
+    job = create("engine", key='a', interval=ENGINE_INTERVAL,
+                 limit=max(MIN_PRESSES, int(budget / ENGINE_INTERVAL)))
+    stop = threading.Event()
+    loader = threading.Thread(target=gil_load, args=(stop,), daemon=True)
+    if load:
+        loader.start()
+    try:
+        run_job(scheduler, job)
+    finally:
+        stop.set()
+        if load:
+            loader.join()
+
+    stats = job.stats
+    # Histogram quantiles are bucket bounds; the observed maximum is tighter when smaller
+    p99 = min(stats.lateness.quantile(0.99), stats.max_lateness)
+    return {
+        'engine': engine,
+        'load': load,
+        'presses': stats.presses,
+        'achieved_rate': round(stats.mean_rate, 3),
+        'jitter_ms': round(stats.jitter * 1000, 4),
+        'lateness_p99_ms': round(p99 * 1000, 4),
+        'max_lateness_ms': round(stats.max_lateness * 1000, 4),
+        'overruns': stats.overruns,
+    }
+
+
+def run_engine_cases(budget, log=None):
+    """Compare the thread and process engines with and without GIL contention"""
+    results = []
+    process_scheduler = ProcessScheduler("null")
+    backend = create_backend("null")
+    thread_scheduler = JobScheduler()
+    engines = (
+        ('thread', thread_scheduler, lambda name, **spec: clicker_engine.create_job(backend, name, **spec)),
+        ('process', process_scheduler, process_scheduler.create_job),
+    )
+    try:
+        for engine, scheduler, create in engines:
+            for load in (False, True):
+                result = run_engine_case(engine, scheduler, create, load, budget)
+                results.append(result)
+                if log:
+                    log(f"engine={engine:<7} load={'gil' if load else 'none':<4} "
+                        f"jitter {result['jitter_ms']:.3f} ms  p99 {result['lateness_p99_ms']:.3f} ms  "
+                        f"max {result['max_lateness_ms']:.3f} ms  overruns {result['overruns']}")
+    finally:
+        thread_scheduler.shutdown()
+        process_scheduler.shutdown()
+        backend.close()
+    return results
+
+
+def measure_counter_sampling(samples=100000):
+    """Cost of one GUI counter sample (shared slot read plus rate update), in ns"""
+    job = KeyJob("counter", lambda: None, 0.01)
+    meter = RateMeter()
+    now = 0.0
+    start = time.perf_counter()
+    for _ in range(samples):
+        job.count += 1
+        now += 0.033
+        meter.sample(job.count, now)
+    return round((time.perf_counter() - start) / samples * 1e9, 1)
+
+
+def measure_delay_sampling(samples=100000, interval=0.01, jitter=0.002):
+    """Cost of one humanized delay in ns
+
+    hot_path is what the scheduler pays per press (the next value of a
+    precomputed batch), batch_fill the generation cost per delay, paid once
+    per batch, and per_press the cost of sampling in Python on every press.
+    """
+    start = time.perf_counter()
+    sampler = create_sampler('lognormal', interval, jitter, batch=samples)
+    batch_fill = (time.perf_counter() - start) / samples
+
+    take = sampler.next
+    start = time.perf_counter()
+    for _ in range(samples):
+        take()
+    hot_path = (time.perf_counter() - start) / samples
+
+    mu, sigma = math.log(interval), jitter / interval
+    lognormvariate = random.lognormvariate
+    start = time.perf_counter()
+    for _ in range(samples):
+        max(clicker_engine.MIN_INTERVAL, lognormvariate(mu, sigma))
+    per_press = (time.perf_counter() - start) / samples
+    return {
+        'hot_path': round(hot_path * 1e9, 1),
+        'batch_fill': round(batch_fill * 1e9, 1),
+        'per_press': round(per_press * 1e9, 1),
+    }
+
+
+def measure_key_dispatch(samples=20000, key='a'):
+    """Front-end CPU of one pynput tap in ns, or the reason it was skipped
+
+    controller is pynput's press()/release(), which resolves the key again on
+    every call; cached is a PynputKey's prepared down()/up(). The platform
+    layer sends nothing on either side, so only the per-press resolution
+    work the key cache removes is measured. Without a display pynput's dummy
+    platform layer is loaded, which leaves that resolution work unchanged,
+    so headless runs and CI report the figures too.
+    """
+    if importlib.util.find_spec('pynput') is None:
+        return {'skipped': "pynput is not installed"}
+    headless = sys.platform not in ('win32', 'darwin') and not os.environ.get('DISPLAY')
+    if headless:
+        os.environ.setdefault('PYNPUT_BACKEND', 'dummy')
+    try:
+        from pynput.keyboard import Controller, KeyCode
+    except Exception as e:
+        return {'skipped': f"pynput cannot load its platform layer: {e}"}
+
+    class SilentController(Controller):
+        def _handle(self, key, is_press):
+            pass
+
+    try:
+        controller = SilentController()
+    except Exception as e:
+        return {'skipped': f"pynput's keyboard Controller cannot be created: {e}"}
+    press, release = controller.press, controller.release
+    start = time.perf_counter()
+    for _ in range(samples):
+        press(key)
+        release(key)
+    per_press = (time.perf_counter() - start) / samples
+
+    def send():
+        pass
+
+    handle = PynputKey(key, KeyCode.from_char(key), send, send)
+    start = time.perf_counter()
+    for _ in range(samples):
+        handle.down()
+        handle.up()
+    cached = (time.perf_counter() - start) / samples
+    return {
+        'controller': round(per_press * 1e9, 1),
+        'cached': round(cached * 1e9, 1),
+        'platform_layer': os.environ.get('PYNPUT_BACKEND', 'native'),
+    }
+
+
+def git_revision():
+    """Current commit hash, or None outside a git checkout"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(budget, press_cost=0.0, hotkey_trials=HOTKEY_TRIALS, log=None):
+    """Run every suite and return the report dictionary"""
+    backend = InstrumentedBackend(press_cost)
+    scheduler = JobScheduler()
+    results = []
+    hotkey_results = []
+    try:
+        for interval, limit in RATE_CASES:
+            result = run_rate_case(scheduler, backend, interval, limit, budget)
+            results.append(result)
+            if log:
+                log(f"interval={interval:<6g} limit={result['limit']:<6} "
+                    f"rate {result['achieved_rate']:>9.2f}/{result['target_rate']:<9g} "
+                    f"p50 {result['error_p50_ms']:.3f} ms  p99 {result['error_p99_ms']:.3f} ms  "
+                    f"max {result['error_max_ms']:.3f} ms  cpu {result['cpu_per_press_us']:.1f} us/press")
+        for interval in HOTKEY_INTERVALS:
+            result = run_hotkey_case(scheduler, backend, interval, hotkey_trials)
+            hotkey_results.append(result)
+            if log:
+                log(f"hotkey stop interval={interval:<6g} latency p50 {result['latency_p50_ms']:.3f} ms  "
+                    f"p99 {result['latency_p99_ms']:.3f} ms  max {result['latency_max_ms']:.3f} ms  "
+                    f"escaped max {result['escaped_max']}")
+    finally:
+        scheduler.shutdown()
+    engine_results = run_engine_cases(budget, log)
+
+    return {
+        'meta': {
+            'revision': git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'budget_seconds': budget,
+            'press_cost_us': press_cost * 1e6,
+        },
+        'rate': results,
+        'hotkey': hotkey_results,
+        'engine': engine_results,
+        'counter_sample_ns': measure_counter_sampling(),
+        'delay_sample_ns': measure_delay_sampling(),
+        'key_dispatch_ns': measure_key_dispatch(),
+    }
+
+
+def compare_reports(old, new, tolerance):
+    """Print per-case changes; returns the number of regressions beyond tolerance percent"""
+    regressions = 0
+    for section, fields in COMPARED_FIELDS.items():
+        case_fields = CASE_FIELDS[section]
+        old_cases = {tuple(r[f] for f in case_fields): r for r in old.get(section, [])}
+        for result in new.get(section, []):
+            case = tuple(result[f] for f in case_fields)
+            previous = old_cases.get(case)
+            if previous is None:
+                continue
+            for field, slack in fields.items():
+                before, after = previous.get(field), result.get(field)
+                if before is None or after is None:
+                    continue
+                if after > before * (1 + tolerance / 100) + slack:
+                    regressions += 1
+                    label = " ".join(f"{name}={value}" for name, value in zip(case_fields, case))
+                    print(f"REGRESSION {section} {label} {field}: {before} -> {after}", file=sys.stderr)
+    print(f"{regressions} regression(s) beyond {tolerance}%", file=sys.stderr)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the click engine against a fake keyboard backend")
+    parser.add_argument("--quick", action="store_true", help=f"{QUICK_BUDGET}s per case instead of {DEFAULT_BUDGET}s")
+    parser.add_argument("--press-cost-us", type=float, default=0.0,
+                        help="simulated time spent inside each backend press, in microseconds")
+    parser.add_argument("--output", help="write the JSON report to this file (default: stdout)")
+    parser.add_argument("--compare", metavar="REPORT", help="compare against a previous JSON report")
+    parser.add_argument("--tolerance", type=float, default=25.0,
+                        help="allowed worsening in percent before --compare fails (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    budget = QUICK_BUDGET if args.quick else DEFAULT_BUDGET
+    trials = QUICK_HOTKEY_TRIALS if args.quick else HOTKEY_TRIALS
+    report = run_benchmarks(budget, args.press_cost_us / 1e6, trials,
+                            log=lambda line: print(line, file=sys.stderr))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        if compare_reports(previous, report, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -25,6 +25,8 @@ def build_executable(version=None):
         '--windowed',
         '--icon=NONE',  # Can add icon file path here if available
         '--add-data=requirements.txt;.' if os.name == 'nt' else '--add-data=requirements.txt:.',
+        '--hidden-import=clicker_gui',
+        '--hidden-import=clicker_process',
         '--hidden-import=pynput',
         '--hidden-import=pystray',
         '--hidden-import=PIL',
@@ -0,0 +1,474 @@
+"""
+Output Backends
+Keyboard output implementations used by the click engine.
+
+Keys are named the same way everywhere: a single character ('a', '1', '?')
+or a special key name ('enter', 'f6', ...). Backends resolve a name once into
+a native handle which is then passed to press()/release()/tap().
+
+The pynput backend additionally accepts every pynput Key name ('page_up',
+'media_play_pause', 'ctrl_l', ...) and platform virtual key codes
+('vk:0x41'; a keysym on X11).
+"""
+
+import functools
+import os
+import struct
+import sys
+import time
+
+
+# Special key names offered in the UI
+SPECIAL_KEYS = (
+    'enter', 'space', 'tab', 'backspace', 'delete', 'esc',
+    'shift', 'ctrl', 'alt',
+    'up', 'down', 'left', 'right',
+    'f1', 'f2', 'f3', 'f4', 'f5', 'f6', 'f7', 'f8', 'f9', 'f10', 'f11', 'f12',
+)
+
+# Prefix of key names given as a virtual key code (pynput backend)
+VK_PREFIX = "vk:"
+
+# Backend used when none is configured; override with KEY_CLICKER_BACKEND
+BACKEND_ENV_VAR = "KEY_CLICKER_BACKEND"
+DEFAULT_BACKEND = "auto"
+
+
+class BackendError(Exception):
+    """Raised when an output backend is unavailable or cannot resolve a key"""
+
+
+class OutputBackend:
+    """Base class for keyboard output backends"""
+
+    name = "base"
+
+    def resolve_key(self, key_name):
+        """Translate a key name into a backend handle, raising ValueError if unknown"""
+        raise NotImplementedError
+
+    def press(self, handle):
+        """Press a resolved key"""
+        raise NotImplementedError
+
+    def release(self, handle):
+        """Release a resolved key"""
+        raise NotImplementedError
+
+    def tap(self, handle):
+        """Press and release a resolved key"""
+        self.press(handle)
+        self.release(handle)
+
+    def close(self):
+        """Release any resources held by the backend"""
+
+
+def _validate_key_name(key_name):
+    """Reject names that are neither a single character nor a special key"""
+    if len(key_name) != 1 and key_name not in SPECIAL_KEYS:
+        raise ValueError(f"Invalid key: {key_name}")
+
+
+class PynputKey:
+    """A key resolved once for the pynput backend
+
+    down() and up() emit its events: native events prepared in advance where
+    the platform allows it (XTEST on X11, SendInput on Windows), otherwise
+    pynput's Controller with the KeyCode already looked up.
+    """
+
+    __slots__ = ('name', 'code', 'down', 'up')
+
+    def __init__(self, name, code, down, up):
+        self.name = name
+        self.code = code
+        self.down = down
+        self.up = up
+
+
+class PynputBackend(OutputBackend):
+    """Output through pynput's keyboard Controller (XTest on X11, SendInput on Windows)
+
+    Resolved keys are cached by name. The Controller re-resolves a key on
+    every press (scanning the whole Key enum, and on X11 looking up the
+    keysym and the focused window), so keys are sent natively when the
+    platform allows it. The cache is dropped when the keyboard layout changes.
+    """
+
+    name = "pynput"
+
+    def __init__(self):
+        try:
+            from pynput.keyboard import Key, KeyCode, Controller
+            self._controller = Controller()
+        except Exception as e:
+            # pynput raises backend specific errors when no display is available
+            raise BackendError(f"pynput backend unavailable: {e}")
+        self._key_code = KeyCode
+        # Every Key member's KeyCode, looked up once
+        self._key_codes = {key.name: key.value for key in Key}
+        self._native = _native_keys(self._controller)
+        self._layout = self._native.layout() if self._native is not None else None
+        self._handles = {}  # key name -> PynputKey for the current layout
+
+    def resolve_key(self, key_name):
+        """Translate a key name into a cached PynputKey"""
+        if self._native is not None:
+            layout = self._native.layout()
+            if layout != self._layout:
+                # Keycodes depend on the layout; resolve every key again
+                self._layout = layout
+                self._handles.clear()
+        handle = self._handles.get(key_name)
+        if handle is None:
+            handle = self._handles[key_name] = self._create_handle(key_name)
+        return handle
+
+    def _create_handle(self, key_name):
+        """Look up a key name and prepare its events"""
+        if len(key_name) == 1:
+            code = self._key_code.from_char(key_name)
+        elif key_name.startswith(VK_PREFIX):
+            try:
+                code = self._key_code.from_vk(int(key_name[len(VK_PREFIX):], 0))
+            except ValueError:
+                raise ValueError(f"Invalid virtual key code: {key_name}")
+        elif key_name in self._key_codes:
+            code = self._key_codes[key_name]
+        else:
+            raise ValueError(f"Invalid key: {key_name}")
+        events = self._native.prepare(code) if self._native is not None else None
+        if events is None:
+            controller = self._controller
+            events = (functools.partial(controller.press, code), functools.partial(controller.release, code))
+        return PynputKey(key_name, code, *events)
+
+    def press(self, handle):
+        """Press a resolved key"""
+        handle.down()
+
+    def release(self, handle):
+        """Release a resolved key"""
+        handle.up()
+
+
+def _native_keys(controller):
+    """Native key events for pynput's platform backend, or None to send through the Controller"""
+    module = type(controller).__module__
+    try:
+        if module.endswith('_xorg'):
+            return XTestKeys()
+        if module.endswith('_win32'):
+            return SendInputKeys()
+    except Exception:
+        # Missing XTEST, or pynput internals that changed; the Controller still works
+        pass
+    return None
+
+
+class XTestKeys:
+    """X11 key events sent through the XTEST extension, keycodes looked up once per layout"""
+
+    def __init__(self):
+        import Xlib.display
+        import Xlib.X
+        import Xlib.XK
+        from Xlib.ext import xtest
+
+        display = Xlib.display.Display()
+        if not display.has_extension('XTEST'):
+            display.close()
+            raise BackendError("XTEST extension not available")
+        self._display = display
+        self._fake_input = xtest.fake_input
+        self._key_press = Xlib.X.KeyPress
+        self._key_release = Xlib.X.KeyRelease
+        self._mapping_notify = Xlib.X.MappingNotify
+        self._shift_keysym = Xlib.XK.XK_Shift_L
+        self._generation = 0
+
+    def layout(self):
+        """Number of keyboard mapping changes announced by the X server so far"""
+        display = self._display
+        while display.pending_events():
+            event = display.next_event()
+            if event.type == self._mapping_notify:
+                display.refresh_keyboard_mapping(event)
+                self._generation += 1
+        return self._generation
+
+    def prepare(self, code):
+        """(down, up) senders for a pynput KeyCode, or None when no key of the layout types it"""
+        if code.vk is not None:
+            keysym = code.vk
+        else:
+            ordinal = ord(code.char)
+            keysym = ordinal if ordinal < 0x100 else ordinal | 0x01000000
+        display = self._display
+        for keycode, index in display.keysym_to_keycodes(keysym):
+            if index == 0:
+                codes = (keycode,)
+                break
+            if index == 1:
+                codes = (display.keysym_to_keycode(self._shift_keysym), keycode)
+                break
+        else:
+            # Other shift levels and groups are left to pynput's key borrowing
+            return None
+        down = [(self._key_press, keycode) for keycode in codes]
+        up = [(self._key_release, keycode) for keycode in reversed(codes)]
+        return self._sender(down), self._sender(up)
+
+    def _sender(self, events):
+        """Function sending a fixed list of XTEST events"""
+        fake_input = self._fake_input
+        display = self._display
+
+        def send():
+            for event_type, keycode in events:
+                fake_input(display, event_type, keycode)
+            display.flush()
+        return send
+
+
+class SendInputKeys:
+    """Windows key events as INPUT structures built once per layout and sent with SendInput"""
+
+    def __init__(self):
+        import ctypes
+        # pynput's SendInput bindings; KeyCode._parameters() maps characters
+        # through the current layout (VkKeyScan)
+        from pynput._util.win32 import INPUT, INPUT_union, KEYBDINPUT, SendInput
+
+        self._ctypes = ctypes
+        self._user32 = ctypes.windll.user32
+        self._input = INPUT
+        self._input_union = INPUT_union
+        self._keybdinput = KEYBDINPUT
+        self._send_input = SendInput
+
+    def layout(self):
+        """Keyboard layout (HKL) that characters are currently mapped with"""
+        return self._user32.GetKeyboardLayout(0)
+
+    def prepare(self, code):
+        """(down, up) senders for a pynput KeyCode, or None when it needs more than one INPUT"""
+        try:
+            down = self._sender(code._parameters(True))
+            up = self._sender(code._parameters(False))
+        except ValueError:
+            # Characters outside the Basic Multilingual Plane need surrogate pairs
+            return None
+        return down, up
+
+    def _sender(self, parameters):
+        """Function sending one prepared INPUT structure"""
+        ctypes = self._ctypes
+        structure = self._input(type=self._input.KEYBOARD,
+                                value=self._input_union(ki=self._keybdinput(**parameters)))
+        reference = ctypes.byref(structure)
+        size = ctypes.sizeof(self._input)
+        send_input = self._send_input
+
+        def send():
+            send_input(1, reference, size)
+        return send
+
+
+# Linux input event constants (linux/input-event-codes.h, linux/uinput.h)
+EV_SYN = 0x00
+EV_KEY = 0x01
+SYN_REPORT = 0
+UI_SET_EVBIT = 0x40045564
+UI_SET_KEYBIT = 0x40045565
+UI_DEV_CREATE = 0x5501
+UI_DEV_DESTROY = 0x5502
+BUS_VIRTUAL = 0x06
+
+KEY_LEFTSHIFT = 42
+
+_UINPUT_SPECIAL_CODES = {
+    'enter': 28, 'space': 57, 'tab': 15, 'backspace': 14, 'delete': 111, 'esc': 1,
+    'shift': 42, 'ctrl': 29, 'alt': 56,
+    'up': 103, 'down': 108, 'left': 105, 'right': 106,
+    'f1': 59, 'f2': 60, 'f3': 61, 'f4': 62, 'f5': 63, 'f6': 64,
+    'f7': 65, 'f8': 66, 'f9': 67, 'f10': 68, 'f11': 87, 'f12': 88,
+}
+
+# Unshifted characters of a US layout
+_UINPUT_CHAR_CODES = {
+    '1': 2, '2': 3, '3': 4, '4': 5, '5': 6, '6': 7, '7': 8, '8': 9, '9': 10, '0': 11,
+    '-': 12, '=': 13, 'q': 16, 'w': 17, 'e': 18, 'r': 19, 't': 20, 'y': 21,
+    'u': 22, 'i': 23, 'o': 24, 'p': 25, '[': 26, ']': 27, 'a': 30, 's': 31,
+    'd': 32, 'f': 33, 'g': 34, 'h': 35, 'j': 36, 'k': 37, 'l': 38, ';': 39,
+    "'": 40, '`': 41, '\\': 43, 'z': 44, 'x': 45, 'c': 46, 'v': 47, 'b': 48,
+    'n': 49, 'm': 50, ',': 51, '.': 52, '/': 53, ' ': 57, '\t': 15, '\n': 28,
+}
+
+# Characters typed with shift held, mapped to their unshifted key
+_UINPUT_SHIFTED_CHARS = dict(zip('!@#$%^&*()_+{}:"~|<>?', '1234567890-=[];\'`\\,./'))
+
+
+def _input_event(ev_type, code, value):
+    """Encode a struct input_event; the kernel fills in the timestamp"""
+    return struct.pack('llHHi', 0, 0, ev_type, code, value)
+
+
+_SYN = _input_event(EV_SYN, SYN_REPORT, 0)
+
+
+class UinputKey:
+    """Pre-encoded input_event batches for one key on a uinput device"""
+
+    __slots__ = ('codes', 'down', 'up', 'tap')
+
+    def __init__(self, codes):
+        self.codes = codes
+        self.down = b''.join(_input_event(EV_KEY, code, 1) for code in codes) + _SYN
+        self.up = b''.join(_input_event(EV_KEY, code, 0) for code in reversed(codes)) + _SYN
+        self.tap = self.down + self.up
+
+
+class UinputBackend(OutputBackend):
+    """Direct writes to a virtual keyboard created through /dev/uinput (Linux only)"""
+
+    name = "uinput"
+    DEVICE_PATH = "/dev/uinput"
+    DEVICE_NAME = b"Auto Key Clicker"
+    SETTLE_TIME = 0.2  # seconds for the desktop to pick up the new device
+
+    def __init__(self, device_path=None):
+        if not sys.platform.startswith('linux'):
+            raise BackendError("uinput backend is only available on Linux")
+
+        import fcntl
+        self._fcntl = fcntl
+        self._fd = None
+        path = device_path or self.DEVICE_PATH
+        try:
+            self._fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+            fcntl.ioctl(self._fd, UI_SET_EVBIT, EV_KEY)
+            fcntl.ioctl(self._fd, UI_SET_EVBIT, EV_SYN)
+            for code in sorted(set(_UINPUT_SPECIAL_CODES.values()) | set(_UINPUT_CHAR_CODES.values())):
+                fcntl.ioctl(self._fd, UI_SET_KEYBIT, code)
+
+            # struct uinput_user_dev: name, input_id, ff_effects_max, abs arrays
+            user_dev = struct.pack('80sHHHHi', self.DEVICE_NAME, BUS_VIRTUAL, 0x1, 0x1, 1, 0)
+            user_dev += b'\0' * (4 * 64 * 4)
+            os.write(self._fd, user_dev)
+            fcntl.ioctl(self._fd, UI_DEV_CREATE)
+        except OSError as e:
+            self.close()
+            raise BackendError(f"uinput backend unavailable: {e}")
+
+        time.sleep(self.SETTLE_TIME)
+
+    def resolve_key(self, key_name):
+        """Translate a key name into a pre-encoded UinputKey"""
+        _validate_key_name(key_name)
+        if key_name in _UINPUT_SPECIAL_CODES:
+            return UinputKey((_UINPUT_SPECIAL_CODES[key_name],))
+        if key_name in _UINPUT_CHAR_CODES:
+            return UinputKey((_UINPUT_CHAR_CODES[key_name],))
+        if key_name.lower() in _UINPUT_CHAR_CODES:
+            return UinputKey((KEY_LEFTSHIFT, _UINPUT_CHAR_CODES[key_name.lower()]))
+        if key_name in _UINPUT_SHIFTED_CHARS:
+            return UinputKey((KEY_LEFTSHIFT, _UINPUT_CHAR_CODES[_UINPUT_SHIFTED_CHARS[key_name]]))
+        raise ValueError(f"Key not available on uinput backend: {key_name}")
+
+    def press(self, handle):
+        """Press a resolved key"""
+        os.write(self._fd, handle.down)
+
+    def release(self, handle):
+        """Release a resolved key"""
+        os.write(self._fd, handle.up)
+
+    def tap(self, handle):
+        """Press and release a resolved key with a single write()"""
+        os.write(self._fd, handle.tap)
+
+    def close(self):
+        """Destroy the virtual device"""
+        if self._fd is None:
+            return
+        try:
+            self._fcntl.ioctl(self._fd, UI_DEV_DESTROY)
+        except OSError:
+            pass
+        os.close(self._fd)
+        self._fd = None
+
+
+class NullBackend(OutputBackend):
+    """Discards all output; only counts presses"""
+
+    name = "null"
+
+    def __init__(self):
+        self.presses = 0
+
+    def resolve_key(self, key_name):
+        """Validate the key name and use it as the handle"""
+        _validate_key_name(key_name)
+        return key_name
+
+    def press(self, handle):
+        """Count a press"""
+        self.presses += 1
+
+    def release(self, handle):
+        """Ignore a release"""
+
+
+class RecordingBackend(NullBackend):
+    """Records every event with its timestamp for inspection"""
+
+    name = "recording"
+
+    def __init__(self, clock=time.perf_counter):
+        super().__init__()
+        self.clock = clock
+        self.events = []  # (timestamp, "press" | "release", handle)
+
+    def press(self, handle):
+        """Record a press"""
+        self.presses += 1
+        self.events.append((self.clock(), "press", handle))
+
+    def release(self, handle):
+        """Record a release"""
+        self.events.append((self.clock(), "release", handle))
+
+
+BACKENDS = {
+    'pynput': PynputBackend,
+    'uinput': UinputBackend,
+    'null': NullBackend,
+    'recording': RecordingBackend,
+}
+
+# Tried in order by the "auto" backend
+AUTO_BACKEND_ORDER = ('pynput', 'uinput')
+
+
+def create_backend(name=None):
+    """Create an output backend by name; None reads KEY_CLICKER_BACKEND"""
+    if name is None:
+        name = os.environ.get(BACKEND_ENV_VAR, DEFAULT_BACKEND)
+    name = name.strip().lower()
+
+    if name == 'auto':
+        errors = []
+        for candidate in AUTO_BACKEND_ORDER:
+            try:
+                return BACKENDS[candidate]()
+            except BackendError as e:
+                errors.append(str(e))
+        raise BackendError("No output backend available: " + "; ".join(errors))
+
+    backend_class = BACKENDS.get(name)
+    if backend_class is None:
+        raise BackendError(f"Unknown output backend: {name} (choose from auto, {', '.join(BACKENDS)})")
+    return backend_class()
@@ -0,0 +1,363 @@
+"""
+Headless Auto Key Clicker
+Command line / daemon front end for the click engine.
+
+Only the engine and the output backend are imported here, never tkinter,
+PIL or pystray, so it starts instantly on headless boxes and under Xvfb.
+"""
+
+import argparse
+import signal
+import sys
+import threading
+import time
+
+import clicker_engine
+from clicker_backends import BackendError, create_backend
+from clicker_delays import DISTRIBUTIONS
+from clicker_metrics import write_metrics
+from clicker_realtime import DEFAULT_RT_PRIORITY, RT_POLICIES, RealtimeSettings, parse_cpus
+from clicker_schedule import format_time, make_window
+
+# Seconds between metrics file rewrites during a run
+METRICS_WRITE_INTERVAL = 5.0
+
+
+def build_parser():
+    """Create the command line parser shared with the key_clicker entry point"""
+    parser = argparse.ArgumentParser(
+        prog="key_clicker",
+        description="Auto Key Clicker. Starts the GUI unless --key, --sequence, --replay, --type, "
+                    "--type-file, --job or --record is given.",
+    )
+    gui = parser.add_argument_group("GUI mode")
+    gui.add_argument("--startup-profile", action="store_true",
+                     help="print per-phase startup timings once the GUI is fully up")
+    engine = parser.add_argument_group("engine scheduling (both modes)")
+    engine.add_argument("--engine", default=None,
+                        help="where jobs run: thread (in this process) or process (a separate engine "
+                             "process, immune to front end GIL stalls) (default: $KEY_CLICKER_ENGINE or thread)")
+    engine.add_argument("--cpus", metavar="LIST",
+                        help="pin the engine thread to these CPUs, e.g. 2 or 2-3 (Linux)")
+    engine.add_argument("--rt-policy", choices=RT_POLICIES,
+                        help="run the engine thread under SCHED_FIFO or SCHED_RR when permitted (Linux)")
+    engine.add_argument("--rt-priority", type=int, default=DEFAULT_RT_PRIORITY,
+                        help="real-time priority for --rt-policy, 1-99 (default: %(default)s)")
+    engine.add_argument("--timerfd", action="store_true",
+                        help="sleep on a timerfd between presses (Linux, Python 3.13+)")
+    engine.add_argument("--control", metavar="SOCKET",
+                        help="serve the JSON control API on this Unix domain socket path")
+    headless = parser.add_argument_group("headless mode")
+    headless.add_argument("--headless", action="store_true",
+                          help="run without the GUI even without a job, e.g. to add jobs through --control")
+    target = headless.add_mutually_exclusive_group()
+    target.add_argument("--key", help="key to press: a character or a special key name (enter, f6, ...)")
+    target.add_argument("--sequence",
+                        help="macro to repeat, e.g. 'ctrl+c@0.05~0.2, ctrl+v, enter' (--interval is the default delay)")
+    target.add_argument("--replay", metavar="TRACE",
+                        help="replay a recorded keystroke trace with its original timing")
+    target.add_argument("--record", metavar="TRACE",
+                        help="record global keystrokes to a trace file until Ctrl+C")
+    target.add_argument("--type", metavar="TEXT", help="type a text at --cps characters per second")
+    target.add_argument("--type-file", metavar="PATH",
+                        help="type a UTF-8 text file at --cps characters per second, read as typing goes")
+    headless.add_argument("--loops", type=int, default=1,
+                          help="times to play --replay, 0 for forever (default: %(default)s)")
+    headless.add_argument("--start-event", type=int, default=0, metavar="INDEX",
+                          help="event index to start --replay at, to resume an interrupted run")
+    headless.add_argument("--cps", type=float, default=10.0,
+                          help="characters per second for --type and --type-file (default: %(default)s)")
+    headless.add_argument("--start-offset", type=int, default=0, metavar="BYTES",
+                          help="byte offset to start --type or --type-file at, to resume an interrupted run")
+    headless.add_argument("--job", action="append", default=[], metavar="KEY:INTERVAL[:LIMIT]",
+                          help="additional concurrent job on the same scheduler thread; repeatable")
+    headless.add_argument("--interval", type=float, default=1.0,
+                          help="seconds between presses (default: %(default)s)")
+    headless.add_argument("--distribution", choices=DISTRIBUTIONS, default='fixed',
+                          help="humanize key delays around --interval (default: %(default)s)")
+    headless.add_argument("--jitter", type=float, default=0.0, metavar="SECONDS",
+                          help="spread of uniform delays, standard deviation of normal and lognormal ones")
+    headless.add_argument("--fit-trace", metavar="TRACE",
+                          help="recorded trace whose press gaps the empirical distribution resamples")
+    headless.add_argument("--limit", type=int, default=0,
+                          help="stop after this many presses (sequence steps), 0 for unlimited (default: %(default)s)")
+    headless.add_argument("--burst", action="store_true",
+                          help=f"allow intervals below {clicker_engine.MIN_INTERVAL}s, bounded by --rate-cap")
+    headless.add_argument("--rate-cap", type=float, default=clicker_engine.DEFAULT_BURST_RATE_CAP,
+                          help="burst mode ceiling in presses/s (default: %(default)s)")
+    headless.add_argument("--backend", default=None,
+                          help="output backend: auto, pynput, uinput, null (default: $KEY_CLICKER_BACKEND or auto)")
+    headless.add_argument("--metrics-file", metavar="PATH",
+                          help="write run metrics periodically and at exit: Prometheus text format "
+                               "if PATH ends in .prom, JSON otherwise")
+    headless.add_argument("--quiet", action="store_true", help="do not print the run summary")
+    window = parser.add_argument_group("run window (headless mode)",
+                                       "TIME is HH:MM[:SS[.fff]], an ISO date and time, a Unix timestamp or +SECONDS")
+    window.add_argument("--at", metavar="TIME", help="start every job at this wall-clock time")
+    window.add_argument("--align", type=float, metavar="SECONDS",
+                        help="start on the next multiple of SECONDS since the Unix epoch (after --at, if given), "
+                             "e.g. 60 for the next full minute")
+    end = window.add_mutually_exclusive_group()
+    end.add_argument("--duration", type=float, metavar="SECONDS", help="stop each window after SECONDS")
+    end.add_argument("--until", metavar="TIME", help="stop the window at this wall-clock time; with --every this sets every window's length")
+    window.add_argument("--every", type=float, metavar="SECONDS",
+                        help="open a new window every SECONDS after the start")
+    window.add_argument("--windows", type=int, default=0, metavar="N",
+                        help="number of windows to run with --every, 0 for no limit (default: %(default)s)")
+    return parser
+
+
+def parse_job_spec(text):
+    """Parse a --job value KEY:INTERVAL[:LIMIT] into create_job keyword arguments"""
+    parts = text.rsplit(':', 2)
+    if len(parts) == 3 and parts[0] == '' and parts[1] == '':
+        # ':' itself as the key, without a limit
+        parts = [':', parts[2]]
+    try:
+        if len(parts) == 3:
+            try:
+                return dict(key=parts[0], interval=float(parts[1]), limit=int(parts[2]))
+            except ValueError:
+                parts = text.rsplit(':', 1)
+        if len(parts) == 2:
+            return dict(key=parts[0], interval=float(parts[1]))
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid job '{text}', expected KEY:INTERVAL[:LIMIT]")
+
+
+def save_metrics(path, jobs):
+    """Write the metrics file, reporting failures without ending the run"""
+    try:
+        write_metrics(path, jobs)
+    except OSError as e:
+        print(f"Error: failed to write metrics: {e}", file=sys.stderr)
+
+
+def realtime_settings(args):
+    """RealtimeSettings from the engine scheduling options; raises ValueError"""
+    cpus = parse_cpus(args.cpus) if args.cpus else None
+    return RealtimeSettings(cpus, args.rt_policy, args.rt_priority, args.timerfd)
+
+
+def run_window(args):
+    """RunWindow from the run window options, or None to start right away; raises ValueError"""
+    return make_window(args.at, args.align, args.duration, args.until, args.every, args.windows)
+
+
+def report_window(job):
+    """Print a job's window changes"""
+    if not job.waiting:
+        print(f"{job.name}: window opened", file=sys.stderr)
+        return
+    if job.stats is not None:
+        print(f"{job.name}: window closed after {job.count} presses. {job.stats.summary()}", file=sys.stderr)
+    print(f"{job.name}: next window opens at {format_time(job.next_start)}", file=sys.stderr)
+
+
+def report_realtime(status):
+    """Print what could not be applied of the requested engine scheduling"""
+    for warning in status.warnings:
+        print(f"Warning: {warning}", file=sys.stderr)
+
+
+def is_headless(args):
+    """Whether the parsed arguments ask for a headless run"""
+    # Empty values still count, so the CLI reports them instead of starting the GUI
+    options = (args.key, args.sequence, args.replay, args.type, args.type_file, args.record)
+    return bool(any(option is not None for option in options) or args.job or args.headless)
+
+
+def run_record(path):
+    """Record keystrokes to path until SIGINT/SIGTERM. Returns an exit code"""
+    from clicker_trace import TraceRecorder
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    try:
+        recorder = TraceRecorder(path)
+        recorder.start()
+    except Exception as e:
+        # pynput raises backend specific errors when no display is available
+        print(f"Error: cannot record: {e}", file=sys.stderr)
+        return 1
+    print(f"Recording to {path}, press Ctrl+C to stop", file=sys.stderr)
+    try:
+        while not stop.wait(0.5):
+            pass
+    finally:
+        recorder.stop()
+    print(f"Recorded {recorder.count} events to {path}")
+    return 0
+
+
+def run_headless(args):
+    """Run the requested jobs on one scheduler until they finish or a signal arrives. Returns an exit code"""
+    if args.record is not None:
+        return run_record(args.record)
+    try:
+        specs = []
+        if args.key is not None or args.sequence is not None or args.replay is not None:
+            specs.append(dict(key=args.key, sequence=args.sequence, interval=args.interval, limit=args.limit))
+            if args.replay is not None:
+                specs[0].update(trace=args.replay, loops=args.loops, start_event=args.start_event)
+        if args.type is not None or args.type_file is not None:
+            if args.cps <= 0:
+                raise ValueError("--cps must be positive")
+            specs.append(dict(text=args.type, text_file=args.type_file, start_offset=args.start_offset,
+                              interval=1.0 / args.cps, limit=args.limit))
+        specs.extend(parse_job_spec(text) for text in args.job)
+        if not specs and not args.control:
+            raise ValueError("--headless without a job needs --control to add jobs through")
+        if args.distribution != 'fixed':
+            for spec in specs:
+                spec.update(distribution=args.distribution, jitter=args.jitter, fit_trace=args.fit_trace)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    try:
+        engine = clicker_engine.engine_mode(args.engine)
+        realtime = realtime_settings(args)
+        window = run_window(args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    if realtime.is_default:
+        realtime = None
+
+    backend = None
+    try:
+        if engine == "process":
+            # The backend lives in the engine process with the jobs
+            from clicker_process import ProcessScheduler
+            scheduler = ProcessScheduler(args.backend, realtime)
+            backend_name = scheduler.backend_name
+        else:
+            backend = create_backend(args.backend)
+            backend_name = backend.name
+            scheduler = clicker_engine.JobScheduler(realtime=realtime)
+    except BackendError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    scheduler.on_realtime = report_realtime
+
+    finished = threading.Event()
+    lock = threading.Lock()
+    remaining = [len(specs)]
+    errors = []
+
+    def on_finish(job, reason, detail):
+        with lock:
+            if reason == "error":
+                errors.append(f"{job.name}: {detail}")
+            remaining[0] -= 1
+            if remaining[0] == 0 and not args.control:
+                # With --control the instance keeps serving until a signal or "shutdown"
+                finished.set()
+
+    def create(name, spec):
+        if backend is None:
+            job = scheduler.create_job(name, **spec)
+        else:
+            job = clicker_engine.create_job(backend, name, **spec)
+        job.on_finish = on_finish
+        if not args.quiet:
+            job.on_window = report_window
+        return job
+
+    server = None
+    controller = None
+
+    def all_jobs():
+        # The API adds and removes jobs; metrics and the summary cover whatever is there
+        return list(controller.jobs.values()) if controller is not None else jobs
+
+    try:
+        try:
+            jobs = [create(f"job{i + 1}", dict(spec, burst=args.burst, rate_cap=args.rate_cap))
+                    for i, spec in enumerate(specs)]
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+
+        if args.control:
+            # Imported here so runs without --control never load asyncio
+            from clicker_control import ControlError, ControlServer, EngineController
+            controller = EngineController(scheduler, create)
+            for job in jobs:
+                controller.add(job.name, job)
+            controller.on_shutdown = finished.set
+            try:
+                server = ControlServer(args.control, controller)
+                server.start()
+            except ControlError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return 1
+
+        def request_stop(signum, frame):
+            for job in all_jobs():
+                scheduler.stop_job(job)
+            if args.control:
+                finished.set()
+
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGTERM, request_stop)
+
+        try:
+            for job in jobs:
+                scheduler.start_job(job, window)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+        if not args.quiet and jobs and jobs[0].waiting and jobs[0].next_start > time.time():
+            print(f"Waiting for the window at {format_time(jobs[0].next_start)}", file=sys.stderr)
+
+        # Timed waits keep signal handlers responsive on every platform
+        next_write = clicker_engine.clock() + METRICS_WRITE_INTERVAL
+        while not finished.wait(0.5):
+            if args.metrics_file and clicker_engine.clock() >= next_write:
+                save_metrics(args.metrics_file, all_jobs())
+                next_write += METRICS_WRITE_INTERVAL
+    finally:
+        if server is not None:
+            server.close()
+        scheduler.shutdown()
+        if backend is not None:
+            backend.close()
+
+    jobs = all_jobs()
+    if args.metrics_file:
+        save_metrics(args.metrics_file, jobs)
+
+    for error in errors:
+        print(f"Error: {error}", file=sys.stderr)
+    for job in jobs:
+        if getattr(job, 'unsupported', None):
+            print(f"Warning: {job.name} skipped keys the {backend_name} backend cannot send: "
+                  f"{', '.join(sorted(job.unsupported))}", file=sys.stderr)
+        if getattr(job, 'position', 0):
+            print(f"{job.name} stopped before event {job.position}; continue with --start-event {job.position}",
+                  file=sys.stderr)
+        if getattr(job, 'offset', 0):
+            print(f"{job.name} stopped before byte {job.offset}; continue with --start-offset {job.offset}",
+                  file=sys.stderr)
+    if not args.quiet:
+        for job in jobs:
+            summary = job.stats.summary() if job.stats is not None else "No statistics."
+            print(f"{job.name} ({job.description}): {job.count} presses via {backend_name} backend. {summary}")
+    return 1 if errors else 0
+
+
+def main(argv=None):
+    """Entry point for headless runs"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not is_headless(args):
+        parser.error("--key, --sequence, --replay, --type, --type-file, --record, --job or --headless "
+                     "is required in headless mode")
+    return run_headless(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
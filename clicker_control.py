@@ -0,0 +1,471 @@
+"""
+Control API
+Local JSON control interface served over a Unix domain socket.
+
+Every line a client sends is one JSON request, answered by one JSON line:
+
+    {"id": 1, "command": "start", "job": "job1"}
+    {"id": 1, "ok": true, "result": {"name": "job1", "running": true, ...}}
+
+Requests on one connection are answered in order. "subscribe" additionally
+streams {"event": "metrics", ...} lines every interval seconds until
+"unsubscribe" or until the connection closes.
+
+The server runs an asyncio loop on its own thread. Counter and statistics
+queries read the jobs' shared counters right there, so a round trip costs
+little more than the socket and JSON work. A controller may defer commands
+to its front end's thread by returning a concurrent.futures.Future.
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import os
+import socket
+import stat
+import threading
+import time
+
+from clicker_engine import RateMeter
+from clicker_metrics import job_metrics
+from clicker_schedule import make_window
+
+
+# Keyword arguments of clicker_engine.create_job accepted by "configure", with their types
+JOB_OPTIONS = {
+    'key': str, 'sequence': str, 'trace': str, 'text': str, 'text_file': str, 'fit_trace': str,
+    'distribution': str, 'interval': float, 'rate_cap': float, 'jitter': float,
+    'limit': int, 'loops': int, 'start_event': int, 'start_offset': int, 'burst': bool,
+}
+
+# Options that may be null (create_job's default for them is None)
+NULLABLE_OPTIONS = ('key', 'sequence', 'trace', 'text', 'text_file', 'fit_trace', 'rate_cap')
+
+_TYPE_NAMES = {str: "a string", float: "a number", int: "an integer", bool: "true or false"}
+
+# Bounds of a subscription's update interval, in seconds
+MIN_SUBSCRIBE_INTERVAL = 0.05
+DEFAULT_SUBSCRIBE_INTERVAL = 1.0
+
+
+class ControlError(Exception):
+    """Raised when the control socket cannot be served"""
+
+
+class EngineController:
+    """Control commands over a scheduler and a set of named jobs
+
+    create(name, spec) builds a job from create_job keyword arguments. Every
+    command runs on the server thread; the scheduler calls are thread safe.
+    """
+
+    def __init__(self, scheduler, create):
+        self.scheduler = scheduler
+        self.create = create
+        self.jobs = {}  # name -> job
+        self.results = {}  # name -> (reason, detail) of the last finished run
+        self.on_shutdown = None  # on_shutdown(), called on the server thread
+        self.commands = {
+            'ping': self.ping,
+            'list': self.list_jobs,
+            'status': self.status,
+            'configure': self.configure,
+            'start': self.start,
+            'stop': self.stop,
+            'pause': self.pause,
+            'resume': self.resume,
+            'remove': self.remove,
+            'shutdown': self.shutdown,
+        }
+
+    def call(self, command, params):
+        """Run a command with the request's parameters; returns a JSON-ready result or a Future"""
+        handler = self.commands.get(command)
+        if handler is None:
+            raise ValueError(f"Unknown command '{command}', expected one of: "
+                             f"{', '.join(self.commands)}, subscribe, unsubscribe")
+        return handler(**params)
+
+    def add(self, name, job):
+        """Register a job under a name, keeping track of how its runs end"""
+        previous = job.on_finish
+
+        def on_finish(job, reason, detail):
+            self.results[name] = (reason, detail)
+            if previous is not None:
+                previous(job, reason, detail)
+
+        job.on_finish = on_finish
+        self.jobs[name] = job
+
+    def named_jobs(self):
+        """name -> job for every job the API can see"""
+        return self.jobs
+
+    def job(self, name):
+        """The job registered under name; raises ValueError"""
+        try:
+            return self.named_jobs()[name]
+        except KeyError:
+            raise ValueError(f"Unknown job '{name}'")
+
+    def describe(self, name, job):
+        """Full status of a job: settings, state, counter and run statistics"""
+        info = job_metrics(job)
+        info.update(name=name, paused=job.paused, waiting=job.waiting, next_start=job.next_start,
+                    limit=job.limit)
+        if name in self.results:
+            info['finished'], info['detail'] = self.results[name]
+        return info
+
+    def snapshot(self, names, meters):
+        """Live figures of the named jobs (all when names is None) for a subscription"""
+        now = time.perf_counter()
+        jobs = []
+        for name, job in list(self.named_jobs().items()):
+            if names is not None and name not in names:
+                continue
+            count = job.count
+            meter = meters.get(name)
+            if meter is None:
+                meter = meters[name] = RateMeter()
+            entry = {
+                'name': name,
+                'running': job.running,
+                'paused': job.paused,
+                'waiting': job.waiting,
+                'count': count,
+                'rate': meter.sample(count, now) if job.running and not job.waiting else 0.0,
+            }
+            stats = job.stats
+            if stats is not None:
+                entry.update(achieved_rate=stats.mean_rate, jitter=stats.jitter,
+                             max_lateness=stats.max_lateness, overruns=stats.overruns, skipped=stats.skipped)
+            jobs.append(entry)
+        return jobs
+
+    def ping(self):
+        """Server time, to check that the instance is alive"""
+        return {'time': time.time()}
+
+    def list_jobs(self):
+        """Status of every job"""
+        return [self.describe(name, job) for name, job in list(self.named_jobs().items())]
+
+    def status(self, job):
+        """Status of one job"""
+        return self.describe(job, self.job(job))
+
+    def configure(self, job, start=False, **spec):
+        """Create or replace a job from create_job options, optionally starting it"""
+        check_options(spec)
+        spec.setdefault('interval', 1.0)
+        created = self.create(job, spec)
+        old = self.jobs.get(job)
+        if old is not None:
+            self.scheduler.stop_job(old)
+        self.results.pop(job, None)
+        self.add(job, created)
+        if start:
+            self.scheduler.start_job(created)
+        return self.describe(job, created)
+
+    def start(self, job, at=None, align=None, duration=None, until=None, every=None, windows=0):
+        """Start a job now, or in a run window given like the --at ... --windows options"""
+        window = make_window(at, align, duration, until, every, windows)
+        target = self.job(job)
+        self.scheduler.start_job(target, window)
+        return self.describe(job, target)
+
+    def stop(self, job):
+        """Stop a running, paused or waiting job"""
+        target = self.job(job)
+        self.scheduler.stop_job(target)
+        return self.describe(job, target)
+
+    def pause(self, job):
+        """Pause a running job"""
+        target = self.job(job)
+        self.scheduler.pause_job(target)
+        return self.describe(job, target)
+
+    def resume(self, job):
+        """Resume a paused job"""
+        target = self.job(job)
+        self.scheduler.resume_job(target)
+        return self.describe(job, target)
+
+    def remove(self, job):
+        """Stop a job and forget it"""
+        target = self.job(job)
+        self.scheduler.stop_job(target)
+        del self.jobs[job]
+        self.results.pop(job, None)
+        return None
+
+    def shutdown(self):
+        """Ask the front end to exit"""
+        if self.on_shutdown is None:
+            raise ValueError("This instance cannot be shut down remotely")
+        self.on_shutdown()
+        return None
+
+
+def check_options(spec):
+    """Reject job options create_job does not take or of the wrong type, in place; raises ValueError
+
+    Whole-valued numbers are accepted for integer options and integers for
+    number options; they are converted to the type create_job expects.
+    """
+    unknown = set(spec) - set(JOB_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unknown job option(s): {', '.join(sorted(unknown))}")
+    for option, value in spec.items():
+        expected = JOB_OPTIONS[option]
+        if value is None and option in NULLABLE_OPTIONS:
+            continue
+        if expected is float and isinstance(value, (int, float)) and not isinstance(value, bool):
+            spec[option] = float(value)
+        elif expected is int and isinstance(value, float) and value.is_integer():
+            spec[option] = int(value)
+        elif not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+            raise ValueError(f"Job option '{option}' must be {_TYPE_NAMES[expected]}, not {json.dumps(value)}")
+
+
+class ControlServer:
+    """Serves a controller on a Unix domain socket from an asyncio loop on its own thread"""
+
+    def __init__(self, path, controller):
+        self.path = path
+        self.controller = controller
+        self._loop = None
+        self._thread = None
+
+    def start(self):
+        """Bind the socket and start serving; raises ControlError"""
+        sock = self._bind()
+        self._loop = asyncio.new_event_loop()
+        started = concurrent.futures.Future()
+        self._thread = threading.Thread(target=self._serve, args=(sock, started), name="ControlServer",
+                                        daemon=True)
+        self._thread.start()
+        started.result()
+
+    def _bind(self):
+        """Listening socket at path, readable by the current user only"""
+        if not hasattr(socket, 'AF_UNIX'):
+            raise ControlError("Unix domain sockets are not available on this platform")
+        path = self.path
+        try:
+            if stat.S_ISSOCK(os.stat(path).st_mode):
+                probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                try:
+                    probe.connect(path)
+                except OSError:
+                    # Left behind by an instance that did not shut down cleanly
+                    os.unlink(path)
+                else:
+                    raise ControlError(f"Another instance is already serving {path}")
+                finally:
+                    probe.close()
+        except FileNotFoundError:
+            pass
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Create the socket file private from the start; a chmod after bind
+        # would leave a moment in which other users could connect
+        umask = os.umask(0o077)
+        try:
+            sock.bind(path)
+            sock.listen()
+        except OSError as e:
+            sock.close()
+            raise ControlError(f"Cannot listen on {path}: {e.strerror or e}")
+        finally:
+            os.umask(umask)
+        return sock
+
+    def _serve(self, sock, started):
+        """Server thread: run the asyncio loop until close()"""
+        loop = self._loop
+        asyncio.set_event_loop(loop)
+        try:
+            server = loop.run_until_complete(asyncio.start_unix_server(self._handle_client, sock=sock))
+        except Exception as e:
+            sock.close()
+            loop.close()
+            started.set_exception(ControlError(f"Cannot serve {self.path}: {e}"))
+            return
+        started.set_result(None)
+        try:
+            loop.run_forever()
+        finally:
+            server.close()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.close()
+
+    def close(self, timeout=1.0):
+        """Stop serving and remove the socket file"""
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    async def _handle_client(self, reader, writer):
+        """Answer one connection's requests in order"""
+        subscriptions = {}  # subscription id -> streaming task
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    # Over-long line or reset connection
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                response = await self._respond(line, writer, subscriptions)
+                _write(writer, response)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # Cancelled when the server closes; the connection ends either way
+            pass
+        finally:
+            for task in subscriptions.values():
+                task.cancel()
+            writer.close()
+
+    async def _respond(self, line, writer, subscriptions):
+        """Run one request and build its response"""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:
+            return {'id': None, 'ok': False, 'error': f"Invalid request: {e}"}
+        request_id = request.pop('id', None)
+        command = request.pop('command', None)
+        try:
+            if command == 'subscribe':
+                result = self._subscribe(writer, subscriptions, **request)
+            elif command == 'unsubscribe':
+                result = self._unsubscribe(subscriptions, **request)
+            else:
+                result = self.controller.call(command, request)
+                if isinstance(result, concurrent.futures.Future):
+                    result = await asyncio.wrap_future(result)
+        except Exception as e:
+            # Bad parameters arrive as TypeError, bad values as ValueError; the server keeps going either way
+            return {'id': request_id, 'ok': False, 'error': str(e)}
+        return {'id': request_id, 'ok': True, 'result': result}
+
+    def _subscribe(self, writer, subscriptions, interval=DEFAULT_SUBSCRIBE_INTERVAL, jobs=None):
+        """Start streaming metrics events on this connection; returns the subscription id"""
+        interval = max(float(interval), MIN_SUBSCRIBE_INTERVAL)
+        names = set(jobs) if jobs is not None else None
+        subscription = len(subscriptions) + 1
+        while subscription in subscriptions:
+            subscription += 1
+        subscriptions[subscription] = asyncio.ensure_future(self._stream(writer, subscription, interval, names))
+        return {'subscription': subscription, 'interval': interval}
+
+    def _unsubscribe(self, subscriptions, subscription):
+        """Stop a subscription of this connection"""
+        task = subscriptions.pop(subscription, None)
+        if task is None:
+            raise ValueError(f"Unknown subscription {subscription}")
+        task.cancel()
+        return None
+
+    async def _stream(self, writer, subscription, interval, names):
+        """Write a metrics event every interval seconds, on a fixed grid"""
+        loop = asyncio.get_running_loop()
+        meters = {}
+        deadline = loop.time()
+        try:
+            while True:
+                event = {
+                    'event': 'metrics',
+                    'subscription': subscription,
+                    'time': time.time(),
+                    'jobs': self.controller.snapshot(names, meters),
+                }
+                _write(writer, event)
+                await writer.drain()
+                deadline += interval
+                await asyncio.sleep(max(0.0, deadline - loop.time()))
+        except ConnectionError:
+            pass
+
+
+def _write(writer, message):
+    """Queue one JSON line on a stream"""
+    writer.write(json.dumps(message, separators=(',', ':')).encode() + b'\n')
+
+
+class ControlClient:
+    """Blocking client for scripts and benchmarks
+
+        with ControlClient("/tmp/key_clicker.sock") as client:
+            client.call("start", job="job1")
+    """
+
+    def __init__(self, path, timeout=5.0):
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(path)
+        self._file = self._sock.makefile('rb')
+        self._ids = 0
+        self.events = []  # metrics events received while waiting for a response
+
+    def call(self, command, **params):
+        """Send a request and return its result; raises ValueError with the server's error"""
+        self._ids += 1
+        request = dict(params, id=self._ids, command=command)
+        self._sock.sendall(json.dumps(request, separators=(',', ':')).encode() + b'\n')
+        while True:
+            message = self._read()
+            if 'event' in message:
+                self.events.append(message)
+            elif message.get('id') == self._ids:
+                break
+        if not message['ok']:
+            raise ValueError(message['error'])
+        return message['result']
+
+    def next_event(self):
+        """The next metrics event of a subscription"""
+        if self.events:
+            return self.events.pop(0)
+        while True:
+            message = self._read()
+            if 'event' in message:
+                return message
+
+    def _read(self):
+        """The next message from the server"""
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Control connection closed")
+        return json.loads(line)
+
+    def close(self):
+        """Close the connection"""
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
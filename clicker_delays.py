@@ -0,0 +1,143 @@
+"""
+Delay Distributions
+Humanized press intervals drawn from a random distribution.
+
+Delays are generated a batch at a time, vectorized with NumPy when it is
+installed and with the random module otherwise, and handed out one by one
+from the batch. The scheduler's hot loop therefore does a list iterator
+step per press instead of running an RNG and the distribution math.
+
+Every distribution has the job interval as its mean:
+
+    uniform    interval +/- jitter, evenly spread
+    normal     standard deviation jitter
+    lognormal  standard deviation jitter, skewed towards short delays
+    empirical  gaps between presses of a recorded trace, resampled and
+               scaled to the interval
+"""
+
+import math
+import random
+
+
+DISTRIBUTIONS = ('fixed', 'uniform', 'normal', 'lognormal', 'empirical')
+
+# Delays generated per refill; the pure Python fallback refills in smaller
+# batches so one refill never stalls the scheduler thread for long
+DELAY_BATCH = 4096
+FALLBACK_DELAY_BATCH = 1024
+
+_numpy = None
+
+
+def optional_numpy():
+    """The numpy module, or None when it is not installed (imported on first use)"""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+
+class DelaySampler:
+    """Endless stream of delays, produced in batches by draw(n)"""
+
+    def __init__(self, name, draw, batch):
+        self.name = name
+        self._draw = draw
+        self.batch = batch
+        self._take = iter(draw(batch)).__next__
+
+    def next(self):
+        """The next delay in seconds"""
+        try:
+            return self._take()
+        except StopIteration:
+            self._take = iter(self._draw(self.batch)).__next__
+            return self._take()
+
+
+def create_sampler(distribution, interval, jitter=0.0, floor=0.0, samples=None, batch=None):
+    """Build a DelaySampler with mean interval, or None for fixed delays
+
+    Delays below floor (the flooding protection minimum) are raised to it.
+    samples are the recorded gaps for the empirical distribution. batch
+    defaults to DELAY_BATCH with NumPy and FALLBACK_DELAY_BATCH without.
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown delay distribution '{distribution}', "
+                         f"expected one of: {', '.join(DISTRIBUTIONS)}")
+    if jitter < 0:
+        raise ValueError("Jitter must be 0 or positive")
+    if distribution == 'fixed':
+        return None
+    if distribution == 'empirical':
+        if not samples or len(samples) < 2:
+            raise ValueError("The empirical distribution needs a trace with at least 3 presses")
+        mean = sum(samples) / len(samples)
+        if mean <= 0:
+            raise ValueError("The trace's presses all happen at the same instant")
+        scale = interval / mean
+    elif jitter == 0:
+        return None
+
+    numpy = optional_numpy()
+    if batch is None:
+        batch = DELAY_BATCH if numpy is not None else FALLBACK_DELAY_BATCH
+    if numpy is not None:
+        rng = numpy.random.default_rng()
+        if distribution == 'uniform':
+            def generate(n):
+                return rng.uniform(interval - jitter, interval + jitter, n)
+        elif distribution == 'normal':
+            def generate(n):
+                return rng.normal(interval, jitter, n)
+        elif distribution == 'lognormal':
+            sigma, mu = _lognormal_params(interval, jitter)
+
+            def generate(n):
+                return rng.lognormal(mu, sigma, n)
+        else:
+            recorded = numpy.asarray(samples, dtype=float) * scale
+
+            def generate(n):
+                return rng.choice(recorded, n)
+
+        def draw(n):
+            return numpy.maximum(generate(n), floor).tolist()
+    else:
+        rng = random.Random()
+        if distribution == 'uniform':
+            low, high = interval - jitter, interval + jitter
+            uniform = rng.uniform
+
+            def draw(n):
+                return [max(floor, uniform(low, high)) for _ in range(n)]
+        elif distribution == 'normal':
+            gauss = rng.gauss
+
+            def draw(n):
+                return [max(floor, gauss(interval, jitter)) for _ in range(n)]
+        elif distribution == 'lognormal':
+            sigma, mu = _lognormal_params(interval, jitter)
+            lognormvariate = rng.lognormvariate
+
+            def draw(n):
+                return [max(floor, lognormvariate(mu, sigma)) for _ in range(n)]
+        else:
+            recorded = [max(floor, gap * scale) for gap in samples]
+            choices = rng.choices
+
+            def draw(n):
+                return choices(recorded, k=n)
+
+    return DelaySampler(distribution, draw, batch)
+
+
+def _lognormal_params(mean, deviation):
+    """(sigma, mu) of the log-normal distribution with the given mean and standard deviation"""
+    sigma = math.sqrt(math.log1p((deviation / mean) ** 2))
+    return sigma, math.log(mean) - sigma * sigma / 2
@@ -0,0 +1,1072 @@
+"""
+Click Engine
+Deadline-based job scheduler shared by the Auto Key Clicker front ends.
+
+Every job (a repeated key, a sequence, a recorded trace, ...) runs on one scheduler thread
+that keeps a heap of next deadlines, so any number of concurrent cadences
+cost a single thread. Run windows (clicker_schedule) open and close jobs
+through the same heap.
+"""
+
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+
+from clicker_delays import create_sampler
+from clicker_metrics import Histogram
+from clicker_realtime import Wakeup, apply_realtime
+from clicker_sequence import parse_sequence, compile_sequence
+from clicker_text import TextSource, characters, key_batches, key_name, read_chunks
+from clicker_trace import PRESS, code_name, open_trace
+
+
+# Engine clock: monotonic and high resolution on every supported platform
+clock = time.perf_counter
+
+# Busy-wait for the final stretch before each deadline; Event.wait()
+# alone overshoots by up to a scheduler tick
+SPIN_THRESHOLD = 0.001  # seconds
+
+# Protections against system flooding
+MIN_INTERVAL = 0.01            # seconds, outside burst mode
+DEFAULT_BURST_RATE_CAP = 2000  # presses per second
+MAX_BURST_RATE_CAP = 5000      # hard ceiling for the configurable cap
+
+# Burst mode fires several presses per scheduler tick instead of one wait per press
+BURST_TICK = 0.01  # seconds between scheduler ticks in burst mode
+
+# Window openings are converted from the wall clock to the engine clock once
+# more this long before they are due, so clock slewing during a long wait
+# cannot shift them, and at least every WALL_CLOCK_RECHECK seconds so a
+# stepped wall clock is noticed
+WALL_CLOCK_RESYNC = 1.0   # seconds
+WALL_CLOCK_RECHECK = 60.0  # seconds
+
+# What a scheduler heap entry does when its deadline comes
+_FIRE, _OPEN, _CLOSE, _RESYNC = range(4)
+
+# Where jobs run: on a scheduler thread in this process, or in a separate
+# engine process (clicker_process) that front end work cannot stall
+ENGINES = ('thread', 'process')
+DEFAULT_ENGINE = 'thread'
+ENGINE_ENV_VAR = "KEY_CLICKER_ENGINE"
+
+
+class RunStats:
+    """Timing statistics collected over a single run, in constant memory"""
+
+    def __init__(self, interval, tick_interval=None, scheduled=False):
+        self.interval = interval
+        self.tick_interval = interval if tick_interval is None else tick_interval
+        # Sequences and traces space their presses unevenly, so a run that ends
+        # mid-cycle is measured against the rate of its own schedule instead
+        # of the cycle average
+        self.scheduled = scheduled
+        self.presses = 0
+        self.ticks = 0
+        self.first_press = None
+        self.last_press = None
+        self.first_deadline = None
+        self.last_deadline = None
+        self._last_batch = 0
+        self.max_lateness = 0.0
+        # Running mean/variance of tick lateness (Welford)
+        self._lateness_mean = 0.0
+        self._lateness_m2 = 0.0
+        self.lateness = Histogram()
+        # Ticks that started after the following tick was already due, and
+        # ticks skipped entirely after falling whole intervals behind
+        self.overruns = 0
+        self.skipped = 0
+        # Seconds spent inside the output backend
+        self.backend_time = 0.0
+        # Seconds spent paused, excluded from the measured rate
+        self.paused_time = 0.0
+        # Real-time scheduling in effect, e.g. 'SCHED_FIFO 10, CPUs 2'; None when not configured
+        self.scheduling = None
+
+    def record(self, deadline, now, presses=1):
+        """Record a tick of presses that was due at deadline and started at now"""
+        if self.first_press is None:
+            self.first_press = now
+            self.first_deadline = deadline
+        self.last_press = now
+        self.last_deadline = deadline
+        self.presses += presses
+        self.ticks += 1
+        self._last_batch = presses
+
+        lateness = now - deadline
+        delta = lateness - self._lateness_mean
+        self._lateness_mean += delta / self.ticks
+        self._lateness_m2 += delta * (lateness - self._lateness_mean)
+        if lateness > self.max_lateness:
+            self.max_lateness = lateness
+        self.lateness.observe(lateness)
+        if lateness > self.tick_interval:
+            self.overruns += 1
+
+    @property
+    def elapsed(self):
+        """Seconds between the first and the last press, excluding pauses"""
+        if self.first_press is None:
+            return 0.0
+        return self.last_press - self.first_press - self.paused_time
+
+    @property
+    def mean_rate(self):
+        """Measured presses per second"""
+        if self.ticks < 2 or self.elapsed <= 0:
+            return 0.0
+        # The final tick's presses fall after the measured span
+        return (self.presses - self._last_batch) / self.elapsed
+
+    @property
+    def target_rate(self):
+        """Configured presses per second, over the same presses as mean_rate for scheduled runs"""
+        if self.scheduled and self.ticks >= 2:
+            span = self.last_deadline - self.first_deadline - self.paused_time
+            if span > 0:
+                return (self.presses - self._last_batch) / span
+        return 1.0 / self.interval if self.interval > 0 else 0.0
+
+    @property
+    def jitter(self):
+        """Standard deviation of tick lateness in seconds"""
+        if self.ticks < 2:
+            return 0.0
+        return math.sqrt(self._lateness_m2 / (self.ticks - 1))
+
+    @property
+    def backend_time_per_press(self):
+        """Mean seconds spent in the output backend per press"""
+        return self.backend_time / self.presses if self.presses else 0.0
+
+    def to_dict(self):
+        """Snapshot of every statistic as a plain dictionary"""
+        return {
+            'presses': self.presses,
+            'ticks': self.ticks,
+            'elapsed': self.elapsed,
+            'target_rate': self.target_rate,
+            'achieved_rate': self.mean_rate,
+            'jitter': self.jitter,
+            'max_lateness': self.max_lateness,
+            'lateness': self.lateness.to_dict(),
+            'overruns': self.overruns,
+            'skipped': self.skipped,
+            'backend_time': self.backend_time,
+            'backend_time_per_press': self.backend_time_per_press,
+            'paused_time': self.paused_time,
+            'scheduling': self.scheduling,
+        }
+
+    def summary(self):
+        """Short human readable description of the run"""
+        if self.ticks < 2:
+            return f"Last run: {self.presses} press(es)"
+        summary = (f"Last run: {self.mean_rate:.2f}/s of {self.target_rate:.2f}/s, "
+                   f"jitter {self.jitter * 1000:.3f} ms")
+        if self.scheduling is not None:
+            summary += f" ({self.scheduling})"
+        return summary
+
+
+def engine_mode(name=None):
+    """Validate an engine name; None selects $KEY_CLICKER_ENGINE or DEFAULT_ENGINE"""
+    if name is None:
+        name = os.environ.get(ENGINE_ENV_VAR, DEFAULT_ENGINE)
+    name = name.lower()
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine '{name}', expected one of: {', '.join(ENGINES)}")
+    return name
+
+
+def burst_batch_size(interval, tick=BURST_TICK):
+    """Number of presses to fire per scheduler tick for the given interval"""
+    if interval >= tick:
+        return 1
+    return max(1, int(round(tick / interval)))
+
+
+def validate_timing(interval, burst=False, rate_cap=None):
+    """Check an interval against the flooding protections and return the burst batch size"""
+    if not burst:
+        if interval < MIN_INTERVAL:
+            raise ValueError(f"Interval must be at least {MIN_INTERVAL} seconds "
+                             "(use burst mode for faster rates)")
+        return 1
+
+    if rate_cap is None:
+        rate_cap = DEFAULT_BURST_RATE_CAP
+    if not 0 < rate_cap <= MAX_BURST_RATE_CAP:
+        raise ValueError(f"Rate cap must be between 0 and {MAX_BURST_RATE_CAP} presses/s")
+    if interval < 1.0 / rate_cap:
+        raise ValueError(f"Interval must be at least {1.0 / rate_cap:g} seconds "
+                         f"with a rate cap of {rate_cap:g}/s")
+    return burst_batch_size(interval)
+
+
+def create_job(backend, name, interval, limit=0, key=None, sequence=None, burst=False, rate_cap=None,
+               trace=None, loops=1, start_event=0, distribution='fixed', jitter=0.0, fit_trace=None,
+               text=None, text_file=None, start_offset=0):
+    """Validate settings and build a KeyJob, SequenceJob, TraceJob or TextJob with keys resolved on backend
+
+    trace is the path of a recorded trace, replayed loops times (0 = forever)
+    starting at event index start_event; interval is not used for traces.
+    text, or the file text_file, is typed one character per interval from
+    byte offset start_offset.
+    distribution and jitter humanize a single key's delays around interval
+    (see clicker_delays); the empirical distribution is fit from the press
+    gaps of the trace at fit_trace.
+    """
+    if limit < 0:
+        raise ValueError("Press limit must be 0 or positive")
+    typing = text is not None or text_file is not None
+    if distribution != 'fixed' and (trace is not None or sequence is not None or typing):
+        raise ValueError("Delay distributions apply to single key jobs only")
+
+    if trace is not None:
+        if loops < 0:
+            raise ValueError("Loops must be 0 or positive")
+        try:
+            recording = open_trace(trace)
+        except OSError as e:
+            raise ValueError(f"Cannot read trace: {e}")
+        job = TraceJob(name, recording, backend, loops, limit, description=os.path.basename(trace))
+        job.seek(start_event)
+        validate_timing(job.interval, burst=burst, rate_cap=rate_cap)
+        return job
+
+    if typing:
+        source = TextSource(text, text_file)
+        batch = validate_timing(interval, burst=burst, rate_cap=rate_cap)
+        job = TextJob(name, source, backend, interval, limit, batch, description=f"text {source.description}")
+        job.seek(start_offset)
+        return job
+
+    if sequence is not None:
+        # Compile once: keys resolved, steps laid out on a timeline
+        compiled = compile_sequence(parse_sequence(sequence), backend, interval)
+        validate_timing(compiled.step_interval, burst=burst, rate_cap=rate_cap)
+        return SequenceJob(name, compiled, limit, description=sequence)
+
+    if not key:
+        raise ValueError("Please enter a key")
+    batch = validate_timing(interval, burst=burst, rate_cap=rate_cap)
+    samples = None
+    if distribution == 'empirical':
+        if not fit_trace:
+            raise ValueError("The empirical distribution needs a trace to fit")
+        try:
+            recording = open_trace(fit_trace)
+        except OSError as e:
+            raise ValueError(f"Cannot read trace: {e}")
+        try:
+            samples = recording.press_gaps()
+        finally:
+            recording.close()
+    # Humanized delays never undercut the flooding protection
+    floor = 1.0 / (rate_cap or DEFAULT_BURST_RATE_CAP) if burst else MIN_INTERVAL
+    delays = create_sampler(distribution, interval, jitter, floor, samples)
+
+    # Resolve the target key once for the whole run
+    handle = backend.resolve_key(key)
+    tap = backend.tap
+
+    def tap_key():
+        tap(handle)
+
+    description = key if delays is None else f"{key}, {distribution} delays"
+    return KeyJob(name, tap_key, interval, limit, batch, description=description, delays=delays)
+
+
+class RateMeter:
+    """Derives a smoothed presses/s figure from periodic samples of a job counter"""
+
+    def __init__(self, smoothing=0.3):
+        self.smoothing = smoothing
+        self.rate = 0.0
+        self._last_count = None
+        self._last_time = None
+
+    def reset(self):
+        """Forget previous samples"""
+        self.rate = 0.0
+        self._last_count = None
+        self._last_time = None
+
+    def sample(self, count, now=None):
+        """Feed the current counter value and return the smoothed rate"""
+        if now is None:
+            now = clock()
+        if self._last_count is not None and now > self._last_time and count >= self._last_count:
+            instant = (count - self._last_count) / (now - self._last_time)
+            self.rate += self.smoothing * (instant - self.rate)
+        self._last_count = count
+        self._last_time = now
+        return self.rate
+
+
+class Job:
+    """Base class for work multiplexed onto a JobScheduler
+
+    Subclasses implement begin() and fire(). Both run on the scheduler thread
+    (begin() runs on the caller's thread while the job is not scheduled).
+    """
+
+    # Presses follow an uneven schedule (see RunStats.scheduled)
+    scheduled = False
+
+    def __init__(self, name, interval, limit=0):
+        self.name = name
+        self.interval = interval
+        self.tick_interval = interval
+        self.limit = limit
+        # Shared counter slot: written only by the scheduler thread, sampled
+        # by front ends whenever they redraw (no messages per press)
+        self.count = 0
+        self.stats = None
+        self.running = False
+        self.paused = False
+        self.paused_at = None
+        # Run window (clicker_schedule.RunWindow): while waiting, the job is
+        # running but its next window has not opened yet
+        self.window = None
+        self.waiting = False
+        self.next_start = None  # wall-clock time the next window opens
+        self.window_end = None  # engine clock deadline of the open window's end
+        self._window_index = 0
+        # Invoked on the scheduler thread for control events only
+        # on_finish reason: "limit", "end of text" (TextJob ran out of text), "window", "stopped" or "error"
+        self.on_finish = None  # on_finish(job, reason, detail)
+        self.on_window = None  # on_window(job) when a window opens, or closes with another one to come
+        self.end_reason = "limit"  # on_finish reason when fire() returns None
+        self._generation = 0
+        self._release_pending = False  # stopped or paused, abort() not yet run
+        # Held by the scheduler thread around fire(), and by any thread calling
+        # begin(), resume() or abort(), so a restart never races a tick in flight
+        self._lock = threading.Lock()
+
+    def begin(self, now):
+        """Reset counters for a new run and return the first deadline"""
+        self.count = 0
+        self.stats = RunStats(self.interval, self.tick_interval, self.scheduled)
+        return now
+
+    def resume(self, now):
+        """Continue a paused run on a new grid from now, keeping counters; return the first deadline"""
+        self.stats.paused_time += now - self.paused_at
+        return now
+
+    def fire(self, deadline, now):
+        """Perform the work due at deadline and return the next deadline, or None when done"""
+        raise NotImplementedError
+
+    def abort(self):
+        """Clean up after an early stop (e.g. release held keys)"""
+
+
+class KeyJob(Job):
+    """Taps one key every interval seconds, batch presses per tick in burst mode
+
+    With delays (a clicker_delays.DelaySampler) each tick is followed by a
+    random delay instead, averaging interval.
+    """
+
+    def __init__(self, name, tap, interval, limit=0, batch=1, description="", delays=None):
+        super().__init__(name, interval, limit)
+        self.tap = tap
+        self.batch = batch
+        self.tick_interval = interval * batch
+        self.description = description
+        self.delays = delays
+
+    def fire(self, deadline, now):
+        """Tap the key for this tick and schedule the next one"""
+        presses = self.batch
+        if self.limit > 0:
+            presses = min(presses, self.limit - self.count)
+        tap = self.tap
+        start = clock()
+        if presses == 1:
+            tap()
+        else:
+            for done in range(presses):
+                if not self.running:
+                    # Stopped mid-batch (e.g. by a hotkey): drop the rest of the tick
+                    presses = done
+                    break
+                tap()
+        stats = self.stats
+        stats.backend_time += clock() - start
+        self.count += presses
+        stats.record(deadline, now, presses)
+
+        if self.limit > 0 and self.count >= self.limit:
+            return None
+
+        # Advance on the absolute grid so time spent pressing never accumulates
+        tick = self.tick_interval
+        if self.delays is None:
+            next_deadline = deadline + tick
+        else:
+            next_deadline = deadline + self.delays.next() * self.batch
+        if now - next_deadline > tick:
+            # Fell whole ticks behind (e.g. system suspend): skip the missed
+            # slots instead of firing them all back to back
+            missed = (now - next_deadline) // tick
+            next_deadline += missed * tick
+            stats.skipped += int(missed)
+        return next_deadline
+
+
+class SequenceJob(Job):
+    """Plays a CompiledSequence over and over; count and limit are in steps"""
+
+    scheduled = True
+
+    def __init__(self, name, sequence, limit=0, description=""):
+        super().__init__(name, sequence.step_interval, limit)
+        self.sequence = sequence
+        self.description = description
+        self._index = 0
+        self._base = 0.0
+
+    def begin(self, now):
+        """Start a new pass at the first event"""
+        super().begin(now)
+        self._index = 0
+        self._base = now
+        return now + self.sequence.events[0][0]
+
+    def fire(self, deadline, now):
+        """Play every event due at deadline"""
+        sequence = self.sequence
+        events = sequence.events
+        stats = self.stats
+        index = self._index
+        while True:
+            offset, action, handle, ends_step = events[index]
+            start = clock()
+            action(handle)
+            stats.backend_time += clock() - start
+            if ends_step:
+                self.count += 1
+                stats.record(self._base + offset, now)
+                if self.limit > 0 and self.count >= self.limit:
+                    self._index = 0
+                    return None
+
+            index += 1
+            if index == len(events):
+                index = 0
+                self._base += sequence.duration
+                if now - self._base > sequence.duration:
+                    # Fell whole passes behind: skip them instead of replaying back to back
+                    missed = (now - self._base) // sequence.duration
+                    self._base += missed * sequence.duration
+                    stats.skipped += int(missed)
+
+            next_deadline = self._base + events[index][0]
+            if next_deadline > deadline:
+                self._index = index
+                return next_deadline
+
+    def resume(self, now):
+        """Continue a paused run from the start of a pass"""
+        super().resume(now)
+        self._index = 0
+        self._base = now
+        return now + self.sequence.events[0][0]
+
+    def abort(self):
+        """Never leave a chord held down"""
+        index = self._index
+        for held in reversed(self.sequence.held_after[index - 1] if index else ()):
+            self.sequence.release(held)
+        self._index = 0
+
+
+class TraceJob(Job):
+    """Replays a recorded Trace with its original timing; count and limit are in presses
+
+    Late events are played back to back instead of being skipped, so a
+    recording is never replayed with keystrokes missing. position is the
+    index of the next event; seek() to it to resume an interrupted run.
+    """
+
+    scheduled = True
+
+    def __init__(self, name, trace, backend, loops=1, limit=0, description=""):
+        super().__init__(name, trace.duration_ns / 1e9 / max(1, trace.presses), limit)
+        self.trace = trace
+        self.loops = loops
+        self.description = description
+        self.unsupported = set()  # key names the backend could not resolve
+        self._backend = backend
+        self._handles = {}  # trace key code -> backend handle, or None if unsupported
+        self._held = set()
+        self.start_event = 0
+        self._index = 0
+        self._base = 0.0
+        self._pass = 0
+
+    @property
+    def position(self):
+        """Index of the next event to play"""
+        return self._index
+
+    def seek(self, index):
+        """Start the next run at an event index"""
+        if not 0 <= index < len(self.trace):
+            raise ValueError(f"Start event must be between 0 and {len(self.trace) - 1}")
+        self.start_event = index
+
+    def _resolve(self, code):
+        """Resolve a trace key code once; side-specific modifiers fall back to the generic key"""
+        name = code_name(code)
+        candidates = [name]
+        if name.endswith(('_l', '_r')):
+            candidates.append(name[:-2])
+        for candidate in candidates:
+            try:
+                handle = self._backend.resolve_key(candidate)
+                break
+            except ValueError:
+                continue
+        else:
+            handle = None
+            self.unsupported.add(name)
+        self._handles[code] = handle
+        return handle
+
+    def begin(self, now):
+        """Start playback at start_event; the lead-in before the first event is kept"""
+        super().begin(now)
+        index = self.start_event
+        self._index = index
+        self._held.clear()
+        self._pass = 0
+        if index == 0:
+            self._base = now
+            return now + self.trace.event(0)[0] / 1e9
+        # Resuming: play the start event right away
+        self._base = now - self.trace.event(index)[0] / 1e9
+        return now
+
+    def resume(self, now):
+        """Continue at the next event, shifted by the length of the pause"""
+        super().resume(now)
+        self._base += now - self.paused_at
+        return self._base + self.trace.event(self._index)[0] / 1e9
+
+    def fire(self, deadline, now):
+        """Play every event due at deadline"""
+        trace = self.trace
+        event = trace.event
+        length = len(trace)
+        handles = self._handles
+        backend = self._backend
+        stats = self.stats
+        index = self._index
+        while True:
+            time_ns, code, event_type = event(index)
+            handle = handles[code] if code in handles else self._resolve(code)
+            if handle is not None:
+                start = clock()
+                if event_type == PRESS:
+                    backend.press(handle)
+                    self._held.add(handle)
+                else:
+                    backend.release(handle)
+                    self._held.discard(handle)
+                stats.backend_time += clock() - start
+                if event_type == PRESS:
+                    self.count += 1
+                    stats.record(self._base + time_ns / 1e9, now)
+                    if self.limit > 0 and self.count >= self.limit:
+                        self._index = (index + 1) % length
+                        return self._done()
+
+            index += 1
+            if index == length:
+                self._pass += 1
+                if self.loops and self._pass >= self.loops:
+                    self._index = 0
+                    return self._done()
+                index = 0
+                self._base += trace.duration_ns / 1e9
+
+            next_deadline = self._base + event(index)[0] / 1e9
+            if next_deadline > deadline:
+                self._index = index
+                return next_deadline
+
+    def _done(self):
+        """Finish the run without leaving keys held down"""
+        self.abort()
+        return None
+
+    def abort(self):
+        """Release every key still held by the recording"""
+        for handle in self._held:
+            self._backend.release(handle)
+        self._held.clear()
+
+
+class TextJob(Job):
+    """Types a TextSource one character every interval seconds; count and limit are in characters
+
+    Characters arrive in batches from a clicker_text pipeline, read from
+    the source only as typing reaches them. offset is the byte offset to
+    continue from (0 once the whole text was typed); seek() to it to resume
+    an interrupted run. Characters the backend cannot type are skipped.
+    """
+
+    def __init__(self, name, source, backend, interval, limit=0, batch=1, description=""):
+        super().__init__(name, interval, limit)
+        self.source = source
+        self.batch = batch
+        self.tick_interval = interval * batch
+        self.description = description
+        self.unsupported = set()  # characters the backend could not resolve
+        self.start_offset = 0
+        self.offset = 0
+        self._backend = backend
+        self._handles = {}  # character -> backend handle, or None if skipped
+        self._batches = None
+        self._keys = ()
+        self._index = 0
+
+    def seek(self, offset):
+        """Start the next run at a byte offset of the text"""
+        if not 0 <= offset < self.source.size:
+            raise ValueError(f"Start offset must be between 0 and {self.source.size - 1}")
+        self.start_offset = offset
+
+    def _resolve(self, char):
+        """Resolve a character once"""
+        handles = self._handles
+        if char in handles:
+            return handles[char]
+        name = key_name(char)
+        handle = None
+        if name is not None:
+            try:
+                handle = self._backend.resolve_key(name)
+            except ValueError:
+                self.unsupported.add(name)
+        handles[char] = handle
+        return handle
+
+    def begin(self, now):
+        """Start typing at start_offset"""
+        super().begin(now)
+        self._close()
+        self.offset = self.start_offset
+        self._batches = key_batches(characters(read_chunks(self.source, self.start_offset)), self._resolve)
+        self._keys = next(self._batches, ())
+        self._index = 0
+        return now
+
+    def fire(self, deadline, now):
+        """Type the characters of this tick and fetch the next batch once one runs out"""
+        presses = self.batch
+        if self.limit > 0:
+            presses = min(presses, self.limit - self.count)
+        tap = self._backend.tap
+        keys = self._keys
+        index = self._index
+        typed = 0
+        start = clock()
+        while typed < presses and keys:
+            handle, offset = keys[index]
+            tap(handle)
+            self.offset = offset
+            typed += 1
+            index += 1
+            if index == len(keys):
+                keys = next(self._batches, ())
+                index = 0
+            if not self.running:
+                # Stopped mid-tick (e.g. by a hotkey)
+                break
+        self._keys = keys
+        self._index = index
+        stats = self.stats
+        stats.backend_time += clock() - start
+        if typed:
+            self.count += typed
+            stats.record(deadline, now, typed)
+
+        if not keys:
+            self.offset = 0
+            self.end_reason = "end of text"
+            return self._done()
+        if self.limit > 0 and self.count >= self.limit:
+            self.end_reason = "limit"
+            return self._done()
+
+        tick = self.tick_interval
+        next_deadline = deadline + tick
+        if now - next_deadline > tick:
+            # Fell whole ticks behind (e.g. system suspend): continue from now
+            # instead of typing the backlog at full speed; no text is dropped
+            next_deadline = now + tick
+        return next_deadline
+
+    def _done(self):
+        """Finish the run and close the text"""
+        self._close()
+        return None
+
+    def _close(self):
+        """Close the pipeline and with it the text file"""
+        if self._batches is not None:
+            self._batches.close()
+            self._batches = None
+        self._keys = ()
+
+    def abort(self):
+        """Close the text after an early stop"""
+        self._close()
+
+
+class JobScheduler:
+    """Runs any number of jobs on one thread, ordered by a heap of next deadlines
+
+    The thread sleeps on an Event (or a timerfd) until shortly before the
+    earliest deadline, then spins for the final stretch. Starting, stopping
+    or pausing a job sets the Event so the heap is re-examined immediately.
+    Jobs started with a RunWindow wait in the same heap for their window to
+    open and get a close entry when it has a duration.
+
+    realtime (a clicker_realtime.RealtimeSettings) pins and prioritizes the
+    scheduler thread; what could actually be applied ends up in
+    realtime_status, on_realtime(status) and each run's stats.scheduling.
+    """
+
+    def __init__(self, spin=SPIN_THRESHOLD, realtime=None):
+        self.spin = spin
+        self._heap = []  # (deadline, sequence number, generation, job, action)
+        self._pending_stops = []  # (job, generation, reason); reason None for a pause
+        self._lock = threading.Lock()
+        self._wakeup = Wakeup()
+        self._counter = itertools.count()
+        self._thread = None
+        self._closed = False
+        self._realtime = realtime  # settings waiting to be applied by the scheduler thread
+        self._scheduling = None  # description copied into each run's stats
+        self.realtime_status = None
+        self.on_realtime = None  # on_realtime(status), called on the scheduler thread
+
+    def start_job(self, job, window=None):
+        """Schedule a job to run from now, or in a RunWindow; ignored if it is already running
+
+        Errors from the job's begin() (e.g. an unreadable text file) are
+        raised here and leave the job stopped.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Scheduler has been shut down")
+            if job.running:
+                return
+            self._release(job)
+            opening = None
+            if window is not None:
+                now = time.time()
+                if window.start is None:
+                    window = window.starting_at(now)
+                opening = window.next_opening(now)
+                if opening is None:
+                    raise ValueError("The run window has already ended")
+        # begin() may open and read files: keep it outside the lock so other
+        # jobs can be stopped or paused meanwhile
+        if opening is None:
+            with job._lock:
+                deadline = job.begin(clock())
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Scheduler has been shut down")
+            if job.running:
+                return
+            job._generation += 1
+            job.running = True
+            job.paused = False
+            job.window = window
+            job.window_end = None
+            if opening is None:
+                job.waiting = False
+                job.next_start = None
+                job.stats.scheduling = self._scheduling
+                self._push(job, deadline, job._generation)
+            else:
+                self._wait_for_window(job, *opening)
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="JobScheduler", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def stop_job(self, job):
+        """Stop a running or paused job; its on_finish callback reports "stopped" """
+        with self._lock:
+            if not (job.running or job.paused):
+                return
+            job.running = False
+            job.paused = False
+            job.waiting = False
+            job.next_start = None
+            job._release_pending = True
+            self._pending_stops.append((job, job._generation, "stopped"))
+        self._wakeup.set()
+
+    def pause_job(self, job):
+        """Suspend a running job, keeping its counters; no on_finish callback is made
+
+        Jobs waiting for their window cannot be paused. The window keeps its
+        end time: a job resumed after it closes goes on to the next window.
+        """
+        with self._lock:
+            if not job.running or job.waiting:
+                return
+            job.running = False
+            job.paused = True
+            job.paused_at = clock()
+            job._release_pending = True
+            self._pending_stops.append((job, job._generation, None))
+        self._wakeup.set()
+
+    def resume_job(self, job):
+        """Continue a paused job from now"""
+        with self._lock:
+            if not job.paused or self._closed:
+                return
+            self._release(job)
+            job._generation += 1
+            job.running = True
+            job.paused = False
+            with job._lock:
+                deadline = job.resume(clock())
+            self._push(job, deadline, job._generation)
+        self._wakeup.set()
+
+    def configure_realtime(self, settings):
+        """Change CPU affinity, priority and timer of the scheduler thread without restarting it"""
+        with self._lock:
+            self._realtime = settings
+        self._wakeup.set()
+
+    def shutdown(self, timeout=1.0):
+        """Stop every job and the scheduler thread"""
+        with self._lock:
+            for _, _, generation, job, _ in self._heap:
+                if job.running and job._generation == generation:
+                    job.running = False
+                    job._release_pending = True
+                    self._pending_stops.append((job, generation, "stopped"))
+            self._closed = True
+            thread = self._thread
+        self._wakeup.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _release(self, job):
+        """Release the keys a stopped or paused run still holds, exactly once (lock held)
+
+        Runs before a restart or resume resets the job's state, even if the
+        scheduler thread has not processed the stop yet.
+        """
+        if job._release_pending:
+            job._release_pending = False
+            with job._lock:
+                job.abort()
+
+    def _finish(self, job, reason, detail=None):
+        """Report the end of a run"""
+        if job.on_finish is not None:
+            job.on_finish(job, reason, detail)
+
+    def _push(self, job, deadline, generation):
+        """Queue a job's next tick, or the end of its window if that comes first (lock held)"""
+        end = job.window_end
+        if end is not None and deadline >= end:
+            heapq.heappush(self._heap, (end, next(self._counter), generation, job, _CLOSE))
+        else:
+            heapq.heappush(self._heap, (deadline, next(self._counter), generation, job, _FIRE))
+
+    def _wait_for_window(self, job, index, opening):
+        """Make a running job wait for the window opening at wall-clock time opening (lock held)"""
+        job.waiting = True
+        job.next_start = opening
+        job._window_index = index
+        self._push_opening(job, job._generation)
+
+    def _push_opening(self, job, generation):
+        """Queue the opening of a job's next window in engine clock time (lock held)
+
+        Far-off openings get a resync entry instead, which converts the
+        wall-clock time again when it comes.
+        """
+        now = clock()
+        deadline = now + (job.next_start - time.time())
+        if deadline - now > WALL_CLOCK_RESYNC:
+            resync = min(deadline - WALL_CLOCK_RESYNC, now + WALL_CLOCK_RECHECK)
+            heapq.heappush(self._heap, (resync, next(self._counter), generation, job, _RESYNC))
+            return
+        duration = job.window.duration
+        job.window_end = None if duration is None else deadline + duration
+        # A window that is already open is joined right away
+        heapq.heappush(self._heap, (max(deadline, now), next(self._counter), generation, job, _OPEN))
+
+    def _open_window(self, job, deadline, generation):
+        """Start a run at the opening of its window"""
+        with self._lock:
+            if not job.running or job._generation != generation:
+                return
+            job.waiting = False
+        try:
+            with job._lock:
+                first = job.begin(deadline)
+        except Exception as e:
+            with self._lock:
+                if job._generation == generation:
+                    job.running = False
+            self._finish(job, "error", str(e))
+            return
+        with self._lock:
+            if not job.running or job._generation != generation:
+                # Stopped while beginning; the pending stop cleans up
+                return
+            job.stats.scheduling = self._scheduling
+            self._push(job, first, generation)
+        if job.on_window is not None:
+            job.on_window(job)
+
+    def _end_run(self, job, generation, reason):
+        """End a run on its limit or window end, waiting for the next window if there is one"""
+        with self._lock:
+            if not job.running or job._generation != generation:
+                return
+            job.window_end = None
+            opening = None
+            if job.window is not None:
+                opening = job.window.next_opening(time.time(), job._window_index + 1)
+            if opening is None:
+                job.running = False
+                job.waiting = False
+                job.next_start = None
+            else:
+                self._wait_for_window(job, *opening)
+        if opening is None:
+            self._finish(job, reason)
+        elif job.on_window is not None:
+            job.on_window(job)
+
+    def _apply_realtime(self, settings):
+        """Apply real-time settings on the scheduler thread and publish the outcome"""
+        status = apply_realtime(settings, self._wakeup, self.realtime_status)
+        self.realtime_status = status
+        scheduling = None if settings.is_default and not status.warnings else status.describe()
+        with self._lock:
+            self._scheduling = scheduling
+            for _, _, _, job, _ in self._heap:
+                if job.stats is not None:
+                    job.stats.scheduling = scheduling
+        if self.on_realtime is not None:
+            self.on_realtime(status)
+
+    def _run(self):
+        """Scheduler thread main loop"""
+        heap = self._heap
+        while True:
+            self._wakeup.clear()
+            with self._lock:
+                stops, self._pending_stops = self._pending_stops, []
+                closed = self._closed
+                realtime, self._realtime = self._realtime, None
+                for job, _, _ in stops:
+                    self._release(job)
+                # Drop entries of jobs that were stopped or restarted
+                while heap and (not heap[0][3].running or heap[0][3]._generation != heap[0][2]):
+                    heapq.heappop(heap)
+                top = heap[0] if heap else None
+
+            for job, generation, reason in stops:
+                if reason is not None and job._generation == generation and not job.running:
+                    self._finish(job, reason)
+            if closed:
+                self._wakeup.close()
+                return
+            if realtime is not None:
+                self._apply_realtime(realtime)
+                continue
+            if top is None:
+                self._wakeup.wait()
+                continue
+
+            deadline, _, generation, job, action = top
+            remaining = deadline - clock()
+            if remaining > self.spin:
+                # Coarse sleep; any start/stop wakes us to re-examine the heap
+                self._wakeup.wait(remaining - self.spin)
+                continue
+            while clock() < deadline:
+                pass
+
+            with self._lock:
+                if not heap or heap[0] is not top:
+                    continue
+                heapq.heappop(heap)
+                if not job.running or job._generation != generation:
+                    # Stopped, or stopped and restarted, while we spun
+                    continue
+                if action == _RESYNC:
+                    self._push_opening(job, generation)
+                    continue
+
+            if action == _OPEN:
+                self._open_window(job, deadline, generation)
+                continue
+            if action == _CLOSE:
+                with job._lock:
+                    try:
+                        job.abort()
+                    except Exception:
+                        pass
+                self._end_run(job, generation, "window")
+                continue
+
+            with job._lock:
+                if not job.running or job._generation != generation:
+                    # Stopped (and maybe restarted) since the entry was popped;
+                    # the stop has released, or will release, its keys
+                    continue
+                now = clock()
+                try:
+                    next_deadline = job.fire(deadline, now)
+                    failure = None
+                except Exception as e:
+                    failure = e
+                    try:
+                        job.abort()
+                    except Exception:
+                        pass
+            if failure is not None:
+                with self._lock:
+                    if job._generation == generation:
+                        job.running = False
+                self._finish(job, "error", str(failure))
+                continue
+
+            if next_deadline is None:
+                self._end_run(job, generation, job.end_reason)
+                continue
+
+            with self._lock:
+                if job.running and job._generation == generation:
+                    self._push(job, next_deadline, generation)
@@ -0,0 +1,2734 @@
+"""
+Modern Auto Key Clicker GUI
+Dark-themed tkinter front end with system tray support.
+"""
+
+import tkinter as tk
+from tkinter import ttk, font
+import threading
+import os
+import platform
+import queue
+import clicker_engine
+from clicker_engine import JobScheduler, RateMeter, create_job
+from clicker_backends import SPECIAL_KEYS, BackendError, create_backend
+from clicker_delays import DISTRIBUTIONS
+from clicker_realtime import RT_POLICIES, RealtimeSettings, format_cpus, parse_cpus
+from clicker_schedule import format_time, make_window
+from clicker_hotkeys import HotkeyListener
+from clicker_trace import TRACE_EXTENSION, TraceRecorder
+from clicker_metrics import RateHistory, write_metrics
+
+# pynput (hotkeys), PIL and pystray (tray icon) are imported on demand by the
+# background startup stage so the window appears before they load
+
+
+class FontCache(dict):
+    """Creates named fonts on first use"""
+    
+    def __init__(self, specs):
+        super().__init__()
+        self._specs = specs
+    
+    def __missing__(self, name):
+        self[name] = font.Font(**self._specs[name])
+        return self[name]
+
+
+class MainThreadNotifier:
+    """Wakes the Tk event loop from other threads without polling
+    
+    On Unix a self-pipe is registered with createfilehandler, so a single
+    byte written by a worker makes Tk call back immediately. Where file
+    handlers are unavailable (Windows) a virtual event is generated instead.
+    """
+    
+    EVENT_NAME = "<<WorkerMessage>>"
+    
+    def __init__(self, root, callback):
+        self.root = root
+        self.callback = callback
+        self._read_fd = None
+        self._write_fd = None
+        
+        if hasattr(root.tk, 'createfilehandler') and hasattr(os, 'set_blocking'):
+            try:
+                self._read_fd, self._write_fd = os.pipe()
+                os.set_blocking(self._read_fd, False)
+                os.set_blocking(self._write_fd, False)
+                root.tk.createfilehandler(self._read_fd, tk.READABLE, self._on_readable)
+                return
+            except (OSError, tk.TclError):
+                self._close_pipe()
+        
+        root.bind(self.EVENT_NAME, lambda e: self.callback())
+    
+    def notify(self):
+        """Request a callback on the Tk thread (safe from any thread)"""
+        if self._write_fd is not None:
+            try:
+                os.write(self._write_fd, b'\0')
+            except BlockingIOError:
+                # Pipe is full, so a wakeup is already pending
+                pass
+        else:
+            self.root.event_generate(self.EVENT_NAME, when="tail")
+    
+    def _on_readable(self, fd, mask):
+        """Drain the pipe and run the callback"""
+        try:
+            while os.read(fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        self.callback()
+    
+    def _close_pipe(self):
+        """Close both ends of the self-pipe"""
+        for fd in (self._read_fd, self._write_fd):
+            if fd is not None:
+                os.close(fd)
+        self._read_fd = self._write_fd = None
+    
+    def close(self):
+        """Unregister the file handler and release the pipe"""
+        if self._read_fd is not None:
+            try:
+                self.root.tk.deletefilehandler(self._read_fd)
+            except tk.TclError:
+                pass
+            self._close_pipe()
+
+
+class RateSparkline:
+    """Live presses/s graph of a RateHistory on a Canvas
+    
+    The graph is one line item (plus a text item for its scale) created up
+    front; redraw() moves the line's points with coords() instead of
+    deleting and recreating canvas items, and only runs when the history
+    gains a figure.
+    """
+    
+    PAD = 3
+    
+    def __init__(self, parent, history, bg, line_color, text_color, font, height=48):
+        self.history = history
+        self.height = height
+        self.width = 1
+        self.canvas = tk.Canvas(parent, height=height, bg=bg, highlightthickness=0)
+        self.line = self.canvas.create_line(0, 0, 0, 0, fill=line_color, width=2, state=tk.HIDDEN)
+        self.scale_text = self.canvas.create_text(0, 0, anchor="ne", fill=text_color, font=font)
+        self.canvas.bind('<Configure>', self.on_resize)
+    
+    def on_resize(self, event):
+        """Stretch the graph to the canvas's new width"""
+        self.width = event.width
+        self.canvas.coords(self.scale_text, event.width - self.PAD, self.PAD)
+        self.redraw()
+    
+    def redraw(self):
+        """Move the line to the history's figures, newest at the right edge"""
+        history = self.history
+        if len(history) < 2:
+            self.canvas.itemconfigure(self.line, state=tk.HIDDEN)
+            self.canvas.itemconfigure(self.scale_text, text="")
+            return
+        values = list(history)
+        peak = max(values)
+        scale = (self.height - 2 * self.PAD) / peak if peak > 0 else 0.0
+        step = (self.width - 2 * self.PAD) / (history.size - 1)
+        x = self.width - self.PAD - (len(values) - 1) * step
+        bottom = self.height - self.PAD
+        points = []
+        for value in values:
+            points.append(x)
+            points.append(bottom - value * scale)
+            x += step
+        self.canvas.coords(self.line, points)
+        self.canvas.itemconfigure(self.line, state=tk.NORMAL)
+        self.canvas.itemconfigure(self.scale_text, text=f"peak {peak:.1f}/s")
+
+
+class ScrollableFrame:
+    """A frame that scrolls vertically once its contents outgrow the window
+    
+    Widgets go into inner, which sits in a Canvas and keeps the canvas's
+    width. The mouse wheel scrolls it while the pointer is over it.
+    """
+    
+    def __init__(self, parent, bg):
+        self.outer = tk.Frame(parent, bg=bg)
+        self.canvas = tk.Canvas(self.outer, bg=bg, highlightthickness=0, borderwidth=0)
+        self.scrollbar = ttk.Scrollbar(self.outer, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.inner = tk.Frame(self.canvas, bg=bg)
+        self.window = self.canvas.create_window(0, 0, window=self.inner, anchor="nw")
+        
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.inner.bind('<Configure>', self.on_inner_resize)
+        self.canvas.bind('<Configure>', self.on_canvas_resize)
+        # Windows and macOS send <MouseWheel>, X11 buttons 4 and 5
+        self.canvas.bind_all('<MouseWheel>', self.on_wheel, add='+')
+        self.canvas.bind_all('<Button-4>', self.on_wheel, add='+')
+        self.canvas.bind_all('<Button-5>', self.on_wheel, add='+')
+    
+    def on_inner_resize(self, event):
+        """Scroll over the whole height of the contents"""
+        self.canvas.configure(scrollregion=(0, 0, event.width, event.height))
+    
+    def on_canvas_resize(self, event):
+        """Keep the contents as wide as the visible area"""
+        self.canvas.itemconfigure(self.window, width=event.width)
+    
+    def on_wheel(self, event):
+        """Scroll when the wheel turns over the contents and they do not fit"""
+        widget = self.canvas.winfo_containing(event.x_root, event.y_root)
+        if widget is None or not str(widget).startswith(str(self.canvas)):
+            return
+        if self.inner.winfo_height() <= self.canvas.winfo_height():
+            return
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self.canvas.yview_scroll(-1, "units")
+        else:
+            self.canvas.yview_scroll(1, "units")
+
+
+class PooledDialog:
+    """A dark-themed message dialog that is built once and then reused
+    
+    Dismissing it withdraws the window instead of destroying it. Messages
+    shown while it is open queue behind the current one, and a message that
+    is already shown or queued only raises its repeat count, so a burst of
+    identical errors costs a dict lookup each instead of a new window.
+    """
+    
+    MAX_HEIGHT = 600
+    MIN_HEIGHT = 250
+    WIDTH = 450
+    
+    def __init__(self, app, dialog_type):
+        self.app = app
+        self.dialog_type = dialog_type
+        # (title, message) -> [count, on_close callbacks]; the first one is shown
+        self.messages = {}
+        self.window = None
+        self.visible = False
+        self._shown = None
+        self._redraw_scheduled = False
+    
+    def show(self, title, message, on_close=None):
+        """Queue a message, or count a repeat of one already queued"""
+        entry = self.messages.get((title, message))
+        if entry is None:
+            entry = self.messages[title, message] = [0, []]
+        entry[0] += 1
+        if on_close is not None:
+            entry[1].append(on_close)
+        # A burst of messages is drawn once, when the Tk loop is next idle
+        if not self._redraw_scheduled:
+            self._redraw_scheduled = True
+            self.app.root.after_idle(self.redraw)
+    
+    def dismiss(self):
+        """Close the current message and show the next queued one"""
+        if not self.messages:
+            return
+        _, callbacks = self.messages.pop(next(iter(self.messages)))
+        if self.messages:
+            self.redraw()
+        else:
+            self.window.grab_release()
+            self.window.withdraw()
+            self.visible = False
+            self._shown = None
+        for callback in callbacks:
+            callback()
+    
+    def redraw(self):
+        """Show the current message with its repeat count"""
+        self._redraw_scheduled = False
+        if not self.messages:
+            return
+        if self.window is None:
+            self.build()
+        key, (count, _) = next(iter(self.messages.items()))
+        title, message = key
+        if key != self._shown:
+            self._shown = key
+            self.text_widget.config(state=tk.NORMAL)
+            self.text_widget.delete('1.0', tk.END)
+            self.text_widget.insert('1.0', message)
+            self.text_widget.config(state=tk.DISABLED)  # Make read-only
+            self.place(message)
+        heading = title if count == 1 else f"{title} (x{count})"
+        self.window.title(heading)
+        self.title_label.config(text=heading)
+        queued = len(self.messages) - 1
+        self.ok_btn.config(text=f"Next ({queued} more)" if queued else "OK")
+        if not self.visible:
+            self.visible = True
+            self.window.deiconify()
+            self.window.grab_set()
+            self.window.focus_set()
+            self.ok_btn.focus_set()
+    
+    def place(self, message):
+        """Size the dialog for a message and center it on screen"""
+        # Estimate height needed (base height + text height)
+        lines = len(message.split('\n'))
+        height = min(70 + 50 + (lines * 18) + 60, self.MAX_HEIGHT)
+        height = max(height, self.MIN_HEIGHT)
+        x = (self.window.winfo_screenwidth() // 2) - (self.WIDTH // 2)
+        y = (self.window.winfo_screenheight() // 2) - (height // 2)
+        self.window.geometry(f'{self.WIDTH}x{height}+{x}+{y}')
+    
+    def build(self):
+        """Create the dialog's widgets, hidden"""
+        app = self.app
+        info = self.dialog_type == "info"
+        dialog = tk.Toplevel(app.root)
+        dialog.withdraw()
+        dialog.configure(bg=app.bg_color)
+        dialog.transient(app.root)
+        dialog.resizable(False, False)
+        dialog.protocol("WM_DELETE_WINDOW", self.dismiss)
+        
+        # Icon color based on dialog type
+        icon_color = app.accent_color if info else app.danger_color
+        
+        # Header frame
+        header_frame = tk.Frame(dialog, bg=app.secondary_bg, height=50)
+        header_frame.pack(fill=tk.X)
+        header_frame.pack_propagate(False)
+        
+        # Title
+        self.title_label = tk.Label(
+            header_frame,
+            bg=app.secondary_bg,
+            fg=app.fg_color,
+            font=app.fonts['dialog_title'],
+            anchor="w"
+        )
+        self.title_label.pack(side=tk.LEFT, padx=20, pady=15)
+        
+        # Icon indicator
+        icon_label = tk.Label(
+            header_frame,
+            text="ℹ" if info else "⚠",
+            bg=app.secondary_bg,
+            fg=icon_color,
+            font=app.fonts['dialog_icon'],
+            width=3
+        )
+        icon_label.pack(side=tk.RIGHT, padx=20, pady=15)
+        
+        # Message frame with scrollbar for long messages
+        message_container = tk.Frame(dialog, bg=app.bg_color)
+        message_container.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        
+        # Text widget for scrollable content
+        self.text_widget = tk.Text(
+            message_container,
+            bg=app.bg_color,
+            fg=app.fg_color,
+            font=app.fonts['dialog_text'],
+            wrap=tk.WORD,
+            relief=tk.FLAT,
+            padx=10,
+            pady=10,
+            width=50,
+            height=10
+        )
+        
+        # Scrollbar
+        scrollbar = ttk.Scrollbar(message_container, orient="vertical", command=self.text_widget.yview)
+        self.text_widget.configure(yscrollcommand=scrollbar.set)
+        
+        self.text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        # Button frame
+        button_frame = tk.Frame(dialog, bg=app.bg_color)
+        button_frame.pack(fill=tk.X, padx=20, pady=(0, 20))
+        
+        # OK button (Next while more messages are queued)
+        self.ok_btn = app.create_modern_button(
+            button_frame,
+            "OK",
+            self.dismiss,
+            bg_color=icon_color,
+            hover_color="#005a9e" if info else "#c82333",
+            width=14
+        )
+        self.ok_btn.pack(side=tk.RIGHT)
+        
+        dialog.bind('<Return>', lambda e: self.dismiss())
+        dialog.bind('<Escape>', lambda e: self.dismiss())
+        self.window = dialog
+
+
+class DialogManager:
+    """Routes messages to one PooledDialog per dialog type, built on first use"""
+    
+    def __init__(self, app):
+        self.app = app
+        self.dialogs = {}  # dialog type -> PooledDialog
+    
+    def show(self, title, message, dialog_type="info", on_close=None):
+        """Show a message in the dialog of its type"""
+        dialog = self.dialogs.get(dialog_type)
+        if dialog is None:
+            dialog = self.dialogs[dialog_type] = PooledDialog(self.app, dialog_type)
+        dialog.show(title, message, on_close)
+
+
+class ModernKeyClicker:
+    # Timing constants
+    MIN_INTERVAL = clicker_engine.MIN_INTERVAL  # Minimum interval in seconds
+    DEFAULT_INTERVAL = 1.0
+    DEFAULT_HOTKEY = "f6"
+    
+    DEFAULT_BURST_RATE_CAP = clicker_engine.DEFAULT_BURST_RATE_CAP
+    
+    # UI update constants
+    FRAME_INTERVAL = 33  # ms between counter samples while jobs run
+    
+    # Font definitions, created lazily by FontCache
+    FONT_SPECS = {
+        'title': dict(family="Segoe UI", size=22, weight="bold"),
+        'normal': dict(family="Segoe UI", size=10),
+        'normal_bold': dict(family="Segoe UI", size=10, weight="bold"),
+        'input': dict(family="Segoe UI", size=11),
+        'counter': dict(family="Segoe UI", size=28, weight="bold"),
+        'section': dict(family="Segoe UI", size=9, weight="bold"),
+        'dialog_title': dict(family="Segoe UI", size=14, weight="bold"),
+        'dialog_icon': dict(family="Segoe UI", size=20),
+        'dialog_text': dict(family="Segoe UI", size=10),
+    }
+    
+    # Window constants
+    DEFAULT_WIDTH = 550
+    DEFAULT_HEIGHT = 750
+    MIN_WIDTH = 500
+    MIN_HEIGHT = 700
+    
+    def __init__(self, root, profiler=None, engine=clicker_engine.DEFAULT_ENGINE, realtime=None,
+                 control=None):
+        self.root = root
+        self.profiler = profiler
+        self.engine = engine
+        # Control API socket path (--control), served once the engine is ready
+        self.control_path = control
+        self.control_server = None
+        # Requested scheduling for the engine thread, edited on the Metrics tab
+        self.realtime = realtime or RealtimeSettings()
+        self.root.title("Auto Key Clicker")
+        self.root.geometry(f"{self.DEFAULT_WIDTH}x{self.DEFAULT_HEIGHT}")
+        self.root.resizable(True, True)
+        self.root.minsize(self.MIN_WIDTH, self.MIN_HEIGHT)
+        
+        # Dark mode color scheme
+        self.bg_color = "#1e1e1e"
+        self.fg_color = "#ffffff"
+        self.accent_color = "#007acc"
+        self.secondary_bg = "#2d2d2d"
+        self.button_hover = "#3d3d3d"
+        self.success_color = "#28a745"
+        self.danger_color = "#dc3545"
+        
+        # Cache fonts to avoid repeated creation; dialog fonts are only built when needed
+        self.fonts = FontCache(self.FONT_SPECS)
+        
+        # Message dialogs are built once per type and reused
+        self.dialogs = DialogManager(self)
+        
+        # Tray icon and its state-aware sprites, created by the background startup stage
+        self.tray_icon = None
+        self.tray_status = None
+        self.tray_rate = RateMeter()  # combined rate of the running jobs
+        self.tray_error = False  # a run ended with an error and nothing has run since
+        
+        # Apply dark theme
+        self.root.configure(bg=self.bg_color)
+        style = ttk.Style()
+        style.theme_use('clam')
+        
+        # Configure custom styles
+        style.configure('Dark.TFrame', background=self.bg_color)
+        style.configure('Dark.TLabel', background=self.bg_color, foreground=self.fg_color)
+        style.configure('Dark.TButton', background=self.secondary_bg, foreground=self.fg_color)
+        style.map('Dark.TButton',
+                  background=[('active', self.button_hover), ('pressed', self.accent_color)])
+        style.configure('Dark.TNotebook', background=self.bg_color, borderwidth=0)
+        style.configure('Dark.TNotebook.Tab', background=self.secondary_bg, foreground=self.fg_color,
+                        padding=(16, 6), borderwidth=0)
+        style.map('Dark.TNotebook.Tab',
+                  background=[('selected', self.accent_color), ('active', self.button_hover)])
+        
+        # Configure Combobox styling (limited on Windows)
+        try:
+            style.configure('TCombobox',
+                            fieldbackground=self.secondary_bg,
+                            background=self.secondary_bg,
+                            foreground=self.fg_color)
+        except (AttributeError, tk.TclError) as e:
+            # Silently ignore styling errors on platforms that don't support it
+            pass
+        
+        # State variables
+        self.is_running = False
+        self.press_count = 0
+        
+        # All jobs share one scheduler thread; main_job is driven by the Clicker tab.
+        # The engine process variant is started by the background startup stage.
+        self.scheduler = None
+        if engine == "thread":
+            self.scheduler = JobScheduler(realtime=None if self.realtime.is_default else self.realtime)
+            self.scheduler.on_realtime = lambda status: self.post_message("realtime", status)
+        self.main_job = None
+        self.jobs = []
+        
+        # Counters are sampled from the jobs once per frame while any job runs
+        self.main_rate = RateMeter()
+        self.main_history = RateHistory()  # one figure per second for the rate graph
+        self._shown_counts = {}
+        self._job_windows = {}  # job -> RunWindow it was added with, reused on restart
+        self._frame_scheduled = False
+        self.is_paused = False
+        
+        # One global keyboard hook for the whole session; rebinding swaps its table
+        self.hotkeys = HotkeyListener(self.on_hotkey)
+        self.hotkey_bindings = {'toggle': self.DEFAULT_HOTKEY}
+        self.hotkey_key_names = None  # valid key names, known once pynput is loaded
+        # Tk-thread handlers; stopping is done directly on the listener thread
+        self.hotkey_handlers = {
+            'toggle': self.toggle_clicking,
+            'start': self.start_or_resume,
+            'pause': self.toggle_pause,
+            'reset': self.reset_counter,
+            'switch-profile': self.next_profile,
+        }
+        
+        # Keystroke recorder, active while recording a trace
+        self.recorder = None
+        
+        # Saved Clicker settings, cycled by the switch-profile hotkey
+        self.profiles = []  # (name, settings dict)
+        self.profile_index = None
+        self.show_tray_notification = True  # Flag to show notification on first close
+        
+        # Output backend, created by the background startup stage (thread engine only)
+        self.backend = None
+        self.background_ready = threading.Event()
+        
+        # Special keys offered in the dropdown
+        self.special_keys = list(SPECIAL_KEYS)
+        
+        # Hotkey options
+        self.hotkey_options = ['F1', 'F2', 'F3', 'F4', 'F5', 'F6', 'F7', 'F8', 'F9', 'F10', 'F11', 'F12']
+        
+        # Message queue for thread-safe GUI updates; posting wakes the Tk loop
+        self.message_queue = queue.Queue()
+        self.notifier = MainThreadNotifier(self.root, self.process_messages)
+        
+        self.mark_startup("window")
+        
+        # Create GUI
+        self.create_gui()
+        self.mark_startup("widgets")
+        
+        # Handle window close
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        
+        # Center window
+        self.center_window(self.DEFAULT_WIDTH, self.DEFAULT_HEIGHT)
+        
+        # Backend, hotkey listener and tray start once the first frame is drawn
+        self.root.after_idle(self.start_background_stage)
+    
+    def mark_startup(self, phase):
+        """Record a startup phase when profiling"""
+        if self.profiler is not None:
+            self.profiler.mark(phase)
+    
+    def start_background_stage(self):
+        """Start the deferred part of startup after the first frame"""
+        self.mark_startup("first frame")
+        threading.Thread(target=self.background_stage, daemon=True).start()
+    
+    def background_stage(self):
+        """Create the output backend, hotkey listener and system tray off the Tk thread"""
+        # Output backend, selected once at startup (KEY_CLICKER_BACKEND); with the
+        # process engine it is created inside the engine process
+        # The "auto" backend already tries every backend in turn, so errors are final
+        try:
+            if self.engine == "process":
+                from clicker_process import ProcessScheduler
+                realtime = None if self.realtime.is_default else self.realtime
+                scheduler = ProcessScheduler(realtime=realtime)
+                scheduler.on_realtime = lambda status: self.post_message("realtime", status)
+                self.scheduler = scheduler
+            else:
+                self.backend = create_backend()
+        except BackendError as e:
+            self.post_message("error", str(e))
+        self.mark_startup("backend")
+        
+        # Start hotkey listener
+        self.setup_hotkey_listener()
+        self.mark_startup("hotkey listener")
+        self.background_ready.set()
+        self.post_message("ready")
+        
+        if self.control_path and self.scheduler is not None:
+            self.start_control_server()
+            self.mark_startup("control server")
+        
+        # Create system tray
+        self.setup_system_tray()
+        self.mark_startup("system tray")
+        
+        if self.profiler is not None:
+            self.profiler.report()
+    
+    def center_window(self, width=None, height=None):
+        """Center the window on screen"""
+        if width is None or height is None:
+            self.root.update_idletasks()
+            width = width or self.root.winfo_width()
+            height = height or self.root.winfo_height()
+        
+        screen_width = self.root.winfo_screenwidth()
+        screen_height = self.root.winfo_screenheight()
+        x = (screen_width // 2) - (width // 2)
+        y = (screen_height // 2) - (height // 2)
+        self.root.geometry(f'{width}x{height}+{x}+{y}')
+    
+    def create_gui(self):
+        """Create the modern GUI interface"""
+        # Header
+        header_frame = tk.Frame(self.root, bg=self.bg_color, height=70)
+        header_frame.pack(fill=tk.X, padx=0, pady=(0, 5))
+        header_frame.pack_propagate(False)
+        
+        title_label = tk.Label(
+            header_frame,
+            text="Auto Key Clicker",
+            font=self.fonts['title'],
+            bg=self.bg_color,
+            fg=self.fg_color
+        )
+        title_label.pack(pady=(15, 5))
+        
+        # Main container
+        main_container = tk.Frame(self.root, bg=self.bg_color)
+        main_container.pack(fill=tk.BOTH, expand=True, padx=25, pady=15)
+        
+        # Tabs: single clicker settings, concurrent jobs and run metrics
+        notebook = ttk.Notebook(main_container, style='Dark.TNotebook')
+        notebook.pack(fill=tk.BOTH, expand=True)
+        # The Clicker form is taller than the window on small screens
+        clicker_scroll = ScrollableFrame(notebook, self.bg_color)
+        clicker_tab = clicker_scroll.inner
+        jobs_tab = tk.Frame(notebook, bg=self.bg_color)
+        metrics_tab = tk.Frame(notebook, bg=self.bg_color)
+        hotkeys_tab = tk.Frame(notebook, bg=self.bg_color)
+        notebook.add(clicker_scroll.outer, text="Clicker")
+        notebook.add(jobs_tab, text="Jobs")
+        notebook.add(metrics_tab, text="Metrics")
+        notebook.add(hotkeys_tab, text="Hotkeys")
+        self.create_jobs_tab(jobs_tab)
+        self.create_metrics_tab(metrics_tab)
+        self.create_hotkeys_tab(hotkeys_tab)
+        
+        # Key selection section
+        key_frame = self.create_section(clicker_tab, "Key Selection", pady=(12, 12))
+        
+        self.key_mode = tk.StringVar(value="regular")
+        
+        key_mode_frame = tk.Frame(key_frame, bg=self.secondary_bg, relief=tk.FLAT)
+        key_mode_frame.pack(fill=tk.X, pady=(0, 12))
+        
+        regular_radio = tk.Radiobutton(
+            key_mode_frame,
+            text="Regular Key",
+            variable=self.key_mode,
+            value="regular",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            selectcolor=self.bg_color,
+            activebackground=self.secondary_bg,
+            activeforeground=self.fg_color,
+            font=self.fonts['normal'],
+            command=self.on_key_mode_change
+        )
+        regular_radio.pack(side=tk.LEFT, padx=(15, 8), pady=12)
+        
+        special_radio = tk.Radiobutton(
+            key_mode_frame,
+            text="Special Key",
+            variable=self.key_mode,
+            value="special",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            selectcolor=self.bg_color,
+            activebackground=self.secondary_bg,
+            activeforeground=self.fg_color,
+            font=self.fonts['normal'],
+            command=self.on_key_mode_change
+        )
+        special_radio.pack(side=tk.LEFT, padx=8, pady=12)
+        
+        sequence_radio = tk.Radiobutton(
+            key_mode_frame,
+            text="Sequence",
+            variable=self.key_mode,
+            value="sequence",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            selectcolor=self.bg_color,
+            activebackground=self.secondary_bg,
+            activeforeground=self.fg_color,
+            font=self.fonts['normal'],
+            command=self.on_key_mode_change
+        )
+        sequence_radio.pack(side=tk.LEFT, padx=8, pady=12)
+        
+        trace_radio = tk.Radiobutton(
+            key_mode_frame,
+            text="Recording",
+            variable=self.key_mode,
+            value="trace",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            selectcolor=self.bg_color,
+            activebackground=self.secondary_bg,
+            activeforeground=self.fg_color,
+            font=self.fonts['normal'],
+            command=self.on_key_mode_change
+        )
+        trace_radio.pack(side=tk.LEFT, padx=8, pady=12)
+        
+        text_radio = tk.Radiobutton(
+            key_mode_frame,
+            text="Text",
+            variable=self.key_mode,
+            value="text",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            selectcolor=self.bg_color,
+            activebackground=self.secondary_bg,
+            activeforeground=self.fg_color,
+            font=self.fonts['normal'],
+            command=self.on_key_mode_change
+        )
+        text_radio.pack(side=tk.LEFT, padx=8, pady=12)
+        
+        # Regular key input
+        self.regular_key_frame = tk.Frame(key_frame, bg=self.secondary_bg)
+        self.regular_key_frame.pack(fill=tk.X, pady=(0, 12))
+        
+        regular_label = tk.Label(
+            self.regular_key_frame,
+            text="Key:",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            font=self.fonts['normal'],
+            width=12,
+            anchor="w"
+        )
+        regular_label.pack(side=tk.LEFT, padx=15, pady=12)
+        
+        self.regular_key_entry = tk.Entry(
+            self.regular_key_frame,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            insertbackground=self.fg_color,
+            font=self.fonts['input'],
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground=self.secondary_bg,
+            highlightcolor=self.accent_color,
+            width=15,
+            borderwidth=0
+        )
+        self.regular_key_entry.pack(side=tk.LEFT, padx=(0, 15), pady=12)
+        self.regular_key_entry.insert(0, "a")
+        
+        # Special key dropdown
+        self.special_key_frame = tk.Frame(key_frame, bg=self.secondary_bg)
+        
+        special_label = tk.Label(
+            self.special_key_frame,
+            text="Special Key:",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            font=self.fonts['normal'],
+            width=12,
+            anchor="w"
+        )
+        special_label.pack(side=tk.LEFT, padx=15, pady=12)
+        
+        self.special_key_var = tk.StringVar(value="enter")
+        special_key_dropdown = self.create_dropdown(
+            self.special_key_frame,
+            self.special_key_var,
+            self.special_keys,
+            width=18
+        )
+        special_key_dropdown.pack(side=tk.LEFT, padx=(0, 15), pady=12)
+        
+        # Sequence input, e.g. "ctrl+c@0.05~0.2, ctrl+v, enter"
+        self.sequence_frame = tk.Frame(key_frame, bg=self.secondary_bg)
+        
+        sequence_label = tk.Label(
+            self.sequence_frame,
+            text="Sequence:",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            font=self.fonts['normal'],
+            width=12,
+            anchor="w"
+        )
+        sequence_label.pack(side=tk.LEFT, padx=15, pady=12)
+        
+        self.sequence_entry = tk.Entry(
+            self.sequence_frame,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            insertbackground=self.fg_color,
+            font=self.fonts['input'],
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground=self.secondary_bg,
+            highlightcolor=self.accent_color,
+            borderwidth=0
+        )
+        self.sequence_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 15), pady=12)
+        self.sequence_entry.insert(0, "ctrl+c@0.05~0.2, ctrl+v, enter")
+        
+        # Recorded keystroke trace, replayed with its original timing
+        self.trace_frame = tk.Frame(key_frame, bg=self.secondary_bg)
+        
+        trace_path_row = tk.Frame(self.trace_frame, bg=self.secondary_bg)
+        trace_path_row.pack(fill=tk.X)
+        
+        trace_label = tk.Label(
+            trace_path_row,
+            text="Trace File:",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            font=self.fonts['normal'],
+            width=12,
+            anchor="w"
+        )
+        trace_label.pack(side=tk.LEFT, padx=15, pady=(12, 6))
+        
+        self.trace_entry = tk.Entry(
+            trace_path_row,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            insertbackground=self.fg_color,
+            font=self.fonts['input'],
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground=self.secondary_bg,
+            highlightcolor=self.accent_color,
+            borderwidth=0
+        )
+        self.trace_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, pady=(12, 6))
+        
+        browse_btn = self.create_modern_button(
+            trace_path_row,
+            "Browse...",
+            self.browse_trace
+        )
+        browse_btn.pack(side=tk.LEFT, padx=15, pady=(12, 6))
+        
+        trace_control_row = tk.Frame(self.trace_frame, bg=self.secondary_bg)
+        trace_control_row.pack(fill=tk.X)
+        
+        self.record_btn = self.create_modern_button(
+            trace_control_row,
+            "● Record",
+            self.toggle_recording,
+            bg_color=self.danger_color,
+            hover_color="#c82333",
+            width=16
+        )
+        self.record_btn.pack(side=tk.LEFT, padx=15, pady=(6, 12))
+        
+        self.record_status_label = tk.Label(
+            trace_control_row,
+            text="",
+            bg=self.secondary_bg,
+            fg="#888888",
+            font=self.fonts['normal'],
+            anchor="w"
+        )
+        self.record_status_label.pack(side=tk.LEFT, pady=(6, 12))
+        
+        self.loops_entry = tk.Entry(
+            trace_control_row,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            insertbackground=self.fg_color,
+            font=self.fonts['input'],
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground=self.secondary_bg,
+            highlightcolor=self.accent_color,
+            width=5,
+            borderwidth=0
+        )
+        self.loops_entry.pack(side=tk.RIGHT, padx=(0, 15), pady=(6, 12))
+        self.loops_entry.insert(0, "1")
+        
+        loops_label = tk.Label(
+            trace_control_row,
+            text="Loops (0 = forever):",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            font=self.fonts['normal']
+        )
+        loops_label.pack(side=tk.RIGHT, padx=(0, 8), pady=(6, 12))
+        
+        # Filled in when a replay stops early so the next start resumes there
+        trace_seek_row = tk.Frame(self.trace_frame, bg=self.secondary_bg)
+        trace_seek_row.pack(fill=tk.X)
+        
+        start_event_label = tk.Label(
+            trace_seek_row,
+            text="Start at event:",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            font=self.fonts['normal'],
+            width=12,
+            anchor="w"
+        )
+        start_event_label.pack(side=tk.LEFT, padx=15, pady=(0, 12))
+        
+        self.start_event_entry = tk.Entry(
+            trace_seek_row,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            insertbackground=self.fg_color,
+            font=self.fonts['input'],
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground=self.secondary_bg,
+            highlightcolor=self.accent_color,
+            width=12,
+            borderwidth=0
+        )
+        self.start_event_entry.pack(side=tk.LEFT, pady=(0, 12))
+        self.start_event_entry.insert(0, "0")
+        
+        # Text typed character by character, or a file streamed as it is typed
+        self.text_frame = tk.Frame(key_frame, bg=self.secondary_bg)
+        
+        text_row = tk.Frame(self.text_frame, bg=self.secondary_bg)
+        text_row.pack(fill=tk.X)
+        
+        text_label = tk.Label(
+            text_row,
+            text="Text:",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            font=self.fonts['normal'],
+            width=12,
+            anchor="w"
+        )
+        text_label.pack(side=tk.LEFT, padx=15, pady=(12, 6))
+        
+        self.text_entry = tk.Entry(
+            text_row,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            insertbackground=self.fg_color,
+            font=self.fonts['input'],
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground=self.secondary_bg,
+            highlightcolor=self.accent_color,
+            borderwidth=0
+        )
+        self.text_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 15), pady=(12, 6))
+        self.text_entry.insert(0, "Hello, world!")
+        
+        text_file_row = tk.Frame(self.text_frame, bg=self.secondary_bg)
+        text_file_row.pack(fill=tk.X)
+        
+        text_file_label = tk.Label(
+            text_file_row,
+            text="Or File:",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            font=self.fonts['normal'],
+            width=12,
+            anchor="w"
+        )
+        text_file_label.pack(side=tk.LEFT, padx=15, pady=6)
+        
+        self.text_file_entry = tk.Entry(
+            text_file_row,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            insertbackground=self.fg_color,
+            font=self.fonts['input'],
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground=self.secondary_bg,
+            highlightcolor=self.accent_color,
+            borderwidth=0
+        )
+        self.text_file_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, pady=6)
+        
+        text_browse_btn = self.create_modern_button(
+            text_file_row,
+            "Browse...",
+            self.browse_text_file
+        )
+        text_browse_btn.pack(side=tk.LEFT, padx=15, pady=6)
+        
+        # The start offset is filled in when typing stops early so the next start resumes there
+        text_rate_row = tk.Frame(self.text_frame, bg=self.secondary_bg)
+        text_rate_row.pack(fill=tk.X)
+        
+        cps_label = tk.Label(
+            text_rate_row,
+            text="Chars/s:",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            font=self.fonts['normal'],
+            width=12,
+            anchor="w"
+        )
+        cps_label.pack(side=tk.LEFT, padx=15, pady=(6, 12))
+        
+        self.cps_entry = tk.Entry(
+            text_rate_row,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            insertbackground=self.fg_color,
+            font=self.fonts['input'],
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground=self.secondary_bg,
+            highlightcolor=self.accent_color,
+            width=6,
+            borderwidth=0
+        )
+        self.cps_entry.pack(side=tk.LEFT, pady=(6, 12))
+        self.cps_entry.insert(0, "10")
+        
+        self.start_offset_entry = tk.Entry(
+            text_rate_row,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            insertbackground=self.fg_color,
+            font=self.fonts['input'],
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground=self.secondary_bg,
+            highlightcolor=self.accent_color,
+            width=10,
+            borderwidth=0
+        )
+        self.start_offset_entry.pack(side=tk.RIGHT, padx=(0, 15), pady=(6, 12))
+        self.start_offset_entry.insert(0, "0")
+        
+        start_offset_label = tk.Label(
+            text_rate_row,
+            text="Start at byte:",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            font=self.fonts['normal']
+        )
+        start_offset_label.pack(side=tk.RIGHT, padx=(0, 8), pady=(6, 12))
+        
+        # Interval section
+        interval_frame = self.create_section(clicker_tab, "Timing Settings")
+        
+        interval_inner = tk.Frame(interval_frame, bg=self.secondary_bg)
+        interval_inner.pack(fill=tk.X, pady=(0, 12))
+        
+        interval_label = tk.Label(
+            interval_inner,
+            text="Interval (seconds):",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            font=self.fonts['normal'],
+            width=18,
+            anchor="w"
+        )
+        interval_label.pack(side=tk.LEFT, padx=15, pady=12)
+        
+        self.interval_entry = tk.Entry(
+            interval_inner,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            insertbackground=self.fg_color,
+            font=self.fonts['input'],
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground=self.secondary_bg,
+            highlightcolor=self.accent_color,
+            width=15,
+            borderwidth=0
+        )
+        self.interval_entry.pack(side=tk.LEFT, padx=(0, 15), pady=12)
+        self.interval_entry.insert(0, str(self.DEFAULT_INTERVAL))
+        
+        # Burst mode
+        burst_inner = tk.Frame(interval_frame, bg=self.secondary_bg)
+        burst_inner.pack(fill=tk.X, pady=(0, 12))
+        
+        self.burst_var = tk.BooleanVar(value=False)
+        burst_check = tk.Checkbutton(
+            burst_inner,
+            text="Burst Mode",
+            variable=self.burst_var,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            selectcolor=self.bg_color,
+            activebackground=self.secondary_bg,
+            activeforeground=self.fg_color,
+            font=self.fonts['normal'],
+            width=15,
+            anchor="w"
+        )
+        burst_check.pack(side=tk.LEFT, padx=15, pady=12)
+        
+        rate_cap_label = tk.Label(
+            burst_inner,
+            text="Rate Cap (/s):",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            font=self.fonts['normal'],
+            anchor="w"
+        )
+        rate_cap_label.pack(side=tk.LEFT, pady=12)
+        
+        self.rate_cap_entry = tk.Entry(
+            burst_inner,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            insertbackground=self.fg_color,
+            font=self.fonts['input'],
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground=self.secondary_bg,
+            highlightcolor=self.accent_color,
+            width=8,
+            borderwidth=0
+        )
+        self.rate_cap_entry.pack(side=tk.LEFT, padx=(10, 15), pady=12)
+        self.rate_cap_entry.insert(0, str(self.DEFAULT_BURST_RATE_CAP))
+        
+        # Humanized delay distribution
+        delays_inner = tk.Frame(interval_frame, bg=self.secondary_bg)
+        delays_inner.pack(fill=tk.X, pady=(0, 12))
+        
+        delays_label = tk.Label(
+            delays_inner,
+            text="Delays:",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            font=self.fonts['normal'],
+            width=18,
+            anchor="w"
+        )
+        delays_label.pack(side=tk.LEFT, padx=15, pady=12)
+        
+        self.distribution_var = tk.StringVar(value="fixed")
+        self.fit_trace_path = None
+        distribution_dropdown = self.create_dropdown(
+            delays_inner,
+            self.distribution_var,
+            DISTRIBUTIONS,
+            width=9,
+            callback=self.on_distribution_change
+        )
+        distribution_dropdown.pack(side=tk.LEFT, pady=12)
+        
+        jitter_label = tk.Label(
+            delays_inner,
+            text="Jitter (s):",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            font=self.fonts['normal'],
+            anchor="w"
+        )
+        jitter_label.pack(side=tk.LEFT, padx=(10, 0), pady=12)
+        
+        self.jitter_entry = tk.Entry(
+            delays_inner,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            insertbackground=self.fg_color,
+            font=self.fonts['input'],
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground=self.secondary_bg,
+            highlightcolor=self.accent_color,
+            width=6,
+            borderwidth=0
+        )
+        self.jitter_entry.pack(side=tk.LEFT, padx=(10, 15), pady=12)
+        self.jitter_entry.insert(0, "0")
+        
+        # Run window: wall-clock start, length and repeat period
+        window_inner = tk.Frame(interval_frame, bg=self.secondary_bg)
+        window_inner.pack(fill=tk.X, pady=(0, 12))
+        
+        start_at_label = tk.Label(
+            window_inner,
+            text="Start At (blank=now):",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            font=self.fonts['normal'],
+            width=18,
+            anchor="w"
+        )
+        start_at_label.pack(side=tk.LEFT, padx=15, pady=12)
+        
+        self.start_at_entry = tk.Entry(
+            window_inner,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            insertbackground=self.fg_color,
+            font=self.fonts['input'],
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground=self.secondary_bg,
+            highlightcolor=self.accent_color,
+            width=9,
+            borderwidth=0
+        )
+        self.start_at_entry.pack(side=tk.LEFT, pady=12)
+        
+        run_for_label = tk.Label(
+            window_inner,
+            text="For (s):",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            font=self.fonts['normal'],
+            anchor="w"
+        )
+        run_for_label.pack(side=tk.LEFT, padx=(10, 0), pady=12)
+        
+        self.run_for_entry = tk.Entry(
+            window_inner,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            insertbackground=self.fg_color,
+            font=self.fonts['input'],
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground=self.secondary_bg,
+            highlightcolor=self.accent_color,
+            width=5,
+            borderwidth=0
+        )
+        self.run_for_entry.pack(side=tk.LEFT, padx=(10, 0), pady=12)
+        
+        every_label = tk.Label(
+            window_inner,
+            text="Every (s):",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            font=self.fonts['normal'],
+            anchor="w"
+        )
+        every_label.pack(side=tk.LEFT, padx=(10, 0), pady=12)
+        
+        self.every_entry = tk.Entry(
+            window_inner,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            insertbackground=self.fg_color,
+            font=self.fonts['input'],
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground=self.secondary_bg,
+            highlightcolor=self.accent_color,
+            width=5,
+            borderwidth=0
+        )
+        self.every_entry.pack(side=tk.LEFT, padx=(10, 15), pady=12)
+        
+        # Hotkey section
+        hotkey_inner = tk.Frame(interval_frame, bg=self.secondary_bg)
+        hotkey_inner.pack(fill=tk.X, pady=(0, 12))
+        
+        hotkey_label = tk.Label(
+            hotkey_inner,
+            text="Toggle Hotkey:",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            font=self.fonts['normal'],
+            width=18,
+            anchor="w"
+        )
+        hotkey_label.pack(side=tk.LEFT, padx=15, pady=12)
+        
+        self.hotkey_var = tk.StringVar(value="F6")
+        hotkey_dropdown = self.create_dropdown(
+            hotkey_inner,
+            self.hotkey_var,
+            self.hotkey_options,
+            width=18,
+            callback=lambda v: self.on_hotkey_change()
+        )
+        hotkey_dropdown.pack(side=tk.LEFT, padx=(0, 15), pady=12)
+        
+        # Press limit section
+        limit_inner = tk.Frame(interval_frame, bg=self.secondary_bg)
+        limit_inner.pack(fill=tk.X)
+        
+        limit_label = tk.Label(
+            limit_inner,
+            text="Press Limit (0=∞):",
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            font=self.fonts['normal'],
+            width=18,
+            anchor="w"
+        )
+        limit_label.pack(side=tk.LEFT, padx=15, pady=12)
+        
+        self.limit_entry = tk.Entry(
+            limit_inner,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            insertbackground=self.fg_color,
+            font=self.fonts['input'],
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground=self.secondary_bg,
+            highlightcolor=self.accent_color,
+            width=15,
+            borderwidth=0
+        )
+        self.limit_entry.pack(side=tk.LEFT, padx=(0, 15), pady=12)
+        self.limit_entry.insert(0, "0")
+        
+        # Counter section
+        counter_frame = self.create_section(clicker_tab, "Press Counter")
+        
+        counter_inner = tk.Frame(counter_frame, bg=self.secondary_bg)
+        counter_inner.pack(fill=tk.X)
+        
+        self.counter_label = tk.Label(
+            counter_inner,
+            text="0",
+            bg=self.secondary_bg,
+            fg=self.accent_color,
+            font=self.fonts['counter'],
+            width=10
+        )
+        self.counter_label.pack(side=tk.LEFT, padx=15, pady=12)
+        
+        reset_btn = self.create_modern_button(
+            counter_inner,
+            "Reset",
+            self.reset_counter,
+            bg_color=self.danger_color,
+            hover_color="#c82333"
+        )
+        reset_btn.pack(side=tk.RIGHT, padx=15, pady=12)
+        
+        # Measured rate and jitter of the last run
+        self.stats_label = tk.Label(
+            counter_frame,
+            text="Last run: -",
+            bg=self.bg_color,
+            fg="#888888",
+            font=self.fonts['section'],
+            anchor="w"
+        )
+        self.stats_label.pack(fill=tk.X, pady=(6, 0))
+        
+        # Presses/s over the last few minutes of the run
+        self.sparkline = RateSparkline(
+            counter_frame,
+            self.main_history,
+            bg=self.secondary_bg,
+            line_color=self.accent_color,
+            text_color="#888888",
+            font=self.fonts['section']
+        )
+        self.sparkline.canvas.pack(fill=tk.X, pady=(6, 0))
+        
+        # Control buttons
+        control_frame = tk.Frame(main_container, bg=self.bg_color)
+        control_frame.pack(fill=tk.X, pady=(15, 10))
+        
+        self.start_btn = self.create_modern_button(
+            control_frame,
+            "▶ Start",
+            self.toggle_clicking,
+            bg_color=self.success_color,
+            hover_color="#218838",
+            width=15
+        )
+        self.start_btn.pack(side=tk.LEFT, padx=(0, 10))
+        # Enabled once the background stage has created the output backend
+        self.start_btn.config(state=tk.DISABLED)
+        
+        self.stop_btn = self.create_modern_button(
+            control_frame,
+            "■ Stop",
+            self.toggle_clicking,
+            bg_color=self.danger_color,
+            hover_color="#c82333",
+            width=15
+        )
+        self.stop_btn.pack(side=tk.LEFT, padx=(0, 10))
+        self.stop_btn.config(state=tk.DISABLED)
+        
+        status_btn = self.create_modern_button(
+            control_frame,
+            "ℹ Info",
+            self.show_info,
+            bg_color=self.accent_color,
+            hover_color="#005a9e",
+            width=15
+        )
+        status_btn.pack(side=tk.LEFT)
+        
+        # Initial key mode
+        self.on_key_mode_change()
+    
+    def create_jobs_tab(self, parent):
+        """Create the concurrent jobs list"""
+        jobs_frame = self.create_section(parent, "Concurrent Jobs", pady=(12, 12))
+        
+        hint_label = tk.Label(
+            jobs_frame,
+            text="Jobs run side by side on one scheduler thread.\n"
+                 "\"Add Job\" uses the current Clicker settings.",
+            bg=self.bg_color,
+            fg="#888888",
+            font=self.fonts['normal'],
+            justify=tk.LEFT,
+            anchor="w"
+        )
+        hint_label.pack(fill=tk.X, pady=(0, 8))
+        
+        self.jobs_listbox = tk.Listbox(
+            jobs_frame,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            selectbackground=self.accent_color,
+            selectforeground=self.fg_color,
+            font=self.fonts['input'],
+            relief=tk.FLAT,
+            highlightthickness=0,
+            borderwidth=0,
+            activestyle="none",
+            height=12
+        )
+        self.jobs_listbox.pack(fill=tk.BOTH, expand=True)
+        
+        jobs_buttons = tk.Frame(jobs_frame, bg=self.bg_color)
+        jobs_buttons.pack(fill=tk.X, pady=(12, 0))
+        
+        self.add_job_btn = self.create_modern_button(
+            jobs_buttons,
+            "+ Add Job",
+            self.add_job,
+            bg_color=self.success_color,
+            hover_color="#218838",
+            width=12
+        )
+        self.add_job_btn.pack(side=tk.LEFT, padx=(0, 10))
+        self.add_job_btn.config(state=tk.DISABLED)
+        
+        toggle_btn = self.create_modern_button(
+            jobs_buttons,
+            "Start/Stop",
+            self.toggle_selected_job,
+            width=12
+        )
+        toggle_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
+        remove_btn = self.create_modern_button(
+            jobs_buttons,
+            "Remove",
+            self.remove_selected_job,
+            bg_color=self.danger_color,
+            hover_color="#c82333",
+            width=12
+        )
+        remove_btn.pack(side=tk.LEFT)
+    
+    def create_metrics_tab(self, parent):
+        """Create the run metrics panel for the Clicker job"""
+        metrics_frame = self.create_section(parent, "Run Metrics", pady=(12, 12))
+        
+        grid = tk.Frame(metrics_frame, bg=self.secondary_bg)
+        grid.pack(fill=tk.X)
+        grid.columnconfigure(1, weight=1)
+        
+        self.metric_labels = {}
+        rows = (
+            ('rate', "Achieved rate"),
+            ('lateness', "Lateness p50 / p99"),
+            ('max_lateness', "Max lateness"),
+            ('overruns', "Overruns / skipped ticks"),
+            ('backend', "Backend time per press"),
+        )
+        for row, (name, title) in enumerate(rows):
+            tk.Label(
+                grid,
+                text=title,
+                bg=self.secondary_bg,
+                fg="#888888",
+                font=self.fonts['normal'],
+                anchor="w"
+            ).grid(row=row, column=0, sticky="w", padx=15, pady=4)
+            value_label = tk.Label(
+                grid,
+                text="-",
+                bg=self.secondary_bg,
+                fg=self.fg_color,
+                font=self.fonts['normal_bold'],
+                anchor="e"
+            )
+            value_label.grid(row=row, column=1, sticky="e", padx=15, pady=4)
+            self.metric_labels[name] = value_label
+        
+        export_btn = self.create_modern_button(
+            metrics_frame,
+            "Export...",
+            self.export_metrics,
+            width=12
+        )
+        export_btn.pack(anchor="w", pady=(12, 0))
+        
+        scheduling_frame = self.create_section(parent, "Engine Scheduling")
+        
+        grid = tk.Frame(scheduling_frame, bg=self.secondary_bg)
+        grid.pack(fill=tk.X)
+        grid.columnconfigure(1, weight=1)
+        
+        entry_options = dict(
+            bg=self.bg_color,
+            fg=self.fg_color,
+            insertbackground=self.fg_color,
+            font=self.fonts['input'],
+            relief=tk.FLAT,
+            highlightthickness=1,
+            highlightbackground=self.secondary_bg,
+            highlightcolor=self.accent_color,
+            width=10,
+            borderwidth=0
+        )
+        rows = ("Pin to CPUs (e.g. 2-3)", "Policy", "Real-time priority")
+        for row, title in enumerate(rows):
+            tk.Label(
+                grid,
+                text=title,
+                bg=self.secondary_bg,
+                fg=self.fg_color,
+                font=self.fonts['normal'],
+                anchor="w"
+            ).grid(row=row, column=0, sticky="w", padx=15, pady=6)
+        
+        self.cpus_entry = tk.Entry(grid, **entry_options)
+        self.cpus_entry.grid(row=0, column=1, sticky="e", padx=15, pady=6)
+        if self.realtime.cpus is not None:
+            self.cpus_entry.insert(0, format_cpus(self.realtime.cpus))
+        
+        self.rt_policy_var = tk.StringVar(value=self.realtime.policy or "normal")
+        policy_dropdown = self.create_dropdown(grid, self.rt_policy_var, ("normal",) + RT_POLICIES, width=8)
+        policy_dropdown.grid(row=1, column=1, sticky="e", padx=15, pady=6)
+        
+        self.rt_priority_entry = tk.Entry(grid, **entry_options)
+        self.rt_priority_entry.grid(row=2, column=1, sticky="e", padx=15, pady=6)
+        self.rt_priority_entry.insert(0, str(self.realtime.priority))
+        
+        self.timerfd_var = tk.BooleanVar(value=self.realtime.timerfd)
+        timerfd_check = tk.Checkbutton(
+            scheduling_frame,
+            text="Sleep on a timerfd (Linux)",
+            variable=self.timerfd_var,
+            bg=self.bg_color,
+            fg=self.fg_color,
+            selectcolor=self.secondary_bg,
+            activebackground=self.bg_color,
+            activeforeground=self.fg_color,
+            font=self.fonts['normal'],
+            anchor="w"
+        )
+        timerfd_check.pack(fill=tk.X, pady=(8, 0))
+        
+        self.realtime_status_label = tk.Label(
+            scheduling_frame,
+            text="Normal scheduling",
+            bg=self.bg_color,
+            fg="#888888",
+            font=self.fonts['normal'],
+            justify=tk.LEFT,
+            anchor="w",
+            wraplength=440
+        )
+        self.realtime_status_label.pack(fill=tk.X, pady=(8, 0))
+        
+        apply_btn = self.create_modern_button(
+            scheduling_frame,
+            "Apply",
+            self.apply_scheduling,
+            bg_color=self.accent_color,
+            hover_color="#005a9e",
+            width=12
+        )
+        apply_btn.pack(anchor="w", pady=(12, 0))
+    
+    def create_hotkeys_tab(self, parent):
+        """Create the hotkey bindings and profiles sections"""
+        bindings_frame = self.create_section(parent, "Hotkey Bindings", pady=(12, 12))
+        
+        hint_label = tk.Label(
+            bindings_frame,
+            text="Chords like f7, ctrl+shift+p or alt+f1; leave empty to unbind.\n"
+                 "The Start/Stop toggle is chosen on the Clicker tab.",
+            bg=self.bg_color,
+            fg="#888888",
+            font=self.fonts['normal'],
+            justify=tk.LEFT,
+            anchor="w"
+        )
+        hint_label.pack(fill=tk.X, pady=(0, 8))
+        
+        grid = tk.Frame(bindings_frame, bg=self.secondary_bg)
+        grid.pack(fill=tk.X)
+        grid.columnconfigure(1, weight=1)
+        
+        self.hotkey_entries = {}
+        rows = (
+            ('start', "Start / Resume"),
+            ('stop', "Stop"),
+            ('pause', "Pause / Resume"),
+            ('reset', "Reset Counter"),
+            ('switch-profile', "Next Profile"),
+        )
+        for row, (action, title) in enumerate(rows):
+            tk.Label(
+                grid,
+                text=title,
+                bg=self.secondary_bg,
+                fg=self.fg_color,
+                font=self.fonts['normal'],
+                anchor="w"
+            ).grid(row=row, column=0, sticky="w", padx=15, pady=6)
+            entry = tk.Entry(
+                grid,
+                bg=self.bg_color,
+                fg=self.fg_color,
+                insertbackground=self.fg_color,
+                font=self.fonts['input'],
+                relief=tk.FLAT,
+                highlightthickness=1,
+                highlightbackground=self.secondary_bg,
+                highlightcolor=self.accent_color,
+                width=18,
+                borderwidth=0
+            )
+            entry.grid(row=row, column=1, sticky="e", padx=15, pady=6)
+            self.hotkey_entries[action] = entry
+        
+        apply_btn = self.create_modern_button(
+            bindings_frame,
+            "Apply",
+            self.apply_hotkeys,
+            bg_color=self.accent_color,
+            hover_color="#005a9e",
+            width=12
+        )
+        apply_btn.pack(anchor="w", pady=(12, 0))
+        
+        profiles_frame = self.create_section(parent, "Profiles")
+        
+        self.profiles_listbox = tk.Listbox(
+            profiles_frame,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            selectbackground=self.accent_color,
+            selectforeground=self.fg_color,
+            font=self.fonts['input'],
+            relief=tk.FLAT,
+            highlightthickness=0,
+            borderwidth=0,
+            activestyle="none",
+            height=5
+        )
+        self.profiles_listbox.pack(fill=tk.X)
+        
+        profile_buttons = tk.Frame(profiles_frame, bg=self.bg_color)
+        profile_buttons.pack(fill=tk.X, pady=(12, 0))
+        
+        save_btn = self.create_modern_button(
+            profile_buttons,
+            "+ Save Current",
+            self.save_profile,
+            bg_color=self.success_color,
+            hover_color="#218838",
+            width=14
+        )
+        save_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
+        load_btn = self.create_modern_button(
+            profile_buttons,
+            "Load",
+            self.load_selected_profile,
+            width=12
+        )
+        load_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
+        remove_btn = self.create_modern_button(
+            profile_buttons,
+            "Remove",
+            self.remove_selected_profile,
+            bg_color=self.danger_color,
+            hover_color="#c82333",
+            width=12
+        )
+        remove_btn.pack(side=tk.LEFT)
+    
+    def create_section(self, parent, title, pady=(0, 12)):
+        """Create a section with title"""
+        section = tk.Frame(parent, bg=self.bg_color)
+        section.pack(fill=tk.X, pady=pady)
+        
+        title_label = tk.Label(
+            section,
+            text=title,
+            bg=self.bg_color,
+            fg="#888888",
+            font=self.fonts['section'],
+            anchor="w"
+        )
+        title_label.pack(fill=tk.X, pady=(0, 6))
+        
+        return section
+    
+    def create_modern_button(self, parent, text, command, bg_color=None, hover_color=None, width=None):
+        """Create a modern styled button"""
+        if bg_color is None:
+            bg_color = self.accent_color
+        if hover_color is None:
+            hover_color = "#005a9e"
+        
+        btn = tk.Button(
+            parent,
+            text=text,
+            command=command,
+            bg=bg_color,
+            fg=self.fg_color,
+            font=self.fonts['normal_bold'],
+            relief=tk.FLAT,
+            cursor="hand2",
+            width=width,
+            pady=10
+        )
+        
+        def on_enter(e):
+            btn.config(bg=hover_color)
+        
+        def on_leave(e):
+            btn.config(bg=bg_color)
+        
+        btn.bind("<Enter>", on_enter)
+        btn.bind("<Leave>", on_leave)
+        
+        return btn
+    
+    def create_dropdown(self, parent, variable, values, width=18, callback=None):
+        """Create a custom dropdown with dark theme"""
+        # Create frame to hold the menubutton and arrow
+        dropdown_frame = tk.Frame(parent, bg=self.secondary_bg)
+        
+        # Create the menubutton
+        mb = tk.Menubutton(
+            dropdown_frame,
+            textvariable=variable,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            font=self.fonts['normal'],
+            relief=tk.FLAT,
+            borderwidth=0,
+            highlightthickness=1,
+            highlightbackground=self.secondary_bg,
+            highlightcolor=self.accent_color,
+            width=width,
+            anchor="w",
+            cursor="hand2"
+        )
+        
+        # Create the menu
+        menu = tk.Menu(
+            mb,
+            tearoff=0,
+            bg=self.secondary_bg,
+            fg=self.fg_color,
+            selectcolor=self.accent_color,
+            bd=0,
+            activebackground=self.button_hover,
+            activeforeground=self.fg_color,
+            font=self.fonts['normal']
+        )
+        
+        # Add values to menu
+        for value in values:
+            menu.add_radiobutton(
+                label=value,
+                variable=variable,
+                command=lambda v=value: (variable.set(v), callback(v) if callback else None)
+            )
+        
+        mb.config(menu=menu)
+        mb.pack(side=tk.LEFT)
+        
+        # Configure Windows menu colors
+        if platform.system() == "Windows":
+            try:
+                # Set dark mode for the menu
+                self._configure_windows_menu_colors(mb, menu)
+            except (AttributeError, OSError, RuntimeError):
+                # Silently ignore if dark mode API is not available
+                pass
+        
+        return dropdown_frame
+    
+    def _configure_windows_menu_colors(self, menubutton, menu):
+        """Configure Windows menu to use dark theme"""
+        try:
+            # Try to use dark mode API for Windows 10/11
+            import ctypes
+            ctypes.windll.uxtheme.SetWindowTheme(menubutton.winfo_id(), "DarkMode_Explorer", None)
+        except (AttributeError, OSError, RuntimeError):
+            # Menu colors are configured via Menu widget settings above
+            pass
+    
+    def on_key_mode_change(self):
+        """Handle key mode change"""
+        frames = {
+            "regular": self.regular_key_frame,
+            "special": self.special_key_frame,
+            "sequence": self.sequence_frame,
+            "trace": self.trace_frame,
+            "text": self.text_frame,
+        }
+        selected = frames[self.key_mode.get()]
+        for frame in frames.values():
+            if frame is not selected:
+                frame.pack_forget()
+        selected.pack(fill=tk.X, pady=(0, 15))
+    
+    def on_hotkey_change(self, event=None):
+        """Handle toggle hotkey change"""
+        self.apply_hotkeys()
+    
+    def apply_hotkeys(self):
+        """Validate the hotkey fields and swap in the new binding table"""
+        bindings = {'toggle': self.hotkey_var.get().lower()}
+        for action, entry in self.hotkey_entries.items():
+            bindings[action] = entry.get().strip()
+        try:
+            self.hotkeys.set_bindings(bindings, self.hotkey_key_names)
+        except ValueError as e:
+            self.show_error_dialog("Error", str(e))
+            return
+        self.hotkey_bindings = bindings
+    
+    def get_target_key(self):
+        """Get the name of the target key to press"""
+        if self.key_mode.get() == "regular":
+            key_str = self.regular_key_entry.get().strip()
+            if not key_str:
+                raise ValueError("Please enter a key")
+            return key_str
+        else:
+            special_key_name = self.special_key_var.get()
+            if special_key_name not in self.special_keys:
+                raise ValueError(f"Invalid special key: {special_key_name}")
+            return special_key_name
+    
+    def toggle_clicking(self):
+        """Start or stop the key clicking"""
+        if not self.is_running:
+            self.start_clicking()
+        else:
+            self.stop_clicking()
+    
+    def build_job(self, name):
+        """Create a job from the current Clicker settings"""
+        # Validate inputs
+        interval = float(self.interval_entry.get())
+        burst = self.burst_var.get()
+        rate_cap = float(self.rate_cap_entry.get()) if burst else None
+        limit = int(self.limit_entry.get())
+        
+        if self.key_mode.get() == "sequence":
+            spec = dict(sequence=self.sequence_entry.get())
+        elif self.key_mode.get() == "trace":
+            path = self.trace_entry.get().strip()
+            if not path:
+                raise ValueError("Please choose a trace file")
+            spec = dict(trace=path, loops=int(self.loops_entry.get()), start_event=int(self.start_event_entry.get()))
+        elif self.key_mode.get() == "text":
+            cps = float(self.cps_entry.get())
+            if cps <= 0:
+                raise ValueError("Characters per second must be positive")
+            interval = 1.0 / cps
+            path = self.text_file_entry.get().strip()
+            spec = dict(text_file=path) if path else dict(text=self.text_entry.get())
+            spec['start_offset'] = int(self.start_offset_entry.get())
+        else:
+            spec = dict(key=self.get_target_key())
+        spec.update(interval=interval, limit=limit, burst=burst, rate_cap=rate_cap,
+                    distribution=self.distribution_var.get(), jitter=float(self.jitter_entry.get()),
+                    fit_trace=self.fit_trace_path)
+        return self.create_spec_job(name, spec)
+    
+    def create_spec_job(self, name, spec):
+        """Create a job from create_job keyword arguments (minus the backend)"""
+        # The backend (or engine process) is created by the background startup
+        # stage; hotkeys may ask before it is done, so never wait for it here
+        if not self.background_ready.is_set():
+            raise RuntimeError("Still starting up, try again in a moment")
+        if self.engine == "process":
+            if self.scheduler is None:
+                raise RuntimeError("Engine process is not available")
+            job = self.scheduler.create_job(name, **spec)
+        else:
+            if self.backend is None:
+                raise RuntimeError("No output backend available")
+            job = create_job(self.backend, name, **spec)
+        
+        # Runs on the scheduler thread; only control events go through the queue
+        job.on_finish = lambda j, reason, detail: self.post_message("job_finished", (j, reason, detail))
+        job.on_window = lambda j: self.post_message("job_window", j)
+        return job
+    
+    def build_window(self):
+        """RunWindow from the Start At / For / Every fields, or None to start right away"""
+        run_for = self.run_for_entry.get().strip()
+        every = self.every_entry.get().strip()
+        return make_window(
+            at=self.start_at_entry.get().strip(),
+            duration=float(run_for) if run_for else None,
+            every=float(every) if every else None,
+        )
+    
+    def start_clicking(self):
+        """Start clicking keys"""
+        try:
+            self.start_main(self.build_window())
+        except ValueError as e:
+            self.show_error_dialog("Error", str(e))
+        except Exception as e:
+            self.show_error_dialog("Error", f"Failed to start: {str(e)}")
+    
+    def start_main(self, window=None):
+        """Start the main job from the Clicker settings; raises on invalid settings"""
+        if self.recorder is not None:
+            # The recorder would capture our own output
+            raise ValueError("Stop recording before starting")
+        self.main_job = self.build_job("Main")
+        self.scheduler.start_job(self.main_job, window)
+        
+        # Update UI
+        self.is_running = True
+        self.start_btn.config(state=tk.DISABLED)
+        self.stop_btn.config(state=tk.NORMAL)
+        
+        self.main_rate.reset()
+        self.main_history.reset()
+        self.sparkline.redraw()
+        if self.main_job.waiting:
+            self.show_window_state(self.main_job)
+        self.schedule_frame()
+    
+    def stop_clicking(self):
+        """Stop clicking keys"""
+        self.is_running = False
+        self.is_paused = False
+        if self.main_job is not None:
+            self.scheduler.stop_job(self.main_job)
+        self.start_btn.config(state=tk.NORMAL)
+        self.stop_btn.config(state=tk.DISABLED)
+        self.update_tray_status()
+    
+    def start_or_resume(self):
+        """Start clicking, or resume a paused run"""
+        if not self.is_running:
+            self.start_clicking()
+        elif self.is_paused:
+            self.toggle_pause()
+    
+    def toggle_pause(self):
+        """Pause or resume the running clicker without resetting its counter"""
+        if not self.is_running or self.main_job is None:
+            return
+        if self.is_paused:
+            self.is_paused = False
+            self.scheduler.resume_job(self.main_job)
+            self.main_rate.reset()
+            self.schedule_frame()
+        elif not self.main_job.waiting:
+            self.is_paused = True
+            self.scheduler.pause_job(self.main_job)
+            self.stats_label.config(text="Paused")
+            self.update_tray_status()
+    
+    def on_distribution_change(self, distribution):
+        """Ask for the trace to fit when the empirical distribution is chosen"""
+        if distribution != "empirical":
+            return
+        from tkinter import filedialog
+        path = filedialog.askopenfilename(
+            parent=self.root,
+            title="Choose Trace to Fit Delays From",
+            filetypes=[("Key traces", f"*{TRACE_EXTENSION}"), ("All files", "*.*")]
+        )
+        if path:
+            self.fit_trace_path = path
+        elif self.fit_trace_path is None:
+            self.distribution_var.set("fixed")
+    
+    def browse_trace(self):
+        """Choose a trace file to replay or record into"""
+        from tkinter import filedialog
+        path = filedialog.askopenfilename(
+            parent=self.root,
+            title="Choose Trace",
+            filetypes=[("Key traces", f"*{TRACE_EXTENSION}"), ("All files", "*.*")]
+        )
+        if path:
+            self.trace_entry.delete(0, tk.END)
+            self.trace_entry.insert(0, path)
+    
+    def browse_text_file(self):
+        """Choose a text file to type"""
+        from tkinter import filedialog
+        path = filedialog.askopenfilename(
+            parent=self.root,
+            title="Choose Text File",
+            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+        )
+        if path:
+            self.text_file_entry.delete(0, tk.END)
+            self.text_file_entry.insert(0, path)
+    
+    def toggle_recording(self):
+        """Start or stop recording keystrokes into the trace file"""
+        if self.recorder is not None:
+            self.recorder.stop()
+            self.record_status_label.config(text=f"Recorded {self.recorder.count} events")
+            self.recorder = None
+            self.record_btn.config(text="● Record")
+            return
+        
+        if self.is_running:
+            self.show_error_dialog("Error", "Stop clicking before recording")
+            return
+        path = self.trace_entry.get().strip()
+        if not path:
+            from tkinter import filedialog
+            path = filedialog.asksaveasfilename(
+                parent=self.root,
+                title="Record Trace",
+                defaultextension=TRACE_EXTENSION,
+                filetypes=[("Key traces", f"*{TRACE_EXTENSION}")]
+            )
+            if not path:
+                return
+            self.trace_entry.insert(0, path)
+        
+        recorder = TraceRecorder(path)
+        try:
+            recorder.start()
+        except Exception as e:
+            self.show_error_dialog("Error", f"Failed to start recording: {e}")
+            return
+        self.recorder = recorder
+        self.record_btn.config(text="■ Stop Recording")
+        self.refresh_recording()
+    
+    def refresh_recording(self):
+        """Show the live event count while recording"""
+        if self.recorder is not None:
+            self.record_status_label.config(text=f"{self.recorder.count} events")
+            self.root.after(500, self.refresh_recording)
+    
+    def capture_profile(self):
+        """Current Clicker settings as a dictionary"""
+        return {
+            'key_mode': self.key_mode.get(),
+            'regular_key': self.regular_key_entry.get(),
+            'special_key': self.special_key_var.get(),
+            'sequence': self.sequence_entry.get(),
+            'trace': self.trace_entry.get(),
+            'loops': self.loops_entry.get(),
+            'text': self.text_entry.get(),
+            'text_file': self.text_file_entry.get(),
+            'cps': self.cps_entry.get(),
+            'interval': self.interval_entry.get(),
+            'burst': self.burst_var.get(),
+            'rate_cap': self.rate_cap_entry.get(),
+            'limit': self.limit_entry.get(),
+            'distribution': self.distribution_var.get(),
+            'jitter': self.jitter_entry.get(),
+            'fit_trace': self.fit_trace_path,
+            'start_at': self.start_at_entry.get(),
+            'run_for': self.run_for_entry.get(),
+            'every': self.every_entry.get(),
+        }
+    
+    def apply_profile(self, settings):
+        """Load settings into the Clicker form, restarting a running clicker with them"""
+        self.key_mode.set(settings['key_mode'])
+        self.special_key_var.set(settings['special_key'])
+        self.burst_var.set(settings['burst'])
+        self.distribution_var.set(settings['distribution'])
+        self.fit_trace_path = settings['fit_trace']
+        for entry, value in ((self.regular_key_entry, settings['regular_key']),
+                             (self.sequence_entry, settings['sequence']),
+                             (self.trace_entry, settings['trace']),
+                             (self.loops_entry, settings['loops']),
+                             (self.text_entry, settings['text']),
+                             (self.text_file_entry, settings['text_file']),
+                             (self.cps_entry, settings['cps']),
+                             (self.interval_entry, settings['interval']),
+                             (self.rate_cap_entry, settings['rate_cap']),
+                             (self.limit_entry, settings['limit']),
+                             (self.jitter_entry, settings['jitter']),
+                             (self.start_at_entry, settings['start_at']),
+                             (self.run_for_entry, settings['run_for']),
+                             (self.every_entry, settings['every'])):
+            entry.delete(0, tk.END)
+            entry.insert(0, value)
+        self.on_key_mode_change()
+        
+        if self.is_running:
+            self.stop_clicking()
+            self.start_clicking()
+    
+    def configure_main(self, spec):
+        """Load create_job options (from the control API) into the Clicker form"""
+        settings = self.capture_profile()
+        if 'key' in spec:
+            if spec['key'] in self.special_keys:
+                settings.update(key_mode="special", special_key=spec['key'])
+            else:
+                settings.update(key_mode="regular", regular_key=spec['key'])
+        elif 'sequence' in spec:
+            settings.update(key_mode="sequence", sequence=spec['sequence'])
+        elif 'trace' in spec:
+            settings.update(key_mode="trace", trace=spec['trace'])
+        elif 'text' in spec or 'text_file' in spec:
+            settings.update(key_mode="text", text=spec.get('text') or "", text_file=spec.get('text_file') or "")
+            if 'interval' in spec:
+                # The text form sets its pace in characters per second
+                settings['cps'] = f"{1.0 / spec['interval']:g}"
+                spec = {option: value for option, value in spec.items() if option != 'interval'}
+        for option in ('interval', 'limit', 'rate_cap', 'loops', 'jitter'):
+            if option in spec:
+                settings[option] = str(spec[option])
+        for option in ('burst', 'distribution', 'fit_trace'):
+            if option in spec:
+                settings[option] = spec[option]
+        if 'start_event' in spec:
+            self.start_event_entry.delete(0, tk.END)
+            self.start_event_entry.insert(0, str(spec['start_event']))
+        if 'start_offset' in spec:
+            self.start_offset_entry.delete(0, tk.END)
+            self.start_offset_entry.insert(0, str(spec['start_offset']))
+        self.apply_profile(settings)
+    
+    def save_profile(self):
+        """Save the current Clicker settings as a new profile"""
+        settings = self.capture_profile()
+        if settings['key_mode'] == "sequence":
+            target = settings['sequence']
+        elif settings['key_mode'] == "trace":
+            target = os.path.basename(settings['trace'])
+        elif settings['key_mode'] == "text":
+            target = os.path.basename(settings['text_file']) or repr(settings['text'][:20])
+        elif settings['key_mode'] == "special":
+            target = settings['special_key']
+        else:
+            target = settings['regular_key']
+        name = f"Profile {len(self.profiles) + 1}: {target} every {settings['interval']}s"
+        self.profiles.append((name, settings))
+        self.profiles_listbox.insert(tk.END, name)
+    
+    def load_profile(self, index):
+        """Activate a saved profile"""
+        self.profile_index = index
+        self.profiles_listbox.selection_clear(0, tk.END)
+        self.profiles_listbox.selection_set(index)
+        self.apply_profile(self.profiles[index][1])
+    
+    def load_selected_profile(self):
+        """Activate the profile selected in the list"""
+        selection = self.profiles_listbox.curselection()
+        if selection:
+            self.load_profile(selection[0])
+    
+    def next_profile(self):
+        """Cycle to the next saved profile"""
+        if not self.profiles:
+            return
+        index = 0 if self.profile_index is None else (self.profile_index + 1) % len(self.profiles)
+        self.load_profile(index)
+    
+    def remove_selected_profile(self):
+        """Delete the profile selected in the list"""
+        selection = self.profiles_listbox.curselection()
+        if not selection:
+            return
+        index = selection[0]
+        del self.profiles[index]
+        self.profiles_listbox.delete(index)
+        if self.profile_index is not None and self.profile_index >= index:
+            self.profile_index = self.profile_index - 1 if self.profile_index > index else None
+    
+    def add_job(self):
+        """Add a concurrent job from the current Clicker settings and start it"""
+        try:
+            window = self.build_window()
+            job = self.build_job(f"Job {len(self.jobs) + 1}")
+            self.scheduler.start_job(job, window)
+        except ValueError as e:
+            self.show_error_dialog("Error", str(e))
+            return
+        except Exception as e:
+            self.show_error_dialog("Error", f"Failed to add job: {str(e)}")
+            return
+        self.insert_job(job, window)
+    
+    def insert_job(self, job, window=None, index=None):
+        """Show a new job in the jobs list and tray"""
+        if index is None:
+            index = len(self.jobs)
+        self.jobs.insert(index, job)
+        self._job_windows[job] = window
+        self.jobs_listbox.insert(index, self.describe_job(job))
+        self.refresh_job(job)
+        self.schedule_frame()
+        self.update_tray_menu()
+    
+    def selected_job(self):
+        """Return the job selected in the jobs list, or None"""
+        selection = self.jobs_listbox.curselection()
+        if not selection:
+            return None
+        return self.jobs[selection[0]]
+    
+    def toggle_job(self, job):
+        """Start or stop a concurrent job"""
+        if job not in self.jobs:
+            return
+        if job.running:
+            self.scheduler.stop_job(job)
+        else:
+            try:
+                self.scheduler.start_job(job, self._job_windows.get(job))
+            except ValueError as e:
+                self.show_error_dialog("Error", f"{job.name}: {e}")
+                return
+            self.schedule_frame()
+        self.refresh_job(job)
+        self.update_tray_status()
+    
+    def toggle_selected_job(self):
+        """Start or stop the selected job"""
+        job = self.selected_job()
+        if job is not None:
+            self.toggle_job(job)
+    
+    def remove_selected_job(self):
+        """Stop and remove the selected job"""
+        job = self.selected_job()
+        if job is not None:
+            self.remove_job(job)
+    
+    def remove_job(self, job):
+        """Stop a job and drop it from the jobs list and tray"""
+        self.scheduler.stop_job(job)
+        index = self.jobs.index(job)
+        del self.jobs[index]
+        self._shown_counts.pop(job, None)
+        self._job_windows.pop(job, None)
+        self.jobs_listbox.delete(index)
+        self.update_tray_menu()
+        self.update_tray_status()
+    
+    def describe_job(self, job):
+        """One-line job summary for the jobs list and tray"""
+        if job.waiting:
+            state = f"starts {format_time(job.next_start)}"
+        else:
+            state = "running" if job.running else "stopped"
+        limit = f"/{job.limit}" if job.limit > 0 else ""
+        return f"{job.name}: {job.description}  every {job.interval:g}s  {job.count}{limit}  [{state}]"
+    
+    def refresh_job(self, job):
+        """Redraw a job's row in the jobs list"""
+        if job not in self.jobs:
+            return
+        index = self.jobs.index(job)
+        selected = self.jobs_listbox.curselection()
+        self._shown_counts[job] = job.count
+        self.jobs_listbox.delete(index)
+        self.jobs_listbox.insert(index, self.describe_job(job))
+        if index in selected:
+            self.jobs_listbox.selection_set(index)
+    
+    def schedule_frame(self):
+        """Start sampling job counters once per frame, if not already running"""
+        if not self._frame_scheduled:
+            self._frame_scheduled = True
+            self.root.after(self.FRAME_INTERVAL, self.refresh_counters)
+    
+    def refresh_counters(self):
+        """Sample every job's shared counter and redraw what changed"""
+        self._frame_scheduled = False
+        job = self.main_job
+        if job is not None and job.running and not job.waiting:
+            count = job.count
+            if count != self.press_count:
+                self.update_counter(count)
+            rate = self.main_rate.sample(count)
+            self.stats_label.config(text=f"Live: {rate:.1f} presses/s")
+            if self.main_history.sample(count):
+                self.sparkline.redraw()
+            if job.stats is not None:
+                self.update_metrics(job.stats)
+        
+        for job in self.jobs:
+            if job.count != self._shown_counts.get(job):
+                self.refresh_job(job)
+        
+        # Jobs waiting for their window need no frames until it opens
+        jobs = [self.main_job] + self.jobs
+        if any(job is not None and job.running and not job.waiting for job in jobs):
+            self.schedule_frame()
+        self.update_tray_status()
+    
+    def on_job_finished(self, job, reason, detail):
+        """Handle the end of a job run reported by the scheduler"""
+        if reason == "error":
+            self.tray_error = True
+        self.update_tray_status()
+        if job is self.main_job:
+            self.update_counter(job.count)
+            if job.stats is None:
+                # Stopped before its window opened
+                if self.is_running:
+                    self.stop_clicking()
+                self.stats_label.config(text="Last run: -")
+                return
+            summary = job.stats.summary()
+            if getattr(job, 'unsupported', None):
+                summary += f" (skipped keys: {', '.join(sorted(job.unsupported))})"
+            self.stats_label.config(text=summary)
+            if hasattr(job, 'position'):
+                self.start_event_entry.delete(0, tk.END)
+                self.start_event_entry.insert(0, str(job.position))
+            if hasattr(job, 'offset'):
+                self.start_offset_entry.delete(0, tk.END)
+                self.start_offset_entry.insert(0, str(job.offset))
+            self.update_metrics(job.stats)
+            if reason == "error":
+                self.show_error_dialog("Error", detail)
+            if self.is_running:
+                # Limit reached, error, or stopped outside the GUI (hotkey)
+                self.stop_clicking()
+        elif job in self.jobs:
+            self.refresh_job(job)
+            self.update_tray_menu()
+            if reason == "error":
+                self.show_error_dialog("Error", f"{job.name}: {detail}")
+    
+    def on_job_window(self, job):
+        """Handle a job's window opening or closing"""
+        if job is self.main_job:
+            self.show_window_state(job)
+            if not job.waiting:
+                self.main_rate.reset()
+        elif job in self.jobs:
+            self.refresh_job(job)
+            self.update_tray_menu()
+        self.schedule_frame()
+    
+    def show_window_state(self, job):
+        """Show when the main job's next window opens, with the last window's results"""
+        if not job.waiting:
+            return
+        text = f"Next window: {format_time(job.next_start)}"
+        if job.stats is not None:
+            self.update_counter(job.count)
+            self.update_metrics(job.stats)
+            text = f"{job.stats.summary()}\n{text}"
+        self.stats_label.config(text=text)
+    
+    def update_metrics(self, stats):
+        """Show a run's statistics in the metrics panel"""
+        labels = self.metric_labels
+        labels['rate'].config(text=f"{stats.mean_rate:.2f} of {stats.target_rate:.2f} presses/s")
+        # Histogram quantiles are bucket bounds; the observed maximum is tighter when smaller
+        p50 = min(stats.lateness.quantile(0.5), stats.max_lateness)
+        p99 = min(stats.lateness.quantile(0.99), stats.max_lateness)
+        labels['lateness'].config(text=f"≤{p50 * 1000:g} / ≤{p99 * 1000:g} ms")
+        labels['max_lateness'].config(text=f"{stats.max_lateness * 1000:.3f} ms")
+        labels['overruns'].config(text=f"{stats.overruns} / {stats.skipped}")
+        labels['backend'].config(text=f"{stats.backend_time_per_press * 1e6:.1f} µs")
+    
+    def apply_scheduling(self):
+        """Apply the Engine Scheduling settings to the running engine"""
+        try:
+            cpus_text = self.cpus_entry.get().strip()
+            policy = self.rt_policy_var.get()
+            settings = RealtimeSettings(
+                parse_cpus(cpus_text) if cpus_text else None,
+                None if policy == "normal" else policy,
+                int(self.rt_priority_entry.get()),
+                self.timerfd_var.get(),
+            )
+        except ValueError as e:
+            self.show_error_dialog("Error", str(e))
+            return
+        self.realtime = settings
+        if self.scheduler is None:
+            # The engine process is still starting; it picks up self.realtime
+            return
+        self.scheduler.configure_realtime(settings)
+        self.realtime_status_label.config(text="Applied when the engine next runs", fg="#888888")
+    
+    def update_realtime_status(self, status):
+        """Show which scheduling settings took effect and why others did not"""
+        text = status.describe()
+        if status.warnings:
+            text += "\n" + "\n".join(status.warnings)
+        self.realtime_status_label.config(text=text, fg=self.danger_color if status.warnings else "#888888")
+    
+    def export_metrics(self):
+        """Save the statistics of every job as JSON or a Prometheus textfile"""
+        jobs = [job for job in [self.main_job] + self.jobs if job is not None and job.stats is not None]
+        if not jobs:
+            self.show_error_dialog("Error", "No runs to export yet")
+            return
+        
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(
+            parent=self.root,
+            title="Export Metrics",
+            initialfile="key_clicker_metrics.json",
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("Prometheus textfile", "*.prom")]
+        )
+        if not path:
+            return
+        try:
+            write_metrics(path, jobs)
+        except OSError as e:
+            self.show_error_dialog("Error", f"Failed to export metrics: {e}")
+    
+    def reset_counter(self):
+        """Reset the press counter"""
+        self.press_count = 0
+        self.counter_label.config(text="0")
+    
+    def update_counter(self, count):
+        """Update the counter display"""
+        self.press_count = count
+        self.counter_label.config(text=str(count))
+    
+    def post_message(self, msg_type, data=None):
+        """Queue a message for the GUI and wake the Tk loop (safe from any thread)"""
+        self.message_queue.put((msg_type, data))
+        self.notifier.notify()
+    
+    def on_background_ready(self):
+        """Enable starting once the output backend (or engine process) exists"""
+        available = self.scheduler is not None and (self.engine == "process" or self.backend is not None)
+        if not available:
+            return
+        if not self.is_running:
+            self.start_btn.config(state=tk.NORMAL)
+        self.add_job_btn.config(state=tk.NORMAL)
+    
+    def run_on_tk(self, function, *args):
+        """Call function on the Tk thread; returns a concurrent.futures.Future of its result"""
+        # Deferred import keeps startup fast
+        import concurrent.futures
+        future = concurrent.futures.Future()
+        self.post_message("call", (future, function, args))
+        return future
+
+    def start_control_server(self):
+        """Serve the control API on the --control socket (background startup stage)"""
+        from clicker_control import ControlError, ControlServer
+        from clicker_gui_control import GuiController
+        server = ControlServer(self.control_path, GuiController(self))
+        try:
+            server.start()
+        except ControlError as e:
+            self.post_message("error", str(e))
+            return
+        self.control_server = server
+
+    def process_messages(self):
+        """Handle every queued message from worker threads"""
+        try:
+            while True:
+                msg_type, data = self.message_queue.get_nowait()
+                if msg_type == "job_finished":
+                    self.on_job_finished(*data)
+                elif msg_type == "job_window":
+                    self.on_job_window(data)
+                elif msg_type == "error":
+                    self.tray_error = True
+                    self.show_error_dialog("Error", data)
+                    self.stop_clicking()
+                elif msg_type == "ready":
+                    self.on_background_ready()
+                elif msg_type == "realtime":
+                    self.update_realtime_status(data)
+                elif msg_type == "call":
+                    future, function, args = data
+                    if future.set_running_or_notify_cancel():
+                        try:
+                            future.set_result(function(*args))
+                        except Exception as e:
+                            future.set_exception(e)
+        except queue.Empty:
+            pass
+    
+    def setup_hotkey_listener(self):
+        """Install the global hotkey listener; runs once for the whole session"""
+        try:
+            from pynput.keyboard import Key
+            self.hotkey_key_names = {key.name for key in Key}
+            self.hotkeys.set_bindings(self.hotkey_bindings, self.hotkey_key_names)
+        except ValueError as e:
+            print(f"Warning: {e}")
+        
+        try:
+            self.hotkeys.start()
+        except (OSError, RuntimeError) as e:
+            print(f"Warning: Could not setup hotkey listener: {e}")
+        except Exception as e:
+            # Log unexpected errors for debugging
+            import traceback
+            print(f"Unexpected error setting up hotkey listener: {e}")
+            traceback.print_exc()
+    
+    def on_hotkey(self, action):
+        """Handle a bound hotkey (called on the listener thread)"""
+        if action in ('toggle', 'stop'):
+            job = self.main_job
+            if job is not None and (job.running or job.paused):
+                # Stop straight from the listener thread so no more keys escape while
+                # the Tk loop is busy; the GUI catches up from the job's on_finish
+                self.scheduler.stop_job(job)
+                return
+            if action == 'stop':
+                return
+        try:
+            self.root.after(0, self.hotkey_handlers[action])
+        except (AttributeError, RuntimeError):
+            # Ignore errors during shutdown or when root is destroyed
+            pass
+    
+    def setup_system_tray(self):
+        """Setup system tray icon"""
+        import pystray
+        from pystray import MenuItem as item
+        from clicker_tray import render_sprites
+        
+        # Every state's icon is drawn once here; updates only swap them
+        sprites = render_sprites()
+        
+        # Menu actions run on the tray thread; anything touching the widgets,
+        # counters or scheduler is handed to the Tk thread
+        menu = pystray.Menu(
+            item('Show Window', self.show_window),
+            item('Hide Window', self.hide_window),
+            pystray.Menu.SEPARATOR,
+            item('Start/Stop', lambda: self.run_on_tk(self.toggle_clicking)),
+            item('Pause/Resume', lambda: self.run_on_tk(self.toggle_pause)),
+            item('Reset Counter', lambda: self.run_on_tk(self.reset_counter)),
+            item('Jobs', pystray.Menu(self.tray_job_items)),
+            pystray.Menu.SEPARATOR,
+            item('Exit', self.quit_application)
+        )
+        
+        icon = pystray.Icon(
+            "AutoKeyClicker",
+            sprites['idle', 0],
+            "Auto Key Clicker",
+            menu
+        )
+        
+        # Run tray in separate thread
+        self.tray_thread = threading.Thread(target=icon.run, daemon=True)
+        self.tray_thread.start()
+        self.run_on_tk(self.attach_tray, icon, sprites)
+    
+    def attach_tray(self, icon, sprites):
+        """Start reporting to the tray icon (Tk thread)"""
+        from clicker_tray import TrayStatus
+        self.tray_icon = icon
+        self.tray_status = TrayStatus(icon, sprites, self.root.after)
+        self.update_tray_status()
+    
+    def tray_job_items(self):
+        """Build the dynamic tray submenu with one toggle per job"""
+        from pystray import MenuItem as item
+        
+        def make_item(job):
+            return item(
+                lambda _: self.describe_job(job),
+                lambda: self.run_on_tk(self.toggle_job, job),
+                checked=lambda _: job.running
+            )
+        
+        if not self.jobs:
+            return [item('No jobs', None, enabled=False)]
+        return [make_item(job) for job in list(self.jobs)]
+    
+    def update_tray_menu(self):
+        """Rebuild the tray menu after the job list changed"""
+        if self.tray_icon is not None:
+            self.tray_icon.update_menu()
+    
+    def update_tray_status(self):
+        """Show the overall state, rate and press count on the tray icon"""
+        status = self.tray_status
+        if status is None:
+            return
+        jobs = [job for job in [self.main_job] + self.jobs if job is not None]
+        active = [job for job in jobs if job.running and not job.waiting and not job.paused]
+        if active:
+            self.tray_error = False
+            count = sum(job.count for job in active)
+            rate = self.tray_rate.sample(count)
+            running = active[0].name if len(active) == 1 else f"{len(active)} jobs"
+            status.update('running', rate,
+                          f"Auto Key Clicker - {running} running, {rate:.1f} presses/s, {count} presses")
+            return
+        self.tray_rate.reset()
+        if any(job.running and job.paused for job in jobs):
+            status.update('paused', title="Auto Key Clicker - paused")
+        elif self.tray_error:
+            status.update('error', title="Auto Key Clicker - stopped by an error")
+        elif any(job.waiting for job in jobs):
+            status.update('idle', title="Auto Key Clicker - waiting for a run window")
+        else:
+            status.update('idle', title="Auto Key Clicker")
+    
+    def show_window(self, icon=None, item=None):
+        """Show the main window"""
+        def _show():
+            self.root.deiconify()
+            self.root.lift()
+            self.root.focus_force()
+        self.root.after(0, _show)
+    
+    def hide_window(self, icon=None, item=None):
+        """Hide the main window"""
+        self.root.after(0, self.root.withdraw)
+    
+    def quit_application(self, icon=None, item=None):
+        """Quit the application"""
+        def _quit():
+            if self.control_server is not None:
+                self.control_server.close()
+            self.stop_clicking()
+            if self.scheduler is not None:
+                self.scheduler.shutdown()
+            self.hotkeys.stop()
+            if self.recorder is not None:
+                self.recorder.stop()
+            if self.tray_icon:
+                self.tray_icon.stop()
+            if self.backend is not None:
+                self.backend.close()
+            self.notifier.close()
+            self.root.quit()
+            self.root.destroy()
+        self.root.after(0, _quit)
+    
+    def on_closing(self):
+        """Handle window close event"""
+        # Show notification on first close (before hiding window)
+        if self.show_tray_notification:
+            self.show_tray_notification = False  # Only show once per session
+            # Hide window only after dialog is closed
+            self.show_tray_notification_message(on_close=self.hide_window)
+        else:
+            self.hide_window()
+    
+    def show_tray_notification_message(self, on_close=None):
+        """Show notification that app is still running in tray"""
+        self.show_custom_dialog(
+            "Auto Key Clicker",
+            "The application is still running in the system tray.\n\n"
+            "You can access it by clicking the tray icon, or\n"
+            "use the hotkey to control key clicking.\n\n"
+            "To fully exit, use 'Exit' from the tray menu.",
+            dialog_type="info",
+            on_close=on_close
+        )
+    
+    def show_info(self):
+        """Show information dialog"""
+        info_text = """Auto Key Clicker v2.1
+
+A modern keyboard automation tool.
+
+Features:
+• Regular and special key support
+• Customizable intervals
+• Global hotkeys and profiles
+• Press limit option
+• System tray integration
+• Real-time counter
+
+Press the hotkey or use the tray icon
+to start/stop clicking.
+
+Use responsibly and in accordance with
+application terms of service."""
+        
+        self.show_custom_dialog("About Auto Key Clicker", info_text, dialog_type="info")
+    
+    def show_custom_dialog(self, title, message, dialog_type="info", on_close=None):
+        """Show a custom dark-themed dialog"""
+        self.dialogs.show(title, message, dialog_type, on_close)
+    
+    def show_error_dialog(self, title, message):
+        """Show a custom dark-themed error dialog"""
+        self.show_custom_dialog(title, message, dialog_type="error")
+
+
+def main(profiler=None, engine=clicker_engine.DEFAULT_ENGINE, realtime=None, control=None):
+    root = tk.Tk()
+    if profiler is not None:
+        profiler.mark("tk root")
+    app = ModernKeyClicker(root, profiler=profiler, engine=engine, realtime=realtime, control=control)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
+
+
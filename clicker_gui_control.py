@@ -0,0 +1,128 @@
+"""
+GUI Control
+Control API commands for the GUI, where the job named "main" is the one the
+Clicker tab drives and every other name is a row of the Jobs tab.
+
+Imported only when the GUI is started with --control, since the control
+server loads asyncio. Queries are answered on the server thread; commands
+that change state run on the Tk thread so the widgets stay in step.
+"""
+
+from clicker_control import EngineController, check_options
+from clicker_schedule import make_window
+
+
+MAIN_JOB = "main"
+
+# Commands that only read job state
+QUERIES = ('ping', 'list', 'status')
+
+
+class GuiController(EngineController):
+    """EngineController over a ModernKeyClicker's main job and Jobs tab"""
+
+    def __init__(self, app):
+        super().__init__(app.scheduler, app.create_spec_job)
+        self.app = app
+        self.on_shutdown = app.quit_application
+
+    def named_jobs(self):
+        """The main job (once started) followed by the Jobs tab"""
+        app = self.app
+        jobs = {}
+        if app.main_job is not None:
+            jobs[MAIN_JOB] = app.main_job
+        for job in list(app.jobs):
+            jobs[job.name] = job
+        return jobs
+
+    def call(self, command, params):
+        """Answer queries right away and run everything else on the Tk thread"""
+        if command in QUERIES:
+            return super().call(command, params)
+        return self.app.run_on_tk(super().call, command, params)
+
+    def _main_status(self):
+        """Status of the main job, or None before its first start"""
+        job = self.app.main_job
+        return self.describe(MAIN_JOB, job) if job is not None else None
+
+    def _refreshed(self, name, job):
+        """Redraw a Jobs tab row after a change and return its status"""
+        self.app.refresh_job(job)
+        self.app.schedule_frame()
+        self.app.update_tray_menu()
+        return self.describe(name, job)
+
+    def configure(self, job, start=False, **spec):
+        """Fill the Clicker form for "main"; create or replace a Jobs tab job for any other name"""
+        check_options(spec)
+        app = self.app
+        if job == MAIN_JOB:
+            app.configure_main(spec)
+            if start and not app.is_running:
+                app.start_main()
+            return self._main_status()
+
+        spec.setdefault('interval', 1.0)
+        created = app.create_spec_job(job, spec)
+        old = self.named_jobs().get(job)
+        index = None
+        if old is not None:
+            index = app.jobs.index(old)
+            app.remove_job(old)
+        app.insert_job(created, index=index)
+        if start:
+            self.scheduler.start_job(created)
+        return self._refreshed(job, created)
+
+    def start(self, job, at=None, align=None, duration=None, until=None, every=None, windows=0):
+        """Start (or resume) the main job from the Clicker form, or start a Jobs tab job"""
+        window = make_window(at, align, duration, until, every, windows)
+        app = self.app
+        if job == MAIN_JOB:
+            if not app.is_running:
+                app.start_main(window)
+            elif app.is_paused:
+                app.toggle_pause()
+            return self._main_status()
+        target = self.job(job)
+        self.scheduler.start_job(target, window)
+        return self._refreshed(job, target)
+
+    def stop(self, job):
+        """Stop the main job or a Jobs tab job"""
+        app = self.app
+        if job == MAIN_JOB:
+            if app.is_running:
+                app.stop_clicking()
+            return self._main_status()
+        super().stop(job)
+        return self._refreshed(job, self.job(job))
+
+    def pause(self, job):
+        """Pause the main job or a Jobs tab job"""
+        app = self.app
+        if job == MAIN_JOB:
+            if app.is_running and not app.is_paused:
+                app.toggle_pause()
+            return self._main_status()
+        super().pause(job)
+        return self._refreshed(job, self.job(job))
+
+    def resume(self, job):
+        """Resume the main job or a Jobs tab job"""
+        app = self.app
+        if job == MAIN_JOB:
+            if app.is_paused:
+                app.toggle_pause()
+            return self._main_status()
+        super().resume(job)
+        return self._refreshed(job, self.job(job))
+
+    def remove(self, job):
+        """Remove a Jobs tab job"""
+        if job == MAIN_JOB:
+            raise ValueError("The main job cannot be removed")
+        self.app.remove_job(self.job(job))
+        return None
@@ -0,0 +1,119 @@
+"""
+Global Hotkeys
+One long-lived keyboard listener that maps key chords to actions.
+
+Chords are written like sequence steps: modifiers and a key joined with '+',
+e.g. 'f6', 'ctrl+shift+p', 'alt+f1'. Bindings live in a dict that is replaced
+as a whole, so rebinding never restarts the OS keyboard hook and the listener
+callback stays a single dict lookup per keystroke.
+"""
+
+# Actions a chord can be bound to
+HOTKEY_ACTIONS = ('toggle', 'start', 'stop', 'pause', 'reset', 'switch-profile')
+
+# Modifier bits; left/right variants share their modifier's bit
+MODIFIER_BITS = {'ctrl': 1, 'shift': 2, 'alt': 4, 'cmd': 8}
+MODIFIER_KEYS = {
+    'ctrl': 1, 'ctrl_l': 1, 'ctrl_r': 1,
+    'shift': 2, 'shift_l': 2, 'shift_r': 2,
+    'alt': 4, 'alt_l': 4, 'alt_r': 4, 'alt_gr': 4,
+    'cmd': 8, 'cmd_l': 8, 'cmd_r': 8,
+}
+
+
+def parse_chord(text, key_names=None):
+    """Parse 'ctrl+shift+p' into a (modifier mask, key name) lookup key
+
+    key_names, if given, is the set of valid non-character key names.
+    """
+    parts = [part.strip().lower() for part in text.split('+')]
+    if not all(parts):
+        raise ValueError(f"Invalid hotkey: {text}")
+    *modifiers, key = parts
+
+    mask = 0
+    for modifier in modifiers:
+        if modifier not in MODIFIER_BITS:
+            raise ValueError(f"Unknown modifier '{modifier}' in hotkey: {text}")
+        mask |= MODIFIER_BITS[modifier]
+    if key in MODIFIER_KEYS:
+        raise ValueError(f"Hotkey needs a key besides modifiers: {text}")
+    if len(key) != 1 and key_names is not None and key not in key_names:
+        raise ValueError(f"Unknown key '{key}' in hotkey: {text}")
+    return mask, key
+
+
+def key_name(key):
+    """Lookup name of a pynput key: the Key member name or the lower-case character"""
+    name = getattr(key, 'name', None)
+    if name is not None:
+        return name
+    char = getattr(key, 'char', None)
+    if not char:
+        return None
+    if len(char) == 1 and ord(char) < 32:
+        # Ctrl+letter arrives as a control character on some platforms
+        return chr(ord(char) + 96)
+    return char.lower()
+
+
+class HotkeyListener:
+    """Persistent global keyboard listener with a hot-swappable binding table
+
+    dispatch(action) is called on the listener thread whenever a bound chord
+    is pressed, so it must return quickly.
+    """
+
+    def __init__(self, dispatch):
+        self.dispatch = dispatch
+        self._bindings = {}  # (modifier mask, key name) -> action
+        self._modifiers = 0
+        self._listener = None
+
+    def set_bindings(self, bindings, key_names=None):
+        """Replace all bindings from an {action: chord text} mapping; empty chords are unbound
+
+        Raises ValueError without changing anything if a chord is invalid or
+        bound twice.
+        """
+        table = {}
+        for action, chord in bindings.items():
+            if action not in HOTKEY_ACTIONS:
+                raise ValueError(f"Unknown hotkey action: {action}")
+            if not chord:
+                continue
+            lookup = parse_chord(chord, key_names)
+            if lookup in table:
+                raise ValueError(f"Hotkey {chord} is bound to both {table[lookup]} and {action}")
+            table[lookup] = action
+        # A single reference swap; the listener thread sees the old or the new table
+        self._bindings = table
+
+    def start(self):
+        """Install the OS keyboard hook (once)"""
+        if self._listener is not None:
+            return
+        from pynput import keyboard
+        self._listener = keyboard.Listener(on_press=self._on_press, on_release=self._on_release)
+        self._listener.start()
+
+    def stop(self):
+        """Remove the OS keyboard hook without waiting for the listener thread"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def _on_press(self, key):
+        name = key_name(key)
+        bit = MODIFIER_KEYS.get(name)
+        if bit is not None:
+            self._modifiers |= bit
+            return
+        action = self._bindings.get((self._modifiers, name))
+        if action is not None:
+            self.dispatch(action)
+
+    def _on_release(self, key):
+        bit = MODIFIER_KEYS.get(key_name(key))
+        if bit is not None:
+            self._modifiers &= ~bit
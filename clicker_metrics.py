@@ -0,0 +1,197 @@
+"""
+Run Metrics
+Constant-memory timing histograms and exporters for job statistics.
+
+Metrics can be written as JSON or in the Prometheus text exposition format
+(for node_exporter's textfile collector). Files are replaced atomically so a
+collector never reads a half-written file.
+"""
+
+from array import array
+import bisect
+import json
+import math
+import os
+import time
+
+
+# Upper bounds (seconds) of the tick lateness buckets; one overflow bucket follows
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+PROMETHEUS_PREFIX = "key_clicker"
+
+# Rate history kept for the live graph: one point per step over the last 5 minutes
+RATE_HISTORY_SIZE = 300
+RATE_HISTORY_STEP = 1.0
+
+
+class Histogram:
+    """Fixed-bucket histogram; memory does not grow with the number of samples"""
+
+    __slots__ = ('bounds', 'counts', 'count', 'total')
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        """Add one sample"""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, fraction):
+        """Upper bound of the bucket holding the given quantile (inf for the overflow bucket)"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return math.inf
+
+    def to_dict(self):
+        """Bucket counts keyed by upper bound, plus sample count and sum"""
+        buckets = {f"{bound:g}": count for bound, count in zip(self.bounds, self.counts)}
+        buckets["+Inf"] = self.counts[-1]
+        return {'buckets': buckets, 'count': self.count, 'sum': self.total}
+
+
+class RateHistory:
+    """Ring buffer of presses/s figures, one every step seconds
+
+    The figures live in a preallocated array('d') overwritten in place, so a
+    run of any length keeps the same memory and no list grows per sample.
+    """
+
+    def __init__(self, size=RATE_HISTORY_SIZE, step=RATE_HISTORY_STEP):
+        self.size = size
+        self.step = step
+        self.values = array('d', bytes(8 * size))
+        self.head = 0  # slot the next figure goes to
+        self.length = 0
+        self._last_count = None
+        self._last_time = None
+
+    def reset(self):
+        """Forget every figure, e.g. when a new run starts"""
+        self.head = 0
+        self.length = 0
+        self._last_count = None
+        self._last_time = None
+
+    def sample(self, count, now=None):
+        """Feed a job counter; adds a figure once step seconds have passed and returns whether it did"""
+        if now is None:
+            now = time.perf_counter()
+        if self._last_count is None or count < self._last_count:
+            self._last_count = count
+            self._last_time = now
+            return False
+        elapsed = now - self._last_time
+        if elapsed < self.step:
+            return False
+        self.add((count - self._last_count) / elapsed)
+        self._last_count = count
+        self._last_time = now
+        return True
+
+    def add(self, rate):
+        """Append a figure, overwriting the oldest once full"""
+        self.values[self.head] = rate
+        self.head = (self.head + 1) % self.size
+        if self.length < self.size:
+            self.length += 1
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        """Figures from oldest to newest"""
+        values = self.values
+        start = (self.head - self.length) % self.size
+        for index in range(start, start + self.length):
+            yield values[index % self.size]
+
+
+def job_metrics(job):
+    """Snapshot of one job's run as a plain dictionary"""
+    metrics = {
+        'name': job.name,
+        'description': job.description,
+        'running': job.running,
+        'interval': job.interval,
+        'count': job.count,
+    }
+    if job.stats is not None:
+        metrics['stats'] = job.stats.to_dict()
+    return metrics
+
+
+def format_json(jobs):
+    """Render job metrics as a JSON document"""
+    return json.dumps({'timestamp': time.time(), 'jobs': [job_metrics(job) for job in jobs]}, indent=2)
+
+
+def _label(value):
+    """Escape a Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_prometheus(jobs):
+    """Render job metrics in the Prometheus text exposition format"""
+    gauges = (
+        ('running', 'gauge', "1 while the job is running", lambda job, stats: int(job.running)),
+        ('presses_total', 'counter', "Presses (sequence steps) in the current or last run",
+         lambda job, stats: job.count),
+        ('target_rate', 'gauge', "Scheduled presses per second", lambda job, stats: stats.target_rate),
+        ('achieved_rate', 'gauge', "Measured presses per second", lambda job, stats: stats.mean_rate),
+        ('overruns_total', 'counter', "Ticks that started after the following tick was already due",
+         lambda job, stats: stats.overruns),
+        ('skipped_ticks_total', 'counter', "Ticks skipped after falling whole intervals behind",
+         lambda job, stats: stats.skipped),
+        ('backend_seconds_total', 'counter', "Time spent inside the output backend",
+         lambda job, stats: stats.backend_time),
+    )
+    started = [job for job in jobs if job.stats is not None]
+    lines = []
+    for name, kind, help_text, value in gauges:
+        metric = f"{PROMETHEUS_PREFIX}_{name}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for job in started:
+            lines.append(f'{metric}{{job="{_label(job.name)}"}} {value(job, job.stats):g}')
+
+    metric = f"{PROMETHEUS_PREFIX}_lateness_seconds"
+    lines.append(f"# HELP {metric} Delay between each tick's deadline and its first press")
+    lines.append(f"# TYPE {metric} histogram")
+    for job in started:
+        histogram = job.stats.lateness
+        label = _label(job.name)
+        cumulative = 0
+        for bound, count in zip(histogram.bounds, histogram.counts):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{job="{label}",le="{bound:g}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{job="{label}",le="+Inf"}} {histogram.count}')
+        lines.append(f'{metric}_sum{{job="{label}"}} {histogram.total:g}')
+        lines.append(f'{metric}_count{{job="{label}"}} {histogram.count}')
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path, jobs):
+    """Atomically write metrics to path: Prometheus format for *.prom, JSON otherwise"""
+    if path.endswith('.prom'):
+        text = format_prometheus(jobs)
+    else:
+        text = format_json(jobs)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        f.write(text)
+    os.replace(temp_path, path)
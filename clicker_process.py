@@ -0,0 +1,394 @@
+"""
+Engine Process
+Runs the click engine in a dedicated process so front end work (Tk redraws,
+dialogs, tray updates) cannot delay keystrokes through the GIL.
+
+The parent talks to the engine over a Pipe for control messages (create,
+start, stop, ...) and reads press counters from a shared memory block that
+the engine process refreshes every PUBLISH_INTERVAL seconds. ProcessScheduler
+mirrors JobScheduler, and RemoteJob mirrors the Job attributes the front ends
+read, so either can drive the GUI and the CLI.
+"""
+
+import itertools
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+import weakref
+from multiprocessing import shared_memory
+
+import clicker_engine
+from clicker_backends import BackendError, create_backend
+
+
+MAX_RUNNING = 64           # counter slots in the shared memory block
+PUBLISH_INTERVAL = 0.01    # seconds between counter copies in the engine process
+STATS_INTERVAL = 0.5       # seconds between stats snapshots sent to the parent
+REPLY_TIMEOUT = 10.0       # seconds to wait for the engine to answer a request
+
+
+def _engine_main(conn, shm_name, backend_name, realtime):
+    """Engine process entry point"""
+    # Ctrl+C reaches the whole process group; the parent decides when to stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    counts = shm.buf.cast('q')
+    send_lock = threading.Lock()
+
+    def send(message):
+        with send_lock:
+            conn.send(message)
+
+    try:
+        backend = create_backend(backend_name)
+    except BackendError as e:
+        send(("ready", None, str(e)))
+        counts.release()
+        shm.close()
+        return
+    send(("ready", backend.name, None))
+
+    scheduler = clicker_engine.JobScheduler(realtime=realtime)
+    scheduler.on_realtime = lambda status: send(("realtime", None, status))
+    jobs = {}  # job id -> Job
+
+    def on_finish(job, reason, detail):
+        counts[job.slot] = job.count
+        send(("finished", job.id, (job.run, job.count, reason, detail, job.stats, _job_extras(job))))
+
+    def on_window(job):
+        counts[job.slot] = job.count
+        send(("window", job.id, (job.run, job.waiting, job.next_start, job.stats)))
+
+    last_stats = clicker_engine.clock()
+    try:
+        while True:
+            if conn.poll(PUBLISH_INTERVAL):
+                try:
+                    command, job_id, args = conn.recv()
+                except EOFError:
+                    break
+                if command == "shutdown":
+                    break
+                if command == "create":
+                    name, spec = args
+                    try:
+                        job = clicker_engine.create_job(backend, name, **spec)
+                    except ValueError as e:
+                        send(("reply", job_id, (None, str(e))))
+                        continue
+                    job.id = job_id
+                    job.on_finish = on_finish
+                    job.on_window = on_window
+                    jobs[job_id] = job
+                    send(("reply", job_id, ((job.description, job.interval, job.limit), None)))
+                elif command == "start":
+                    job = jobs[job_id]
+                    job.run, job.slot, window = args
+                    counts[job.slot] = 0
+                    try:
+                        scheduler.start_job(job, window)
+                    except ValueError as e:
+                        on_finish(job, "error", str(e))
+                elif command == "stop":
+                    scheduler.stop_job(jobs[job_id])
+                elif command == "pause":
+                    scheduler.pause_job(jobs[job_id])
+                elif command == "resume":
+                    scheduler.resume_job(jobs[job_id])
+                elif command == "realtime":
+                    scheduler.configure_realtime(args)
+                elif command == "release":
+                    job = jobs.pop(job_id, None)
+                    if job is not None:
+                        scheduler.stop_job(job)
+
+            for job in jobs.values():
+                if job.running:
+                    counts[job.slot] = job.count
+
+            now = clicker_engine.clock()
+            if now - last_stats >= STATS_INTERVAL:
+                last_stats = now
+                for job in jobs.values():
+                    if job.running:
+                        send(("stats", job.id, job.stats))
+    finally:
+        scheduler.shutdown()
+        backend.close()
+        counts.release()
+        shm.close()
+        conn.close()
+
+
+def _job_extras(job):
+    """Job type specific attributes mirrored onto the RemoteJob"""
+    extras = {}
+    if hasattr(job, 'position'):
+        extras['position'] = job.position
+    if hasattr(job, 'offset'):
+        extras['offset'] = job.offset
+    if hasattr(job, 'unsupported'):
+        extras['unsupported'] = set(job.unsupported)
+    return extras
+
+
+class RemoteJob:
+    """Parent-side handle for a job living in the engine process
+
+    Dropping the last reference releases the job in the engine process.
+    """
+
+    def __init__(self, scheduler, job_id, name, description, interval, limit):
+        self.scheduler = scheduler
+        self.id = job_id
+        self.name = name
+        self.description = description
+        self.interval = interval
+        self.limit = limit
+        self.stats = None
+        self.running = False
+        self.paused = False
+        self.run = 0  # incremented per start so events of an earlier run are recognized
+        self.slot = None  # shared counter slot while a run is unfinished
+        self.window = None
+        self.waiting = False
+        self.next_start = None
+        self.on_finish = None  # on_finish(job, reason, detail), called on the reader thread
+        self.on_window = None  # on_window(job), called on the reader thread
+        self._final_count = 0
+
+    @property
+    def count(self):
+        """Presses in the current or last run, read from shared memory while it is unfinished"""
+        slot = self.slot
+        if slot is None:
+            return self._final_count
+        return self.scheduler._counts[slot]
+
+
+class ProcessScheduler:
+    """JobScheduler counterpart that runs every job in a separate engine process"""
+
+    def __init__(self, backend_name=None, realtime=None):
+        # spawn everywhere: forking a process that runs Tk or pynput threads is unsafe
+        context = multiprocessing.get_context('spawn')
+        self._shm = shared_memory.SharedMemory(create=True, size=MAX_RUNNING * 8)
+        self._counts = self._shm.buf.cast('q')
+        self._free_slots = list(range(MAX_RUNNING - 1, -1, -1))
+        self._conn, child_conn = context.Pipe()
+        self._send_lock = threading.Lock()
+        # Guards run state (running/paused/slot of every RemoteJob, _free_slots and
+        # _unfinished) between callers, the hotkey thread and the reader thread
+        self._lock = threading.Lock()
+        self._replies = queue.Queue()
+        self._jobs = weakref.WeakValueDictionary()  # job id -> RemoteJob
+        self._unfinished = {}  # job id -> RemoteJob whose run is not reported finished yet
+        self._released = []  # ids of collected RemoteJobs, sent with the next command
+        self._ids = itertools.count(1)
+        self._closed = False
+        self.realtime_status = None
+        self.on_realtime = None  # on_realtime(status), called on the reader thread
+
+        self._process = context.Process(
+            target=_engine_main,
+            args=(child_conn, self._shm.name, backend_name, realtime),
+            name="ClickEngine",
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+
+        try:
+            _, self.backend_name, error = self._conn.recv()
+        except EOFError:
+            error = "Engine process exited during startup"
+        if error is not None:
+            self._process.join()
+            self._release_shared_memory()
+            raise BackendError(error)
+
+        self._reader = threading.Thread(target=self._read_events, name="EngineEvents", daemon=True)
+        self._reader.start()
+
+    def _send(self, command, job_id=None, args=None):
+        if self._closed:
+            raise RuntimeError("Scheduler has been shut down")
+        with self._send_lock:
+            while self._released:
+                self._conn.send(("release", self._released.pop(), None))
+            self._conn.send((command, job_id, args))
+
+    def create_job(self, name, **spec):
+        """Build a job in the engine process from create_job keyword arguments (minus the backend)"""
+        job_id = next(self._ids)
+        self._send("create", job_id, (name, spec))
+        deadline = time.monotonic() + REPLY_TIMEOUT
+        while True:
+            try:
+                reply_id, info, error = self._replies.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise RuntimeError("Engine process is not responding")
+            if reply_id == job_id:
+                break
+            # Late reply to a request that timed out: free the job it created
+            if error is None:
+                self._released.append(reply_id)
+        if error is not None:
+            raise ValueError(error)
+        job = RemoteJob(self, job_id, name, *info)
+        self._jobs[job_id] = job
+        # list.append is atomic, so the finalizer is safe on whichever thread collects the job
+        weakref.finalize(job, self._released.append, job_id)
+        return job
+
+    def start_job(self, job, window=None):
+        """Start a job from now, or in a RunWindow; ignored if it is already running"""
+        opening = None
+        if window is not None:
+            # Fix the start here so both processes agree on the openings
+            now = time.time()
+            if window.start is None:
+                window = window.starting_at(now)
+            opening = window.next_opening(now)
+            if opening is None:
+                raise ValueError("The run window has already ended")
+        with self._lock:
+            if job.running:
+                return
+            if job.slot is None:
+                if not self._free_slots:
+                    raise ValueError(f"Too many jobs (at most {MAX_RUNNING} can run at once)")
+                job.slot = self._free_slots.pop()
+            job.running = True
+            job.paused = False
+            job.window = window
+            job.waiting = opening is not None
+            job.next_start = opening[1] if opening is not None else None
+            job.run += 1
+            self._counts[job.slot] = 0
+            self._unfinished[job.id] = job
+            self._send("start", job.id, (job.run, job.slot, window))
+
+    def stop_job(self, job):
+        """Stop a running or paused job; its on_finish callback reports "stopped" """
+        with self._lock:
+            if not (job.running or job.paused):
+                return
+            job.running = False
+            job.paused = False
+            job.waiting = False
+            job.next_start = None
+            self._send("stop", job.id)
+
+    def pause_job(self, job):
+        """Suspend a running job, keeping its counters; jobs waiting for their window are not paused"""
+        with self._lock:
+            if not job.running or job.waiting:
+                return
+            job.running = False
+            job.paused = True
+            self._send("pause", job.id)
+
+    def resume_job(self, job):
+        """Continue a paused job from now"""
+        with self._lock:
+            if not job.paused:
+                return
+            job.running = True
+            job.paused = False
+            self._send("resume", job.id)
+
+    def configure_realtime(self, settings):
+        """Change CPU affinity, priority and timer of the engine's scheduler thread"""
+        self._send("realtime", None, settings)
+
+    def shutdown(self, timeout=1.0):
+        """Stop every job and the engine process"""
+        if self._closed:
+            return
+        try:
+            self._send("shutdown")
+        except OSError:
+            pass
+        self._closed = True
+        self._process.join(timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._reader.join(timeout)
+        self._conn.close()
+        with self._lock:
+            for job in list(self._unfinished.values()):
+                self._finish_run(job, job.count)
+        self._release_shared_memory()
+
+    def _release_shared_memory(self):
+        self._counts.release()
+        self._shm.close()
+        self._shm.unlink()
+
+    def _finish_run(self, job, count):
+        """Freeze a run's counter and hand its slot back (lock held)"""
+        if self._unfinished.pop(job.id, None) is None:
+            return
+        job._final_count = count
+        self._free_slots.append(job.slot)
+        job.slot = None
+        job.running = False
+        job.paused = False
+        job.waiting = False
+        job.next_start = None
+
+    def _read_events(self):
+        """Reader thread: route replies and apply job events from the engine process"""
+        while True:
+            try:
+                kind, job_id, payload = self._conn.recv()
+            except (EOFError, OSError):
+                break
+            if kind == "reply":
+                self._replies.put((job_id, *payload))
+                continue
+            if kind == "realtime":
+                self.realtime_status = payload
+                if self.on_realtime is not None:
+                    self.on_realtime(payload)
+                continue
+            job = self._unfinished.get(job_id) or self._jobs.get(job_id)
+            if job is None:
+                continue
+            if kind == "stats":
+                job.stats = payload
+            elif kind == "window":
+                run, waiting, next_start, stats = payload
+                with self._lock:
+                    current = run == job.run
+                    if current:
+                        job.waiting = waiting
+                        job.next_start = next_start
+                        job.stats = stats
+                if current and job.on_window is not None:
+                    job.on_window(job)
+            elif kind == "finished":
+                run, count, reason, detail, stats, extras = payload
+                job.stats = stats
+                for attribute, value in extras.items():
+                    setattr(job, attribute, value)
+                with self._lock:
+                    if run == job.run:
+                        # Not a late event of a run that has since been restarted
+                        self._finish_run(job, count)
+                if job.on_finish is not None:
+                    job.on_finish(job, reason, detail)
+
+        if not self._closed:
+            # The engine process died; end every run so callers waiting on on_finish return
+            with self._lock:
+                ended = list(self._unfinished.values())
+                for job in ended:
+                    self._finish_run(job, job.count)
+            for job in ended:
+                if job.on_finish is not None:
+                    job.on_finish(job, "error", "Engine process exited unexpectedly")
@@ -0,0 +1,233 @@
+"""
+Real-time Scheduling
+CPU affinity, real-time priority and timerfd wakeups for the engine thread.
+
+Everything here is best effort: each setting that the platform or the
+current privileges do not allow is skipped with a warning in the returned
+RealtimeStatus, and the engine keeps running with normal scheduling.
+
+On Linux os.sched_setaffinity and os.sched_setscheduler with pid 0 act on
+the calling thread only, so the settings are applied from the scheduler
+thread itself and never affect the GUI or hotkey threads.
+"""
+
+import os
+import select
+import threading
+import time
+
+
+# Real-time policies accepted by RealtimeSettings
+RT_POLICIES = ('fifo', 'rr')
+DEFAULT_RT_PRIORITY = 10
+_POLICY_NAMES = {'fifo': 'SCHED_FIFO', 'rr': 'SCHED_RR'}
+
+
+def parse_cpus(text):
+    """Parse a CPU list like '2', '0,2' or '2-3' into a set of CPU numbers"""
+    cpus = set()
+    for part in text.split(','):
+        part = part.strip()
+        try:
+            if '-' in part:
+                first, last = part.split('-')
+                cpus.update(range(int(first), int(last) + 1))
+            else:
+                cpus.add(int(part))
+        except ValueError:
+            raise ValueError(f"Invalid CPU list: {text}")
+    if not cpus or min(cpus) < 0:
+        raise ValueError(f"Invalid CPU list: {text}")
+    return cpus
+
+
+def format_cpus(cpus):
+    """Render a CPU set compactly, e.g. {0, 2, 3} -> '0,2-3'"""
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(str(first) if first == last else f"{first}-{last}" for first, last in ranges)
+
+
+class RealtimeSettings:
+    """Requested scheduling for the engine thread; the defaults change nothing"""
+
+    def __init__(self, cpus=None, policy=None, priority=DEFAULT_RT_PRIORITY, timerfd=False):
+        if policy is not None and policy not in RT_POLICIES:
+            raise ValueError(f"Unknown real-time policy '{policy}', expected one of: {', '.join(RT_POLICIES)}")
+        self.cpus = set(cpus) if cpus else None
+        self.policy = policy
+        self.priority = priority
+        self.timerfd = timerfd
+
+    def __eq__(self, other):
+        return isinstance(other, RealtimeSettings) and vars(self) == vars(other)
+
+    @property
+    def is_default(self):
+        """Whether nothing beyond normal scheduling is requested"""
+        return self.cpus is None and self.policy is None and not self.timerfd
+
+
+class RealtimeStatus:
+    """What apply_realtime actually achieved, with a warning per fallback"""
+
+    def __init__(self):
+        self.cpus = None      # CPU set the thread is pinned to, or None
+        self.policy = None    # 'SCHED_FIFO' / 'SCHED_RR', or None for normal scheduling
+        self.priority = 0
+        self.timerfd = False
+        self.warnings = []
+        self.original_cpus = None  # affinity before pinning, restored when pinning is turned off
+
+    def describe(self):
+        """Short description for run statistics, e.g. 'SCHED_FIFO 10, CPUs 2-3, timerfd'"""
+        parts = [f"{self.policy} {self.priority}" if self.policy else "normal priority"]
+        if self.cpus is not None:
+            parts.append(f"CPUs {format_cpus(self.cpus)}")
+        if self.timerfd:
+            parts.append("timerfd")
+        return ", ".join(parts)
+
+
+def apply_realtime(settings, wakeup, previous=None):
+    """Apply settings to the calling thread and switch wakeup's timer; returns a RealtimeStatus
+
+    previous is the status of the last call on this thread, so settings that
+    are no longer requested are undone without touching scheduling the
+    process was started with (e.g. under chrt or taskset).
+    """
+    status = RealtimeStatus()
+    status.original_cpus = previous.original_cpus if previous is not None else None
+
+    if settings.cpus is not None:
+        try:
+            if status.original_cpus is None:
+                status.original_cpus = os.sched_getaffinity(0)
+            os.sched_setaffinity(0, settings.cpus)
+            status.cpus = set(settings.cpus)
+        except AttributeError:
+            status.warnings.append("CPU affinity is not supported on this platform")
+        except OSError as e:
+            status.warnings.append(f"Cannot pin to CPUs {format_cpus(settings.cpus)}: {e.strerror}")
+    if status.cpus is None and previous is not None and previous.cpus is not None:
+        try:
+            os.sched_setaffinity(0, status.original_cpus)
+        except OSError as e:
+            # Still pinned; the next call tries again
+            status.cpus = previous.cpus
+            status.warnings.append(f"Cannot restore CPUs {format_cpus(status.original_cpus)}: {e.strerror}")
+
+    if settings.policy is not None:
+        name = _POLICY_NAMES[settings.policy]
+        try:
+            policy = getattr(os, name)
+            priority = min(max(settings.priority, os.sched_get_priority_min(policy)),
+                           os.sched_get_priority_max(policy))
+            os.sched_setscheduler(0, policy, os.sched_param(priority))
+            status.policy = name
+            status.priority = priority
+        except AttributeError:
+            status.warnings.append("Real-time priority is not supported on this platform")
+        except PermissionError:
+            status.warnings.append(f"{name} is not permitted (needs root, CAP_SYS_NICE or an "
+                                   "RLIMIT_RTPRIO limit); using normal scheduling")
+        except OSError as e:
+            status.warnings.append(f"Cannot use {name}: {e.strerror}; using normal scheduling")
+    if status.policy is None and previous is not None and previous.policy is not None:
+        try:
+            os.sched_setscheduler(0, os.SCHED_OTHER, os.sched_param(0))
+        except OSError as e:
+            status.policy = previous.policy
+            status.priority = previous.priority
+            status.warnings.append(f"Cannot restore normal scheduling: {e.strerror}")
+
+    try:
+        wakeup.use_timerfd(settings.timerfd)
+        status.timerfd = settings.timerfd
+    except (AttributeError, OSError):
+        status.warnings.append("timerfd is not available (needs Linux and Python 3.13 or later); "
+                               "using normal timed waits")
+    return status
+
+
+class Wakeup:
+    """threading.Event stand-in for the scheduler thread that can sleep on a timerfd
+
+    set() and clear() may be called from any thread; wait() and
+    use_timerfd() only from the thread that sleeps. set() always signals
+    both the Event and the eventfd, so switching the timer never loses a
+    wakeup.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._timer_fd = None
+        self._event_fd = None
+        self._poll = None
+
+    def set(self):
+        self._event.set()
+        event_fd = self._event_fd
+        if event_fd is not None:
+            try:
+                os.eventfd_write(event_fd, 1)
+            except OSError:
+                # Closed after shutdown; nobody is waiting any more
+                pass
+
+    def clear(self):
+        self._event.clear()
+        if self._event_fd is not None:
+            try:
+                os.eventfd_read(self._event_fd)
+            except BlockingIOError:
+                pass
+
+    def wait(self, timeout=None):
+        """Sleep until set() or until timeout seconds have passed"""
+        if self._timer_fd is None:
+            self._event.wait(timeout)
+            return
+        if self._event.is_set():
+            # set() before the eventfd existed, or already pending
+            return
+        if timeout is not None:
+            if timeout <= 0:
+                return
+            os.timerfd_settime(self._timer_fd, initial=timeout)
+        for fd, _ in self._poll.poll():
+            if fd == self._timer_fd:
+                try:
+                    os.read(fd, 8)
+                except BlockingIOError:
+                    pass
+        if timeout is not None:
+            os.timerfd_settime(self._timer_fd, initial=0)
+
+    def use_timerfd(self, enabled):
+        """Switch between timerfd and Event waits; raises AttributeError where timerfd is missing"""
+        if enabled and self._timer_fd is None:
+            timer_fd = os.timerfd_create(time.CLOCK_MONOTONIC, flags=os.TFD_NONBLOCK | os.TFD_CLOEXEC)
+            if self._event_fd is None:
+                self._poll = select.poll()
+                self._event_fd = os.eventfd(0, flags=os.EFD_NONBLOCK | os.EFD_CLOEXEC)
+                self._poll.register(self._event_fd, select.POLLIN)
+            self._poll.register(timer_fd, select.POLLIN)
+            self._timer_fd = timer_fd
+        elif not enabled and self._timer_fd is not None:
+            # The eventfd stays open: another thread may be inside set()
+            timer_fd = self._timer_fd
+            self._timer_fd = None
+            self._poll.unregister(timer_fd)
+            os.close(timer_fd)
+
+    def close(self):
+        """Release the timerfd and eventfd once no other thread calls set() any more"""
+        self.use_timerfd(False)
+        event_fd, self._event_fd = self._event_fd, None
+        if event_fd is not None:
+            os.close(event_fd)
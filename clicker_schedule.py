@@ -0,0 +1,152 @@
+"""
+Run Windows
+Wall-clock start times, durations and recurring windows for jobs.
+
+A RunWindow only describes when a job should run; JobScheduler turns its
+openings and closings into entries of the same deadline heap that times
+the presses, so waiting for a window costs no extra thread or polling loop.
+
+Times are Unix timestamps (time.time()). Starting several machines within a
+millisecond of each other relies on their clocks being synchronized (NTP or
+PTP); the scheduler converts each opening to its monotonic clock once more
+just before it is due, so slewing during a long wait does not shift it.
+"""
+
+import datetime
+import math
+import time
+
+
+class RunWindow:
+    """Run from start for duration seconds, optionally repeated every seconds
+
+    start is a Unix timestamp, or None for whenever the job is started.
+    duration None keeps a window open until the press limit or a stop.
+    count limits how many windows open when repeating (0 = no limit).
+    """
+
+    def __init__(self, start=None, duration=None, every=None, count=0):
+        if duration is not None and duration <= 0:
+            raise ValueError("Run duration must be positive")
+        if every is not None:
+            if every <= 0:
+                raise ValueError("Repeat period must be positive")
+            if duration is None:
+                raise ValueError("Repeating windows need a duration or an end time")
+            if duration > every:
+                raise ValueError("Run duration must not exceed the repeat period")
+        if count < 0:
+            raise ValueError("Window count must be 0 or positive")
+        if count and every is None:
+            raise ValueError("A window count needs a repeat period")
+        self.start = start
+        self.duration = duration
+        self.every = every
+        self.count = count
+
+    def starting_at(self, start):
+        """The same window with its start fixed to a timestamp"""
+        return RunWindow(start, self.duration, self.every, self.count)
+
+    def next_opening(self, now, first_index=0):
+        """(index, timestamp) of the first window from first_index that has not ended by now, or None
+
+        A window already open at now is returned with its past opening time,
+        so a job started late joins it for the remaining time.
+        """
+        start = self.start if self.start is not None else now
+        index = first_index
+        if self.every is not None and now - start >= self.duration:
+            # Skip the windows that closed before now
+            index = max(index, math.floor((now - start - self.duration) / self.every) + 1)
+        if index > 0 and self.every is None:
+            return None
+        if self.count and index >= self.count:
+            return None
+        opening = start + index * (self.every or 0)
+        if self.every is None and self.duration is not None and opening + self.duration <= now:
+            return None
+        return index, opening
+
+    def describe(self):
+        """Short description, e.g. '2026-10-17 12:00:00.000 for 300s, every 3600s'"""
+        text = format_time(self.start) if self.start is not None else "now"
+        if self.duration is not None:
+            text += f" for {self.duration:g}s"
+        if self.every is not None:
+            text += f", every {self.every:g}s"
+            if self.count:
+                text += f" ({self.count} times)"
+        return text
+
+
+def make_window(at=None, align=None, duration=None, until=None, every=None, count=0, now=None):
+    """RunWindow from front end options, or None when none is given; raises ValueError
+
+    at and until are parse_time() strings or Unix timestamps, align rounds
+    the start up to a multiple of that many seconds, and until sets the
+    duration from the start.
+    """
+    if not (at or align or duration or until or every or count):
+        return None
+    if now is None:
+        now = time.time()
+    start = None
+    if at:
+        start = at if isinstance(at, (int, float)) else parse_time(at, now)
+    if align:
+        start = align_time(now if start is None else start, align)
+    if until:
+        if duration:
+            raise ValueError("Give a duration or an end time, not both")
+        if start is None:
+            start = now
+        duration = (until if isinstance(until, (int, float)) else parse_time(until, now)) - start
+        if duration <= 0:
+            raise ValueError("The end time must be later than the start")
+    return RunWindow(start, duration, every, count)
+
+
+def parse_time(text, now=None):
+    """Parse a start or end time into a Unix timestamp; raises ValueError
+
+    Accepts +SECONDS (from now), a Unix timestamp, HH:MM[:SS[.ffffff]] (the
+    next such local time) or an ISO 8601 date and time (local unless it
+    carries an offset or Z).
+    """
+    if now is None:
+        now = time.time()
+    text = text.strip()
+    try:
+        if text.startswith('+'):
+            return now + float(text[1:])
+        return float(text)
+    except ValueError:
+        pass
+
+    try:
+        if 'T' in text or ' ' in text or text.count('-') >= 2:
+            if text.endswith(('Z', 'z')):
+                text = text[:-1] + '+00:00'
+            return datetime.datetime.fromisoformat(text).timestamp()
+        clock_time = datetime.time.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"Invalid time '{text}', expected HH:MM[:SS], an ISO date and time, "
+                         "a Unix timestamp or +SECONDS")
+    today = datetime.datetime.fromtimestamp(now).date()
+    timestamp = datetime.datetime.combine(today, clock_time).timestamp()
+    if timestamp < now:
+        timestamp = datetime.datetime.combine(today + datetime.timedelta(days=1), clock_time).timestamp()
+    return timestamp
+
+
+def align_time(timestamp, boundary):
+    """Round a timestamp up to the next multiple of boundary seconds since the Unix epoch"""
+    if boundary <= 0:
+        raise ValueError("Alignment must be positive")
+    return math.ceil(timestamp / boundary) * boundary
+
+
+def format_time(timestamp):
+    """Local date and time with milliseconds, e.g. '2026-10-17 12:00:00.000'"""
+    return datetime.datetime.fromtimestamp(timestamp).isoformat(sep=' ', timespec='milliseconds')
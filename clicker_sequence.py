@@ -0,0 +1,142 @@
+"""
+Key Sequences
+Parses macro sequences and compiles them into flat event tables for the engine.
+
+A sequence is a comma separated list of steps:
+
+    KEY[+KEY...][@HOLD][~DELAY]
+
+    ctrl+c@0.05~0.2, ctrl+v, enter~500ms
+
+Keys joined with '+' form a chord, pressed in order and released in reverse.
+HOLD is how long the chord stays down (default 0) and DELAY the pause after
+release before the next step (default: the job interval). Times are seconds
+unless suffixed with 'ms'. Use 'plus', 'comma', 'at' and 'tilde' for the
+separator characters themselves.
+"""
+
+# Names for characters that are part of the sequence syntax
+KEY_ALIASES = {
+    'plus': '+',
+    'comma': ',',
+    'at': '@',
+    'tilde': '~',
+}
+
+
+class SequenceStep:
+    """One parsed step: a chord of key names with optional hold and delay"""
+
+    __slots__ = ('keys', 'hold', 'delay')
+
+    def __init__(self, keys, hold=0.0, delay=None):
+        self.keys = keys
+        self.hold = hold
+        self.delay = delay
+
+    def __repr__(self):
+        return f"SequenceStep({self.keys!r}, hold={self.hold!r}, delay={self.delay!r})"
+
+
+def _parse_duration(text, step_text):
+    """Parse '0.05' or '50ms' into seconds"""
+    text = text.strip().lower()
+    scale = 1.0
+    if text.endswith('ms'):
+        text = text[:-2]
+        scale = 0.001
+    elif text.endswith('s'):
+        text = text[:-1]
+    try:
+        value = float(text) * scale
+    except ValueError:
+        raise ValueError(f"Invalid time '{text}' in step '{step_text}'")
+    if value < 0:
+        raise ValueError(f"Negative time in step '{step_text}'")
+    return value
+
+
+def parse_sequence(text):
+    """Parse sequence text into a list of SequenceStep"""
+    steps = []
+    for step_text in text.split(','):
+        step_text = step_text.strip()
+        if not step_text:
+            continue
+
+        delay = None
+        if '~' in step_text:
+            step_text, delay_text = step_text.split('~', 1)
+            delay = _parse_duration(delay_text, step_text)
+
+        hold = 0.0
+        if '@' in step_text:
+            step_text, hold_text = step_text.split('@', 1)
+            hold = _parse_duration(hold_text, step_text)
+
+        keys = []
+        for key in step_text.split('+'):
+            key = key.strip()
+            if not key:
+                raise ValueError(f"Empty key in step '{step_text}'")
+            key = KEY_ALIASES.get(key.lower(), key)
+            keys.append(key if len(key) == 1 else key.lower())
+        steps.append(SequenceStep(tuple(keys), hold, delay))
+
+    if not steps:
+        raise ValueError("Please enter a key sequence")
+    return steps
+
+
+class CompiledSequence:
+    """Flat event table for one pass over a sequence
+
+    events holds (offset, action, handle, ends_step) tuples where offset is
+    seconds from the start of the pass and action is the backend's bound
+    press or release method. held_after[i] lists the handles still down after
+    event i, so a stop can release them without tracking state at run time.
+    """
+
+    __slots__ = ('events', 'held_after', 'duration', 'step_count', 'release')
+
+    def __init__(self, events, held_after, duration, step_count, release):
+        self.events = events
+        self.held_after = held_after
+        self.duration = duration
+        self.step_count = step_count
+        self.release = release
+
+    @property
+    def step_interval(self):
+        """Average seconds per step"""
+        return self.duration / self.step_count
+
+
+def compile_sequence(steps, backend, default_delay):
+    """Resolve every key once and lay the steps out on a relative timeline"""
+    press = backend.press
+    release = backend.release
+    handles = {}
+
+    events = []
+    held_after = []
+    offset = 0.0
+    for step in steps:
+        chord = []
+        for key in step.keys:
+            if key not in handles:
+                handles[key] = backend.resolve_key(key)
+            chord.append(handles[key])
+
+        for i, handle in enumerate(chord):
+            events.append((offset, press, handle, False))
+            held_after.append(tuple(chord[:i + 1]))
+
+        offset += step.hold
+        for i, handle in enumerate(reversed(chord)):
+            events.append((offset, release, handle, i == len(chord) - 1))
+            held_after.append(tuple(chord[:len(chord) - i - 1]))
+
+        offset += default_delay if step.delay is None else step.delay
+
+    return CompiledSequence(tuple(events), tuple(held_after), offset, len(steps), release)
@@ -0,0 +1,127 @@
+"""
+Text Typing
+Streams text from a string or a file into key presses at constant memory.
+
+The text flows through a chain of generators: read_chunks() reads it
+lazily, READ_CHUNK bytes at a time from any byte offset; characters()
+decodes the chunks incrementally and tags every character with the byte
+offset just after it; key_batches() maps the characters to backend key
+handles TYPE_BATCH at a time. TextJob (clicker_engine) pulls a batch only
+when it has typed the previous one, so the scheduler's hot loop steps
+through a list and a multi-megabyte file is never held in memory.
+
+Offsets count bytes of the UTF-8 text, so a stopped run resumes exactly
+where it stopped (TextJob.offset).
+"""
+
+import codecs
+import io
+import os
+
+
+# Bytes read from the text per chunk
+READ_CHUNK = 64 * 1024
+
+# Characters mapped to key handles per batch
+TYPE_BATCH = 256
+
+# Characters typed with a named key; carriage returns are dropped so CRLF
+# line ends type a single Enter
+CHAR_KEYS = {'\n': 'enter', '\t': 'tab'}
+SKIPPED_CHARS = frozenset('\r')
+
+
+class TextSource:
+    """UTF-8 text to type, from a file or from a string"""
+
+    def __init__(self, text=None, path=None):
+        if (text is None) == (path is None):
+            raise ValueError("Give either a text or a text file")
+        self.path = path
+        if path is not None:
+            try:
+                self.size = os.path.getsize(path)
+            except OSError as e:
+                raise ValueError(f"Cannot read text file: {e}")
+            self._data = None
+            self.description = os.path.basename(path)
+        else:
+            self._data = text.encode('utf-8')
+            self.size = len(self._data)
+            self.description = repr(text if len(text) <= 20 else text[:17] + "...")
+        if not self.size:
+            raise ValueError("The text to type is empty")
+
+    def open(self):
+        """Binary stream over the text"""
+        if self.path is not None:
+            try:
+                return open(self.path, 'rb')
+            except OSError as e:
+                raise ValueError(f"Cannot read text file: {e}")
+        return io.BytesIO(self._data)
+
+
+def read_chunks(source, offset=0, size=READ_CHUNK):
+    """Yield (offset, bytes) chunks of a TextSource from a byte offset
+
+    An offset inside a multi-byte character moves on to the next whole one.
+    """
+    with source.open() as stream:
+        stream.seek(offset)
+        chunk = stream.read(size)
+        skip = 0
+        while skip < min(len(chunk), 3) and chunk[skip] & 0xC0 == 0x80:
+            skip += 1
+        offset += skip
+        chunk = chunk[skip:]
+        while chunk:
+            yield offset, chunk
+            offset += len(chunk)
+            chunk = stream.read(size)
+
+
+def characters(chunks):
+    """Yield (character, byte offset after it) from read_chunks(); raises ValueError on invalid UTF-8"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    position = None
+    for offset, chunk in chunks:
+        if position is None:
+            position = offset
+        try:
+            text = decoder.decode(chunk)
+        except UnicodeDecodeError as e:
+            raise ValueError(f"The text is not valid UTF-8 (near byte {offset + e.start})")
+        for char in text:
+            code = ord(char)
+            position += 1 if code < 0x80 else 2 if code < 0x800 else 3 if code < 0x10000 else 4
+            yield char, position
+    try:
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        raise ValueError("The text ends in the middle of a UTF-8 character")
+
+
+def key_batches(chars, resolve, size=TYPE_BATCH):
+    """Yield lists of up to size (handle, byte offset after the character) pairs
+
+    resolve(char) returns the key handle typing a character, or None to skip it.
+    """
+    batch = []
+    for char, offset in chars:
+        handle = resolve(char)
+        if handle is None:
+            continue
+        batch.append((handle, offset))
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def key_name(char):
+    """Key name typing a character, or None for characters that are skipped"""
+    if char in SKIPPED_CHARS:
+        return None
+    return CHAR_KEYS.get(char, char)
@@ -0,0 +1,279 @@
+"""
+Keystroke Traces
+Records real keystrokes into a compact binary file and reads them back for replay.
+
+A trace file is a 32-byte header followed by fixed 16-byte records:
+
+    header:  magic b'KCTRACE1', version, record size, flags,
+             press count, duration in ns               ('<8sHHIQQ')
+    record:  timestamp in ns since the start, key code,
+             event type (1 press, 0 release), padding  ('<qIB3x')
+
+Key codes are the Unicode code point for characters and NAMED_KEY_BASE plus
+an index into TRACE_KEY_NAMES for named keys. Records are buffered in typed
+arrays and streamed to disk in chunks while recording, and read back through
+mmap when replaying, so neither side builds up Python objects.
+"""
+
+import mmap
+import struct
+import time
+from array import array
+
+from clicker_delays import optional_numpy
+
+
+TRACE_MAGIC = b'KCTRACE1'
+TRACE_VERSION = 1
+HEADER = struct.Struct('<8sHHIQQ')
+RECORD = struct.Struct('<qIB3x')
+
+PRESS = 1
+RELEASE = 0
+
+TRACE_EXTENSION = ".kct"
+
+# Named keys in code order; append only, existing traces depend on the indices
+TRACE_KEY_NAMES = (
+    'alt', 'alt_l', 'alt_r', 'alt_gr', 'backspace', 'caps_lock',
+    'cmd', 'cmd_l', 'cmd_r', 'ctrl', 'ctrl_l', 'ctrl_r', 'delete',
+    'down', 'end', 'enter', 'esc',
+    'f1', 'f2', 'f3', 'f4', 'f5', 'f6', 'f7', 'f8', 'f9', 'f10',
+    'f11', 'f12', 'f13', 'f14', 'f15', 'f16', 'f17', 'f18', 'f19', 'f20',
+    'home', 'left', 'page_down', 'page_up', 'right',
+    'shift', 'shift_l', 'shift_r', 'space', 'tab', 'up',
+    'media_play_pause', 'media_volume_mute', 'media_volume_down', 'media_volume_up',
+    'media_previous', 'media_next', 'insert', 'menu', 'num_lock', 'pause',
+    'print_screen', 'scroll_lock',
+)
+NAMED_KEY_BASE = 0x110000  # first value past the Unicode range
+_NAMED_KEY_CODES = {name: NAMED_KEY_BASE + i for i, name in enumerate(TRACE_KEY_NAMES)}
+
+# NumPy view of RECORD, for vectorized scans
+_RECORD_DTYPE = [('time', '<i8'), ('code', '<u4'), ('type', 'u1'), ('pad', 'V3')]
+
+# Events buffered in memory before a chunk is written
+CHUNK_EVENTS = 4096
+
+
+def key_code(name):
+    """Trace key code for a key name ('a', 'enter', 'shift_r', ...)"""
+    if len(name) == 1:
+        return ord(name)
+    try:
+        return _NAMED_KEY_CODES[name]
+    except KeyError:
+        raise ValueError(f"Key cannot be stored in a trace: {name}")
+
+
+def code_name(code):
+    """Key name for a trace key code"""
+    if code < NAMED_KEY_BASE:
+        return chr(code)
+    index = code - NAMED_KEY_BASE
+    if index >= len(TRACE_KEY_NAMES):
+        raise ValueError(f"Unknown key code in trace: {code:#x}")
+    return TRACE_KEY_NAMES[index]
+
+
+def pynput_key_code(key):
+    """Trace key code for a pynput key event, or None for keys without a name or character"""
+    name = getattr(key, 'name', None)
+    if name is not None:
+        return _NAMED_KEY_CODES.get(name)
+    char = getattr(key, 'char', None)
+    if not char or len(char) != 1:
+        return None
+    if ord(char) < 32:
+        # Ctrl+letter arrives as a control character on some platforms
+        char = chr(ord(char) + 96)
+    return ord(char)
+
+
+class TraceWriter:
+    """Streams events to a trace file in chunks of typed arrays"""
+
+    def __init__(self, path, chunk_events=CHUNK_EVENTS):
+        self.path = path
+        self.chunk_events = chunk_events
+        self.count = 0
+        self.presses = 0
+        self.duration_ns = 0
+        self._times = array('q')
+        self._codes = array('I')
+        self._types = array('B')
+        self._file = open(path, 'wb')
+        self._write_header()
+
+    def _write_header(self):
+        self._file.write(HEADER.pack(TRACE_MAGIC, TRACE_VERSION, RECORD.size, 0,
+                                     self.presses, self.duration_ns))
+
+    def append(self, time_ns, code, event_type):
+        """Buffer one event; a full chunk is written to disk"""
+        self._times.append(time_ns)
+        self._codes.append(code)
+        self._types.append(event_type)
+        self.count += 1
+        if event_type == PRESS:
+            self.presses += 1
+        self.duration_ns = time_ns
+        if len(self._times) >= self.chunk_events:
+            self.flush()
+
+    def flush(self):
+        """Write buffered events as fixed-size records"""
+        if not self._times:
+            return
+        chunk = bytearray(RECORD.size * len(self._times))
+        pack_into = RECORD.pack_into
+        offset = 0
+        for time_ns, code, event_type in zip(self._times, self._codes, self._types):
+            pack_into(chunk, offset, time_ns, code, event_type)
+            offset += RECORD.size
+        self._file.write(chunk)
+        self._times = array('q')
+        self._codes = array('I')
+        self._types = array('B')
+
+    def close(self):
+        """Flush remaining events and finalize the header"""
+        if self._file is None:
+            return
+        self.flush()
+        self._file.seek(0)
+        self._write_header()
+        self._file.close()
+        self._file = None
+
+
+class TraceRecorder:
+    """Captures global keystrokes through a pynput Listener into a trace file"""
+
+    def __init__(self, path, chunk_events=CHUNK_EVENTS):
+        self.path = path
+        self.chunk_events = chunk_events
+        self.writer = None
+        self._listener = None
+        self._start_ns = None
+
+    @property
+    def count(self):
+        """Events recorded so far"""
+        return self.writer.count if self.writer is not None else 0
+
+    def start(self):
+        """Start capturing; timestamps are relative to this call"""
+        from pynput import keyboard
+        self.writer = TraceWriter(self.path, self.chunk_events)
+        self._start_ns = time.perf_counter_ns()
+        try:
+            self._listener = keyboard.Listener(on_press=self._on_press, on_release=self._on_release)
+            self._listener.start()
+        except Exception:
+            self._listener = None
+            self.writer.close()
+            raise
+
+    def stop(self):
+        """Stop capturing and close the file"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener.join()
+            self._listener = None
+        if self.writer is not None:
+            self.writer.close()
+
+    def _record(self, key, event_type):
+        code = pynput_key_code(key)
+        if code is not None:
+            self.writer.append(time.perf_counter_ns() - self._start_ns, code, event_type)
+
+    def _on_press(self, key):
+        self._record(key, PRESS)
+
+    def _on_release(self, key):
+        self._record(key, RELEASE)
+
+
+class Trace:
+    """A trace file mapped into memory; events are unpacked on demand
+
+    Opening costs the same for any file size and nothing is copied into
+    Python objects up front, so replaying millions of events keeps memory
+    flat (the OS pages the file in and out as needed).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                raise ValueError(f"Not a key trace: {path}")
+        self._view = memoryview(self._mmap)
+        try:
+            self.presses, self.duration_ns = read_header(self._view, path)
+        except ValueError:
+            self.close()
+            raise
+        # A capture that died mid-write may end in a partial record
+        self._length = (len(self._view) - HEADER.size) // RECORD.size
+        if self._length == 0:
+            self.close()
+            raise ValueError(f"Trace is empty: {path}")
+        if self.presses == 0 and self.duration_ns == 0:
+            # Header never finalized: every press has a release, and the
+            # last record holds the duration
+            self.presses = max(1, self._length // 2)
+            self.duration_ns = self.event(self._length - 1)[0]
+
+    def __len__(self):
+        return self._length
+
+    def event(self, index):
+        """(timestamp ns, key code, event type) of one event"""
+        return RECORD.unpack_from(self._view, HEADER.size + index * RECORD.size)
+
+    def press_gaps(self):
+        """Seconds between consecutive presses, as an array('d')"""
+        gaps = array('d')
+        numpy = optional_numpy()
+        if numpy is not None:
+            records = numpy.frombuffer(self._view, dtype=_RECORD_DTYPE, count=self._length, offset=HEADER.size)
+            times = records['time'][records['type'] == PRESS]
+            gaps.frombytes((numpy.diff(times) / 1e9).tobytes())
+            return gaps
+        previous = None
+        for index in range(self._length):
+            time_ns, _, event_type = self.event(index)
+            if event_type == PRESS:
+                if previous is not None:
+                    gaps.append((time_ns - previous) / 1e9)
+                previous = time_ns
+        return gaps
+
+    def close(self):
+        """Unmap the file"""
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+            self._mmap.close()
+
+
+def read_header(data, path):
+    """Validate a trace header and return (press count, duration ns)"""
+    if len(data) < HEADER.size:
+        raise ValueError(f"Not a key trace: {path}")
+    magic, version, record_size, _, presses, duration_ns = HEADER.unpack_from(data)
+    if magic != TRACE_MAGIC:
+        raise ValueError(f"Not a key trace: {path}")
+    if version != TRACE_VERSION or record_size != RECORD.size:
+        raise ValueError(f"Unsupported trace version {version} in {path}")
+    return presses, duration_ns
+
+
+def open_trace(path):
+    """Map a trace file for replay"""
+    return Trace(path)
@@ -0,0 +1,125 @@
+"""
+Tray Icons
+System tray icons that show whether the clicker is running and how fast.
+
+Every state, and every rate band while running, is drawn once into a small
+sprite cache when the tray starts. TrayStatus hands pystray one of those
+cached images only when the state or rate band actually changes, and rate
+limits tooltip changes, so the GUI can report every frame without drawing
+with PIL or waking the tray thread each time.
+"""
+
+import bisect
+import time
+
+
+ICON_SIZE = 64
+
+# Icon background per state
+STATE_COLORS = {
+    'idle': '#007acc',
+    'running': '#28a745',
+    'paused': '#d39e00',
+    'error': '#dc3545',
+}
+
+# Upper bounds (presses/s) of the rate bands shown as bars while running
+RATE_BANDS = (10.0, 100.0, 1000.0)
+
+# Minimum seconds between tooltip changes while the state stays the same
+TOOLTIP_INTERVAL = 1.0
+
+
+def rate_band(rate):
+    """Band of a presses/s figure, from 0 to len(RATE_BANDS)"""
+    return bisect.bisect_right(RATE_BANDS, rate)
+
+
+def render_sprites(size=ICON_SIZE):
+    """Draw every tray icon; returns {(state, band): image}, band being 0 unless running"""
+    from PIL import Image, ImageDraw
+
+    sprites = {}
+    for state, color in STATE_COLORS.items():
+        bands = range(len(RATE_BANDS) + 1) if state == 'running' else (0,)
+        for band in bands:
+            image = Image.new('RGB', (size, size), color=color)
+            _draw_icon(ImageDraw.Draw(image), size / ICON_SIZE, state, color, band)
+            sprites[state, band] = image
+    return sprites
+
+
+def _draw_icon(draw, scale, state, color, band):
+    """Draw the badge of one state on a 64x64 grid scaled by scale"""
+    def box(left, top, right, bottom):
+        return [left * scale, top * scale, right * scale, bottom * scale]
+
+    draw.ellipse(box(14, 6, 50, 42), fill='white')
+    if state == 'paused':
+        draw.rectangle(box(24, 15, 29, 33), fill=color)
+        draw.rectangle(box(35, 15, 40, 33), fill=color)
+    else:
+        draw.text((32 * scale, 24 * scale), "!" if state == 'error' else "K", fill=color, anchor="mm")
+    if state == 'running':
+        # Signal-style bars, one more lit for every rate band reached
+        for index in range(len(RATE_BANDS) + 1):
+            left = 14 + index * 9
+            draw.rectangle(box(left, 56 - 3 * index, left + 7, 60),
+                           fill='white' if index <= band else '#1e7e34')
+
+
+class TrayStatus:
+    """Keeps a pystray icon in step with the clicker's state
+
+    update() may be called every frame. The icon image is replaced only when
+    the state or rate band changes; other tooltip changes are applied at
+    most every interval seconds, the last one of a burst through
+    schedule(delay_ms, callback) (Tk's after()).
+    """
+
+    def __init__(self, icon, sprites, schedule, interval=TOOLTIP_INTERVAL):
+        self.icon = icon
+        self.sprites = sprites
+        self.schedule = schedule
+        self.interval = interval
+        self.sprite = None  # (state, band) shown
+        self.title = icon.title
+        self._pending_title = None
+        self._title_time = float('-inf')
+        self._flush_scheduled = False
+
+    def update(self, state, rate=0.0, title=None):
+        """Show a state, its rate while running and a tooltip"""
+        sprite = (state, rate_band(rate) if state == 'running' else 0)
+        changed = sprite != self.sprite
+        if changed:
+            self.sprite = sprite
+            self.icon.icon = self.sprites[sprite]
+        if title is None or title == self.title:
+            self._pending_title = None
+            return
+        self._pending_title = title
+        if changed:
+            # A new state is worth showing at once
+            self._title_time = float('-inf')
+        self._flush_title()
+
+    def _flush_title(self):
+        """Apply the pending tooltip, or schedule it when the last change was too recent"""
+        if self._pending_title is None:
+            return
+        now = time.monotonic()
+        wait = self._title_time + self.interval - now
+        if wait > 0:
+            if not self._flush_scheduled:
+                self._flush_scheduled = True
+                self.schedule(int(wait * 1000) + 1, self._scheduled_flush)
+            return
+        self.title = self._pending_title
+        self._pending_title = None
+        self._title_time = now
+        self.icon.title = self.title
+
+    def _scheduled_flush(self):
+        self._flush_scheduled = False
+        self._flush_title()
@@ -0,0 +1,191 @@
+import threading
+import time
+
+import pytest
+
+from clicker_backends import RecordingBackend
+from clicker_engine import JobScheduler, create_job
+
+
+def held_keys(backend):
+    """Keys pressed and not released again, from a RecordingBackend's events"""
+    held = set()
+    for _, event, handle in list(backend.events):
+        if event == "press":
+            held.add(handle)
+        else:
+            held.discard(handle)
+    return held
+
+
+def wait_for(condition, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > end:
+            raise AssertionError("timed out")
+        time.sleep(0.001)
+
+
+def presses(backend):
+    return [handle for _, event, handle in backend.events if event == "press"]
+
+
+def test_key_job_stops_at_limit():
+    backend = RecordingBackend()
+    job = create_job(backend, "key", key="a", interval=0.01, limit=3)
+    job.running = True
+    deadline = job.begin(0.0)
+    while deadline is not None:
+        deadline = job.fire(deadline, deadline)
+    assert job.count == 3
+    assert presses(backend) == ["a"] * 3
+
+
+def test_burst_batches_presses_per_tick():
+    backend = RecordingBackend()
+    job = create_job(backend, "burst", key="a", interval=0.001, limit=25, burst=True, rate_cap=1000)
+    assert job.batch == 10
+    job.running = True
+    deadline = job.begin(0.0)
+    ticks = []
+    while deadline is not None:
+        before = job.count
+        next_deadline = job.fire(deadline, deadline)
+        ticks.append(job.count - before)
+        if next_deadline is not None:
+            assert next_deadline == pytest.approx(deadline + 0.01)
+        deadline = next_deadline
+    assert ticks == [10, 10, 5]
+    assert backend.presses == 25
+
+
+def test_short_interval_needs_burst_mode():
+    with pytest.raises(ValueError):
+        create_job(RecordingBackend(), "fast", key="a", interval=0.001)
+
+
+def test_sequence_chord_order():
+    backend = RecordingBackend()
+    job = create_job(backend, "chord", sequence="ctrl+shift+a@0.1, b", interval=0.5, limit=2)
+    job.running = True
+    deadline = job.begin(0.0)
+    while deadline is not None:
+        deadline = job.fire(deadline, deadline)
+    assert [(event, handle) for _, event, handle in backend.events] == [
+        ("press", "ctrl"), ("press", "shift"), ("press", "a"),
+        ("release", "a"), ("release", "shift"), ("release", "ctrl"),
+        ("press", "b"), ("release", "b"),
+    ]
+    assert job.count == 2
+
+
+def test_sequence_abort_releases_chord():
+    backend = RecordingBackend()
+    job = create_job(backend, "chord", sequence="ctrl+a@1", interval=0.5)
+    job.running = True
+    job.fire(job.begin(0.0), 0.0)
+    assert held_keys(backend) == {"ctrl", "a"}
+    job.abort()
+    assert held_keys(backend) == set()
+
+
+class BlockingBackend(RecordingBackend):
+    """Holds the first press of one key until released, to catch a tick in flight"""
+
+    def __init__(self, key):
+        super().__init__()
+        self.key = key
+        self.pressing = threading.Event()
+        self.proceed = threading.Event()
+
+    def press(self, handle):
+        if handle == self.key and not self.pressing.is_set():
+            self.pressing.set()
+            self.proceed.wait(2.0)
+        super().press(handle)
+
+
+def test_restart_during_tick_releases_held_keys():
+    backend = BlockingBackend("shift")
+    scheduler = JobScheduler()
+    job = create_job(backend, "chord", sequence="ctrl+shift+a@0.05~0.001", interval=0.01)
+    try:
+        scheduler.start_job(job)
+        assert backend.pressing.wait(2.0)
+        # ctrl is down and shift about to be: restart from another thread
+        restart = threading.Thread(target=lambda: (scheduler.stop_job(job), scheduler.start_job(job)))
+        restart.start()
+        time.sleep(0.05)
+        # The restart waits for the tick in flight instead of resetting under it
+        assert restart.is_alive()
+        backend.proceed.set()
+        restart.join(2.0)
+        time.sleep(0.02)
+        scheduler.stop_job(job)
+        wait_for(lambda: not held_keys(backend))
+    finally:
+        scheduler.shutdown()
+    assert held_keys(backend) == set()
+
+
+def test_restart_mid_chord_releases_held_keys():
+    backend = RecordingBackend()
+    scheduler = JobScheduler()
+    job = create_job(backend, "chord", sequence="ctrl+shift+a@0.02~0.001", interval=0.01)
+    try:
+        for _ in range(50):
+            scheduler.start_job(job)
+            wait_for(lambda: held_keys(backend))
+            scheduler.stop_job(job)
+            scheduler.start_job(job)
+            scheduler.stop_job(job)
+        wait_for(lambda: not held_keys(backend))
+    finally:
+        scheduler.shutdown()
+    assert held_keys(backend) == set()
+
+
+def test_restart_reports_stop_once_and_counts_new_run():
+    backend = RecordingBackend()
+    scheduler = JobScheduler()
+    job = create_job(backend, "key", key="a", interval=0.01, limit=3)
+    finished = []
+    job.on_finish = lambda job, reason, detail: finished.append(reason)
+    try:
+        scheduler.start_job(job)
+        scheduler.stop_job(job)
+        scheduler.start_job(job)
+        wait_for(lambda: finished == ["limit"])
+    finally:
+        scheduler.shutdown()
+    assert job.count == 3
+
+
+def test_text_job_reports_end_of_text():
+    backend = RecordingBackend()
+    scheduler = JobScheduler()
+    job = create_job(backend, "text", text="ab\r\nc", interval=0.01)
+    finished = []
+    job.on_finish = lambda job, reason, detail: finished.append(reason)
+    try:
+        scheduler.start_job(job)
+        wait_for(lambda: finished)
+    finally:
+        scheduler.shutdown()
+    assert finished == ["end of text"]
+    assert [handle for _, event, handle in backend.events if event == "press"] == ["a", "b", "enter", "c"]
+    assert job.offset == 0
+
+
+def test_sequence_target_rate_follows_its_schedule():
+    backend = RecordingBackend()
+    # Steps 0.1 s, 0.1 s and 0.3 s apart: 7.5 steps/s averaged over a cycle
+    job = create_job(backend, "uneven", sequence="a, b, c~0.3", interval=0.1, limit=5)
+    job.running = True
+    deadline = job.begin(0.0)
+    while deadline is not None:
+        deadline = job.fire(deadline, deadline)
+    stats = job.stats
+    assert stats.target_rate == pytest.approx(stats.mean_rate)
+    # Four gaps measured: 0.1 + 0.3 + 0.1 + 0.1 seconds
+    assert stats.target_rate == pytest.approx(4 / 0.6)
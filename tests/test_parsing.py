@@ -0,0 +1,56 @@
+import pytest
+
+from clicker_hotkeys import MODIFIER_BITS, parse_chord
+from clicker_realtime import format_cpus, parse_cpus
+from clicker_sequence import parse_sequence
+
+
+def test_parse_sequence():
+    steps = parse_sequence("ctrl+c@0.05~0.2, plus, Enter~500ms")
+    assert [step.keys for step in steps] == [("ctrl", "c"), ("+",), ("enter",)]
+    assert steps[0].hold == 0.05
+    assert steps[0].delay == 0.2
+    assert steps[1].delay is None
+    assert steps[2].delay == pytest.approx(0.5)
+
+
+@pytest.mark.parametrize("text, message", [
+    ("", "Please enter a key sequence"),
+    (" , ,", "Please enter a key sequence"),
+    ("ctrl++c", "Empty key"),
+    ("a@fast", "Invalid time"),
+    ("a~-1", "Negative time"),
+])
+def test_parse_sequence_errors(text, message):
+    with pytest.raises(ValueError, match=message):
+        parse_sequence(text)
+
+
+def test_parse_chord():
+    assert parse_chord("F6") == (0, "f6")
+    mask, key = parse_chord("Ctrl+Shift+p")
+    assert mask == MODIFIER_BITS["ctrl"] | MODIFIER_BITS["shift"]
+    assert key == "p"
+
+
+@pytest.mark.parametrize("text, message", [
+    ("ctrl+", "Invalid hotkey"),
+    ("hyper+a", "Unknown modifier"),
+    ("ctrl+shift", "needs a key besides modifiers"),
+    ("ctrl+nokey", "Unknown key"),
+])
+def test_parse_chord_errors(text, message):
+    with pytest.raises(ValueError, match=message):
+        parse_chord(text, key_names={"f6", "enter"})
+
+
+def test_parse_cpus():
+    assert parse_cpus("2") == {2}
+    assert parse_cpus("0, 2-3") == {0, 2, 3}
+    assert format_cpus({0, 2, 3}) == "0,2-3"
+
+
+@pytest.mark.parametrize("text", ["", "a", "1-", "-1", "3-x", ","])
+def test_parse_cpus_errors(text):
+    with pytest.raises(ValueError, match="Invalid CPU list"):
+        parse_cpus(text)
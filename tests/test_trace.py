@@ -0,0 +1,73 @@
+import pytest
+
+from clicker_trace import PRESS, RELEASE, Trace, TraceWriter, code_name, key_code
+
+
+def write_trace(path, events, chunk_events=2):
+    writer = TraceWriter(str(path), chunk_events=chunk_events)
+    for event in events:
+        writer.append(*event)
+    writer.close()
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "session.kct"
+    events = [
+        (0, key_code("a"), PRESS),
+        (50_000_000, key_code("a"), RELEASE),
+        (120_000_000, key_code("enter"), PRESS),
+        (150_000_000, key_code("enter"), RELEASE),
+        (200_000_000, key_code("é"), PRESS),
+    ]
+    write_trace(path, events)
+    trace = Trace(str(path))
+    try:
+        assert len(trace) == len(events)
+        assert [trace.event(i) for i in range(len(trace))] == events
+        assert trace.presses == 3
+        assert trace.duration_ns == 200_000_000
+        assert list(trace.press_gaps()) == pytest.approx([0.12, 0.08])
+    finally:
+        trace.close()
+    assert code_name(key_code("enter")) == "enter"
+    assert code_name(key_code("é")) == "é"
+
+
+def test_unfinalized_header(tmp_path):
+    path = tmp_path / "crashed.kct"
+    writer = TraceWriter(str(path), chunk_events=2)
+    for event in [(0, key_code("a"), PRESS), (10, key_code("a"), RELEASE)]:
+        writer.append(*event)
+    writer.flush()
+    writer._file.close()
+    trace = Trace(str(path))
+    try:
+        assert trace.presses == 1
+        assert trace.duration_ns == 10
+    finally:
+        trace.close()
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.kct"
+    path.write_bytes(b"not a trace at all, just some bytes" * 4)
+    with pytest.raises(ValueError, match="Not a key trace"):
+        Trace(str(path))
+    empty = tmp_path / "empty.kct"
+    empty.write_bytes(b"")
+    with pytest.raises(ValueError):
+        Trace(str(empty))
+
+
+def test_bad_header_unmaps_file(tmp_path, monkeypatch):
+    path = tmp_path / "future.kct"
+    write_trace(path, [(0, key_code("a"), PRESS)])
+    data = bytearray(path.read_bytes())
+    data[8] = 99  # version
+    path.write_bytes(bytes(data))
+    closed = []
+    original = Trace.close
+    monkeypatch.setattr(Trace, "close", lambda self: (closed.append(True), original(self)))
+    with pytest.raises(ValueError, match="Unsupported trace version"):
+        Trace(str(path))
+    assert closed